@@ -0,0 +1,10 @@
+from .generadores import (
+    BIEN_FINAL,
+    GENERADORES,
+    abanico_entrada,
+    cadena_profunda,
+    dag_libre_escala,
+    dag_por_capas,
+)
+from .escenarios import ejecutar_benchmarks, escenario_grafo, medir
+from .importacion import MODULOS, medir_importacion, medir_importaciones
@@ -0,0 +1,57 @@
+"""
+Ejecuta los benchmarks y escribe los resultados en JSON.
+
+Uso, desde la raíz del repositorio:
+
+    python -m benchmarks --tamanos 100 1000 100000 --salida resultados.json
+
+Con ``--max-importacion SEGUNDOS`` el proceso termina con código 1 si la
+mediana del tiempo de importación de algún módulo del núcleo supera ese
+límite o si alguno de ellos carga networkx.
+"""
+import argparse
+import json
+import sys
+
+from .escenarios import ejecutar_benchmarks
+from .generadores import GENERADORES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "--familias", nargs="+", choices=sorted(GENERADORES), default=None
+    )
+    parser.add_argument("--tamanos", nargs="+", type=int, default=[100, 1_000, 10_000])
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--max-pasos", type=int, default=200_000)
+    parser.add_argument("--salida", default=None, help="Archivo JSON (por defecto, stdout)")
+    parser.add_argument("--max-importacion", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar_benchmarks(
+        args.familias, args.tamanos, args.semilla, args.repeticiones, args.max_pasos
+    )
+    if args.salida is None:
+        json.dump(resultados, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.salida, "w") as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+    if args.max_importacion is not None:
+        regresiones = [
+            modulo
+            for modulo, medicion in resultados["importacion"].items()
+            if medicion["mediana"] > args.max_importacion
+            or "networkx" in medicion["dependencias"]
+        ]
+        if regresiones:
+            print(f"Regresión de importación en: {', '.join(regresiones)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import platform
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import networkx as nx
+import numpy as np
+
+from production_graph import production_graph as pg
+from production_graph.planner import AGENTES, Planner, ProcesoProductivo
+from economy import economy as ec
+
+from .generadores import GENERADORES
+from .importacion import medir_importaciones
+
+
+def medir(
+    funcion: Callable[[], object],
+    repeticiones: int = 3,
+    preparar: Callable[[], object] = None,
+) -> Dict[str, float]:
+    """
+    Mide el tiempo de ``funcion`` con ``time.perf_counter``.
+
+    Args:
+        funcion (Callable): Función a medir. Si hay ``preparar``, recibe su resultado.
+        repeticiones (int): Número de mediciones.
+        preparar (Callable, optional): Preparación que se ejecuta antes de cada
+            medición y queda fuera del tiempo medido.
+
+    Returns:
+        Dict[str, float]: Tiempos mínimo, mediana y máximo en segundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        argumentos = () if preparar is None else (preparar(),)
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        "min": min(tiempos),
+        "mediana": statistics.median(tiempos),
+        "max": max(tiempos),
+        "repeticiones": repeticiones,
+    }
+
+
+def _economia(proceso: ProcesoProductivo, precios: np.ndarray, bienes_primarios):
+    """Construye agentes, mercado abastecido y configuración para el OrderExecutor."""
+    registro = ec.AgentRegistry(
+        [
+            ec.EconomyAgent(nombre, ec.FIFOInventoryStrategy(), {"overhead": 1.0})
+            for nombre in AGENTES
+        ]
+    )
+    almacen = ec.GoodStore()
+    mercado = registro.get_agent("MKT")
+    for bien, cantidad in bienes_primarios:
+        for indice in almacen.allocate_many(bien, cantidad, cost=1.0):
+            mercado.add_good(ec.Good.from_index(almacen, int(indice)))
+
+    matriz = ec.PriceMatrix(precios)
+    configuracion = ec.EconomyConfig(
+        proceso,
+        matriz,
+        None,
+        ec.PriceMatrixLookup(matriz, registro),
+        ec.PGraphProductionLookup(proceso),
+        registro,
+        ec.TupleOrderInterpreter(),
+        almacen,
+    )
+    return ec.OrderExecutor(configuracion, ec.SimpleAdditiveCostStrategy()), registro
+
+
+def _ejecutar_ordenes(ejecutor: "ec.OrderExecutor", transacciones):
+    """Ejecuta las transacciones del Planner orden por orden."""
+    for paso, agentes, tipo, bien in transacciones:
+        orden = ec.Order(
+            paso, list(agentes), "comprar" if tipo == "compra" else tipo, bien, {}
+        )
+        ejecutor.generate_info(orden)
+        ejecutor.execute_order(orden)
+
+
+def escenario_grafo(
+    familia: str,
+    n_nodos: int,
+    semilla: int = 0,
+    repeticiones: int = 3,
+    max_pasos: int = 200_000,
+) -> Dict:
+    """
+    Mide cada etapa del flujo grafo -> plan -> transacciones -> economía sobre un
+    grafo generado.
+
+    Las etapas que dependen del largo del plan (la suma de las cantidades
+    requeridas, que crece con el número de caminos) se omiten si este supera
+    ``max_pasos``.
+
+    Args:
+        familia (str): Nombre del generador en ``GENERADORES``.
+        n_nodos (int): Número de bienes del grafo.
+        semilla (int): Semilla del grafo, del plan y de los precios.
+        repeticiones (int): Mediciones por etapa.
+        max_pasos (int): Largo máximo del plan para medir las etapas de ejecución.
+
+    Returns:
+        Dict: Descripción del grafo, tiempos por etapa y etapas omitidas.
+    """
+    grafo = GENERADORES[familia](n_nodos, semilla)
+    tiempos = {
+        "proceso_productivo": medir(lambda: ProcesoProductivo(grafo), repeticiones),
+        "generar_cantidad_requerida_bienes": medir(
+            lambda: pg.generar_cantidad_requerida_bienes(grafo), repeticiones
+        ),
+    }
+    resultado = {
+        "familia": familia,
+        "n_nodos": grafo.number_of_nodes(),
+        "n_aristas": grafo.number_of_edges(),
+        "semilla": semilla,
+        "tiempos": tiempos,
+        "omitidos": [],
+    }
+
+    proceso = ProcesoProductivo(grafo)
+    cantidades = proceso.get_cantidades_requeridas()
+    largo_plan = sum(cantidades.values())
+    resultado["largo_plan"] = largo_plan
+    if largo_plan > max_pasos:
+        resultado["omitidos"] = [
+            "crear_plan_produccion",
+            "planner_ejecutar_plan",
+            "order_executor",
+            "order_executor_batch",
+            "order_pipeline",
+        ]
+        return resultado
+
+    rng = random.Random(semilla)
+    plan = [rng.randint(0, 1) for _ in range(largo_plan)]
+    tiempos["crear_plan_produccion"] = medir(
+        lambda: proceso.crear_plan_produccion(plan), repeticiones
+    )
+
+    planner = Planner(proceso)
+    tiempos["planner_ejecutar_plan"] = medir(
+        lambda: planner.ejecutar_plan(plan), repeticiones
+    )
+    transacciones = list(planner.ejecutar_plan(plan))
+    resultado["n_transacciones"] = len(transacciones)
+
+    clasificacion = proceso.get_clasificacion_bienes()
+    bienes_primarios = [
+        (bien, cantidad)
+        for bien, cantidad in cantidades.items()
+        if clasificacion[bien] == "bien_primario"
+    ]
+    precios = np.random.default_rng(semilla).uniform(1, 10, (len(AGENTES),) * 2)
+    tiempos["order_executor"] = medir(
+        lambda economia: _ejecutar_ordenes(economia[0], transacciones),
+        repeticiones,
+        preparar=lambda: _economia(proceso, precios, bienes_primarios),
+    )
+    tiempos["order_executor_batch"] = medir(
+        lambda economia: economia[0].execute_batch(
+            ec.OrderBatch.from_tuples(transacciones, economia[1])
+        ),
+        repeticiones,
+        preparar=lambda: _economia(proceso, precios, bienes_primarios),
+    )
+    tiempos["order_pipeline"] = medir(
+        lambda economia: ec.OrderPipeline(economia[0]).run(transacciones),
+        repeticiones,
+        preparar=lambda: _economia(proceso, precios, bienes_primarios),
+    )
+    return resultado
+
+
+def ejecutar_benchmarks(
+    familias: List[str] = None,
+    tamanos: List[int] = (100, 1_000, 10_000),
+    semilla: int = 0,
+    repeticiones: int = 3,
+    max_pasos: int = 200_000,
+) -> Dict:
+    """
+    Ejecuta ``escenario_grafo`` para cada familia y tamaño, y mide el tiempo
+    de importación de los módulos del núcleo.
+
+    Returns:
+        Dict: Resultados serializables a JSON, con los datos de la máquina.
+    """
+    familias = list(familias or GENERADORES)
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor(),
+        "numpy": np.__version__,
+        "networkx": nx.__version__,
+        "importacion": medir_importaciones(repeticiones=max(repeticiones, 5)),
+        "resultados": [
+            escenario_grafo(familia, n_nodos, semilla, repeticiones, max_pasos)
+            for familia in familias
+            for n_nodos in tamanos
+        ],
+    }
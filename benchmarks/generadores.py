@@ -0,0 +1,115 @@
+import random
+import networkx as nx
+
+# Nombre del bien final en todos los grafos generados
+BIEN_FINAL = "final"
+
+
+def _conectar_al_final(grafo: nx.DiGraph) -> nx.DiGraph:
+    """Conecta todos los bienes sin productos al bien final, que queda único."""
+    sumideros = [nodo for nodo in grafo.nodes if grafo.out_degree(nodo) == 0]
+    grafo.add_edges_from((nodo, BIEN_FINAL) for nodo in sumideros)
+    return grafo
+
+
+def dag_por_capas(
+    n_nodos: int, semilla: int = 0, n_capas: int = 10, grado_entrada: int = 2
+) -> nx.DiGraph:
+    """
+    Genera un proceso productivo por capas: los bienes de la primera capa son
+    primarios y cada bien de las capas siguientes usa ``grado_entrada`` insumos
+    de la capa anterior.
+
+    Args:
+        n_nodos (int): Número total de bienes, incluido el bien final.
+        semilla (int): Semilla del generador aleatorio.
+        n_capas (int): Número de capas antes del bien final.
+        grado_entrada (int): Insumos de cada bien no primario.
+
+    Returns:
+        nx.DiGraph: Grafo con un único bien final.
+    """
+    rng = random.Random(semilla)
+    nodos = [f"b{i}" for i in range(n_nodos - 1)]
+    n_capas = max(1, min(n_capas, len(nodos)))
+    capas = [
+        nodos[k * len(nodos) // n_capas : (k + 1) * len(nodos) // n_capas]
+        for k in range(n_capas)
+    ]
+
+    grafo = nx.DiGraph()
+    grafo.add_nodes_from(nodos)
+    for anterior, capa in zip(capas, capas[1:]):
+        for nodo in capa:
+            for insumo in rng.sample(anterior, min(grado_entrada, len(anterior))):
+                grafo.add_edge(insumo, nodo)
+        # Todo bien de una capa intermedia se usa en la capa siguiente
+        for insumo in anterior:
+            if grafo.out_degree(insumo) == 0:
+                grafo.add_edge(insumo, rng.choice(capa))
+    return _conectar_al_final(grafo)
+
+
+def dag_libre_escala(n_nodos: int, semilla: int = 0, m: int = 2) -> nx.DiGraph:
+    """
+    Genera un proceso productivo libre de escala por adjunción preferencial: cada
+    bien nuevo toma ``m`` insumos distintos entre los bienes anteriores, con
+    probabilidad proporcional a (número de usos + 1). Los primeros ``m`` bienes
+    son primarios.
+
+    Args:
+        n_nodos (int): Número total de bienes, incluido el bien final.
+        semilla (int): Semilla del generador aleatorio.
+        m (int): Insumos de cada bien no primario.
+
+    Returns:
+        nx.DiGraph: Grafo con un único bien final.
+    """
+    rng = random.Random(semilla)
+    grafo = nx.DiGraph()
+    # Cada bien aparece una vez más por cada uso como insumo
+    repetidos = []
+    for j in range(n_nodos - 1):
+        nodo = f"b{j}"
+        grafo.add_node(nodo)
+        if j >= m:
+            insumos = set()
+            while len(insumos) < m:
+                insumos.add(rng.choice(repetidos))
+            for insumo in sorted(insumos):
+                grafo.add_edge(insumo, nodo)
+                repetidos.append(insumo)
+        repetidos.append(nodo)
+    return _conectar_al_final(grafo)
+
+
+def cadena_profunda(n_nodos: int, semilla: int = 0) -> nx.DiGraph:
+    """
+    Genera una cadena b0 -> b1 -> ... -> final de ``n_nodos`` bienes.
+    ``semilla`` no se usa; se acepta para que todos los generadores tengan la
+    misma firma.
+    """
+    grafo = nx.DiGraph()
+    nodos = [f"b{i}" for i in range(n_nodos - 1)] + [BIEN_FINAL]
+    grafo.add_edges_from(zip(nodos, nodos[1:]))
+    return grafo
+
+
+def abanico_entrada(n_nodos: int, semilla: int = 0) -> nx.DiGraph:
+    """
+    Genera un bien final que usa directamente ``n_nodos - 1`` bienes primarios.
+    ``semilla`` no se usa; se acepta para que todos los generadores tengan la
+    misma firma.
+    """
+    grafo = nx.DiGraph()
+    grafo.add_edges_from((f"b{i}", BIEN_FINAL) for i in range(n_nodos - 1))
+    return grafo
+
+
+# Familias de grafos disponibles: nombre -> generador(n_nodos, semilla)
+GENERADORES = {
+    "capas": dag_por_capas,
+    "libre_escala": dag_libre_escala,
+    "cadena": cadena_profunda,
+    "abanico": abanico_entrada,
+}
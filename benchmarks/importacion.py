@@ -0,0 +1,64 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+# Módulos del núcleo cuyo tiempo de importación se mide
+MODULOS = (
+    "production_graph.production_graph",
+    "production_graph.planner",
+    "economy.economy",
+)
+
+# Dependencias pesadas que se reportan si quedan cargadas tras la importación
+DEPENDENCIAS_PESADAS = ("networkx", "numpy", "scipy", "matplotlib")
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracion = time.perf_counter() - inicio
+print(json.dumps([duracion, [m for m in {pesadas!r} if m in sys.modules]]))
+"""
+
+
+def medir_importacion(modulo: str, repeticiones: int = 5) -> Dict:
+    """
+    Mide el tiempo de importar ``modulo`` en un intérprete nuevo.
+
+    Cada medición corre en un subproceso para partir sin módulos en caché.
+
+    Returns:
+        Dict: Tiempos mínimo, mediana y máximo en segundos, y las dependencias
+            pesadas que quedaron cargadas.
+    """
+    codigo = _CODIGO.format(modulo=modulo, pesadas=DEPENDENCIAS_PESADAS)
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo],
+            cwd=_RAIZ,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        duracion, dependencias = json.loads(salida)
+        tiempos.append(duracion)
+    return {
+        "min": min(tiempos),
+        "mediana": statistics.median(tiempos),
+        "max": max(tiempos),
+        "repeticiones": repeticiones,
+        "dependencias": dependencias,
+    }
+
+
+def medir_importaciones(
+    modulos: Tuple[str, ...] = MODULOS, repeticiones: int = 5
+) -> Dict[str, Dict]:
+    """``medir_importacion`` para cada módulo de ``modulos``."""
+    return {modulo: medir_importacion(modulo, repeticiones) for modulo in modulos}
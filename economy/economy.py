@@ -1,8 +1,14 @@
 from typing import List, Dict, Any , Optional 
-from collections import defaultdict
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from itertools import islice
 from abc import ABC, abstractmethod
 from production_graph.planner import ProcesoProductivo
+from production_graph.instrumentation import Instrumentacion, etapa
+import json
+import math
 import numpy as np
+import time
 from dataclasses import dataclass , make_dataclass
 
 
@@ -13,7 +19,9 @@ from dataclasses import dataclass , make_dataclass
 
 class Asset(ABC):
     """Clase abstracta para representar un activo."""
-    
+
+    __slots__ = ()
+
     @abstractmethod
     def update_price(self, new_price: float):
         pass
@@ -35,32 +43,236 @@ class Asset(ABC):
         pass
 
 
+class GoodStore:
+    """
+    Columnar (struct-of-arrays) storage for good units.
+
+    Each unit is a row of growable NumPy arrays holding its good type id, price,
+    cost and owner (-1 when no inventory holds it). Good objects are lightweight
+    handles to a row, so holdings can be valued for every agent at once.
+
+    Rows of units that no longer exist (inputs consumed by a production) are
+    released with free() and reused by the next allocations, so the arrays stay
+    the size of the live units. Each row has a generation that free() bumps; a
+    Good handle remembers the generation of its unit, so a handle to a freed
+    row neither reads the unit that reuses the row nor compares equal to it.
+
+    Goods created without a store go to the process-wide default(); set_default
+    and default_scope replace it (e.g. one store per simulation or test) so its
+    rows can be released.
+    """
+    _default = None
+
+    def __init__(self, capacity: int = 1024):
+        self.good_type_ids: Dict[str, int] = {}
+        self.good_types: List[str] = []
+        self.good_type_id = np.empty(capacity, dtype=np.int32)
+        self.price = np.empty(capacity, dtype=np.float64)
+        self.cost = np.empty(capacity, dtype=np.float64)
+        self.owner = np.empty(capacity, dtype=np.int32)
+        self.generation = np.zeros(capacity, dtype=np.uint32)
+        self.size = 0
+        self._free: List[int] = []  # Released rows, reused before growing
+
+    @classmethod
+    def default(cls) -> "GoodStore":
+        """Store shared by every Good created without an explicit store."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @classmethod
+    def set_default(cls, store: Optional["GoodStore"]) -> Optional["GoodStore"]:
+        """
+        Replaces the default store and returns the previous one. With None the
+        current store is released and a new one is created on the next default().
+        """
+        previous, cls._default = cls._default, store
+        return previous
+
+    @classmethod
+    @contextmanager
+    def default_scope(cls, store: Optional["GoodStore"] = None):
+        """Within the block, default() is ``store`` (a new store if None)."""
+        store = store if store is not None else cls()
+        previous = cls.set_default(store)
+        try:
+            yield store
+        finally:
+            cls._default = previous
+
+    def get_good_type_id(self, good_type: str) -> int:
+        type_id = self.good_type_ids.get(good_type)
+        if type_id is None:
+            type_id = self.good_type_ids[good_type] = len(self.good_types)
+            self.good_types.append(good_type)
+        return type_id
+
+    def _reserve(self, n: int):
+        needed = self.size + n
+        capacity = len(self.price)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, 2 * capacity)
+        for field in ("good_type_id", "price", "cost", "owner", "generation"):
+            old = getattr(self, field)
+            # Rows that were never allocated start at generation 0
+            new = (np.zeros if field == "generation" else np.empty)(new_capacity, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, field, new)
+
+    def allocate(self, good_type: str, price: float = 0, cost: float = 0, owner: int = -1) -> int:
+        """Adds one unit and returns its index."""
+        if self._free:
+            index = self._free.pop()
+        else:
+            self._reserve(1)
+            index = self.size
+            self.size += 1
+        self.good_type_id[index] = self.get_good_type_id(good_type)
+        self.price[index] = price
+        self.cost[index] = cost
+        self.owner[index] = owner
+        return index
+
+    def allocate_many(self, good_type: str, n: int, price: float = 0, cost: float = 0, owner: int = -1) -> np.ndarray:
+        """Adds n units of the same type in one step and returns their indexes."""
+        reused = min(n, len(self._free))
+        indexes = np.empty(n, dtype=np.int64)
+        if reused:
+            indexes[:reused] = self._free[len(self._free) - reused:]
+            del self._free[len(self._free) - reused:]
+        self._reserve(n - reused)
+        start, end = self.size, self.size + n - reused
+        indexes[reused:] = np.arange(start, end)
+        self.size = end
+        self.good_type_id[indexes] = self.get_good_type_id(good_type)
+        self.price[indexes] = price
+        self.cost[indexes] = cost
+        self.owner[indexes] = owner
+        return indexes
+
+    def free(self, index: int):
+        """
+        Releases the row of a unit that no longer exists so it can be reused.
+        Existing handles to the unit become stale.
+        """
+        self.owner[index] = -1
+        self.generation[index] += 1
+        self._free.append(index)
+
+    @property
+    def n_units(self) -> int:
+        """Number of live (allocated and not freed) units."""
+        return self.size - len(self._free)
+
+    def handles(self, indexes) -> List["Good"]:
+        """Good handles for the given unit indexes."""
+        return [Good.from_index(self, index) for index in np.asarray(indexes).tolist()]
+
+    def valuation(self, field: str = "cost") -> np.ndarray:
+        """
+        Total value of the units held by each owner, per good type.
+
+        Args:
+            field (str): "cost", "price" or "count".
+
+        Returns:
+            np.ndarray: Matrix of shape (n_owners, n_good_types); row i is owner id i.
+        """
+        owner = self.owner[: self.size]
+        held = owner >= 0
+        n_types = len(self.good_types)
+        n_owners = int(owner.max()) + 1 if held.any() else 0
+        key = owner[held].astype(np.int64) * n_types + self.good_type_id[: self.size][held]
+        weights = None if field == "count" else getattr(self, field)[: self.size][held]
+        totals = np.bincount(key, weights=weights, minlength=n_owners * n_types)
+        return totals.reshape(n_owners, n_types)
+
+
 class Good(Asset):
-    """Clase que representa una unidad de bien con precio y costo histórico."""
-    
-    def __init__(self, good_type: str, price: float = 0, last_cost: float = 0):
-        # Usamos atributos privados (convención con guion bajo)
-        self._price = price
-        self._cost = last_cost
-        self.good_type = good_type  # Atributo público, sin property por ahora
+    """Clase que representa una unidad de bien con precio y costo histórico.
+
+    The data lives in a GoodStore; a Good only holds (store, row index, row
+    generation). Using a handle after its unit was freed raises ValueError.
+    """
+
+    __slots__ = ("_store", "_index", "_generation")
+
+    def __init__(self, good_type: str, price: float = 0, last_cost: float = 0, store: GoodStore = None):
+        self._store = store if store is not None else GoodStore.default()
+        self._index = self._store.allocate(good_type, price, last_cost)
+        self._generation = int(self._store.generation[self._index])
+
+    @classmethod
+    def from_index(cls, store: GoodStore, index: int) -> "Good":
+        """Handle to an already allocated unit."""
+        unit = cls.__new__(cls)
+        unit._store = store
+        unit._index = index
+        unit._generation = int(store.generation[index])
+        return unit
+
+    def _row(self) -> int:
+        if self._store.generation[self._index] != self._generation:
+            raise ValueError("Good handle refers to a unit that no longer exists")
+        return self._index
+
+    @property
+    def store(self) -> GoodStore:
+        return self._store
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def is_alive(self) -> bool:
+        """False once the unit's row has been freed."""
+        return self._store.generation[self._index] == self._generation
+
+    @property
+    def good_type(self) -> str:
+        return self._store.good_types[self._store.good_type_id[self._row()]]
 
     @property
     def price(self) -> float:
-        return self._price
+        return float(self._store.price[self._row()])
 
     @property
     def cost(self) -> float:
-        return self._cost
+        return float(self._store.cost[self._row()])
+
+    @property
+    def owner(self) -> int:
+        return int(self._store.owner[self._row()])
+
+    @owner.setter
+    def owner(self, owner_id: int):
+        self._store.owner[self._row()] = owner_id
 
     def update_price(self, new_price: float):
-        self._price = new_price
+        self._store.price[self._row()] = new_price
 
     def update_cost(self, new_cost: float):
-        self._cost = new_cost
+        self._store.cost[self._row()] = new_cost
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, Good)
+            and self._store is other._store
+            and self._index == other._index
+            and self._generation == other._generation
+        )
+
+    def __hash__(self):
+        return hash((id(self._store), self._index, self._generation))
 
     def __repr__(self):
+        if not self.is_alive:
+            return f"Good(freed row {self._index})"
         return f"Good(Type: {self.good_type}, Price: {self.price}, Cost: {self.cost})"
-    
+
 
 # --- --------------------------------------------------------Estrategias de Gestión de Inventarios --------------------------------------------------------
 
@@ -71,6 +283,13 @@ class InventoryStrategy(ABC):
         """Dado una lista de bienes, devuelve el bien a remover(bien escogido) según la estrategia."""
         pass
 
+    def pop_good(self, goods: deque) -> Optional[Good]:
+        """Remueve y retorna el bien escogido según la estrategia (None si no hay bienes)."""
+        selected_good = self.select_good(goods)
+        if selected_good is not None:
+            goods.remove(selected_good)
+        return selected_good
+
 class FIFOInventoryStrategy(InventoryStrategy):
     """Implementa la estrategia FIFO: First-In, First-Out."""
     def select_good(self, goods: List[Good]) -> Optional[Good]:
@@ -78,6 +297,9 @@ class FIFOInventoryStrategy(InventoryStrategy):
             return goods[0]  # El primero que llegó
         return None
 
+    def pop_good(self, goods: deque) -> Optional[Good]:
+        return goods.popleft() if goods else None  # O(1)
+
 class LIFOInventoryStrategy(InventoryStrategy):
     """Implementa la estrategia LIFO: Last-In, First-Out."""
     def select_good(self, goods: List[Good]) -> Optional[Good]:
@@ -85,16 +307,28 @@ class LIFOInventoryStrategy(InventoryStrategy):
             return goods[-1]  # El último que llegó
         return None
 
+    def pop_good(self, goods: deque) -> Optional[Good]:
+        return goods.pop() if goods else None  # O(1)
+
 # --- -----------------------------------------------------------------------------Inventory Class -------------------------------------------------------- ---
 class PhysicalInventory:
-    def __init__(self, inventory_strategy: InventoryStrategy):
-        # Diccionario: clave = tipo de bien (str), valor = lista de Good
-        self.inventory = defaultdict(list)
+    def __init__(self, inventory_strategy: InventoryStrategy, owner_id: int = -1):
+        # Diccionario: clave = tipo de bien (str), valor = deque de Good (O(1) en ambos extremos)
+        self.inventory = defaultdict(deque)
         self.inventory_strategy = inventory_strategy
+        self.owner_id = owner_id  # Owner written to the GoodStore for held units
 
     def add_good(self, unit: Good):
         """Agrega una unidad al inventario."""
         self.inventory[unit.good_type].append(unit)
+        unit.owner = self.owner_id
+
+    def set_owner(self, owner_id: int):
+        """Changes the owner id, retagging the units already held in their GoodStore."""
+        self.owner_id = owner_id
+        for goods in self.inventory.values():
+            for unit in goods:
+                unit.owner = owner_id
 
 
     def get_unit_by_strategy(self, good_type: str) -> Optional[Good]:
@@ -116,14 +350,31 @@ class PhysicalInventory:
             raise ValueError("Not Enough Units of good Type"+" "+good_type)
         
     def remove_unit(self, unit: Good):
-        """Remueve una unidad específica del inventario."""
-        if unit in self.inventory[unit.good_type]:
-            self.inventory[unit.good_type].remove(unit)
+        """Remueve una unidad específica del inventario.
 
-    def remove_unit_by_strategy(self, good_type: str):
-        unit = self.get_unit_by_strategy(good_type)
+        Si la unidad está en un extremo (el caso de una unidad obtenida con
+        get_unit_by_strategy) se remueve en O(1); si no, se busca en la cola.
+        """
+        goods = self.inventory[unit.good_type]
+        if not goods:
+            return
+        if goods[0] == unit:
+            goods.popleft()
+        elif goods[-1] == unit:
+            goods.pop()
+        else:
+            try:
+                goods.remove(unit)
+            except ValueError:
+                return
+        unit.owner = -1
+
+    def remove_unit_by_strategy(self, good_type: str) -> Good:
+        """Remueve y retorna una unidad según la estrategia, sin volver a buscarla."""
+        unit = self.inventory_strategy.pop_good(self.inventory[good_type])
         if unit is not None:
-            self.remove_unit(unit)
+            unit.owner = -1
+            return unit
         else:
             raise ValueError("Not Enough Units of good Type"+" "+good_type)    
 
@@ -132,7 +383,8 @@ class PhysicalInventory:
         return len(self.inventory[good_type])
     
     def get_stock(self, good_type: str) -> List[Good]:
-        return self.inventory[good_type]
+        """Devuelve una copia (list) de las unidades de un tipo de bien, en el orden de la cola."""
+        return list(self.inventory.get(good_type, ()))
     
     def __repr__(self):
         return f"Inventory({dict(self.inventory)})"
@@ -147,11 +399,6 @@ class Agent(ABC):
         def name(self)->str:
             pass 
 
-        @abstractmethod
-        def process_order(self, order):
-            pass
-
-        
         @abstractmethod
         def get_stock_quantity(self, good_type: str) -> int:
             pass
@@ -165,14 +412,14 @@ class Agent(ABC):
             pass
 
         @abstractmethod
-        def remove_good_by_strategy(self, good_type: str) -> List[Good]:
+        def remove_unit_by_strategy(self, good_type: str) -> Good:
             pass
         
         @abstractmethod
-        def remove_unit(self, good_type: str) -> List[Good]:
+        def remove_unit(self, unit: Good):
             pass
         @abstractmethod
-        def add_good(self, good_type: str) -> List[Good]:
+        def add_good(self, unit: Good):
             pass
 
         @property 
@@ -184,14 +431,18 @@ class Agent(ABC):
 # --- Clase base para agentes económicos ---
 class EconomyAgent(Agent):
     """Clase para representar un agente económico con inventario."""
-    def __init__(self, name: str, inventory_strategy: InventoryStrategy, agent_complementary_info:Dict):
+    def __init__(self, name: str, inventory_strategy: InventoryStrategy, agent_complementary_info:Dict, owner_id: int = -1):
         self._name = name
-        self.inventory = PhysicalInventory(inventory_strategy)
-        self.agent_complementary_info = agent_complementary_info
+        self.inventory = PhysicalInventory(inventory_strategy, owner_id)
+        self._agent_complementary_info = agent_complementary_info
 
     @property
     def name(self) -> str:
         return self._name
+
+    @property
+    def agent_complementary_info(self) -> Dict:
+        return self._agent_complementary_info
     
     #! TODO mejorar forma de hacer la información complementaria 
     def get_stock(self, good_type: str) -> List[Good]:
@@ -203,8 +454,8 @@ class EconomyAgent(Agent):
     def get_unit_by_strategy(self, good_type: str) -> Optional[Good]:
         return self.inventory.get_unit_by_strategy(good_type)
     
-    def remove_unit_by_strategy(self, good_type: str):
-        self.inventory.remove_unit_by_strategy(good_type)
+    def remove_unit_by_strategy(self, good_type: str) -> Good:
+        return self.inventory.remove_unit_by_strategy(good_type)
 
     def remove_unit(self, unit:Good):
         self.inventory.remove_unit(unit)
@@ -217,8 +468,8 @@ class EconomyAgent(Agent):
 # --- Agente de mercado ---
 class MarketAgent(EconomyAgent):
     """Clase para representar un agente de mercado."""
-    def __init__(self, name: str):
-        super().__init__(name)
+    def __init__(self, name: str, inventory_strategy: InventoryStrategy = None, agent_complementary_info: Dict = None):
+        super().__init__(name, inventory_strategy or FIFOInventoryStrategy(), agent_complementary_info or {})
         self._id = 0  # Atributo privado
 
     @property
@@ -231,10 +482,10 @@ class Firm(EconomyAgent):
     """Clase para representar una firma."""
     contador = 1
 
-    def __init__(self, name: str, inventory_strategy=None):
-        super().__init__(name)
+    def __init__(self, name: str, inventory_strategy: InventoryStrategy = None, agent_complementary_info: Dict = None):
+        super().__init__(name, inventory_strategy or FIFOInventoryStrategy(), agent_complementary_info or {})
         self._id = Firm.contador
-        self.inventory_strategy = inventory_strategy or FIFOInventoryStrategy()
+        self.inventory_strategy = self.inventory.inventory_strategy
         Firm.contador += 1
 
     @property
@@ -245,23 +496,161 @@ class Firm(EconomyAgent):
 # --- Subclases de Firm ---
 class NctFirm(Firm):
     """Clase para representar una firma de NCT."""
-    def __init__(self, name: str):
-        super().__init__(name)
+    def __init__(self, name: str, inventory_strategy: InventoryStrategy = None, agent_complementary_info: Dict = None):
+        super().__init__(name, inventory_strategy, agent_complementary_info)
 
 
 
 class ZfFirm(Firm):
     """Clase para representar una firma de ZF."""
-    def __init__(self, name: str):
-        super().__init__(name)
+    def __init__(self, name: str, inventory_strategy: InventoryStrategy = None, agent_complementary_info: Dict = None):
+        super().__init__(name, inventory_strategy, agent_complementary_info)
 
 
 
 #----------------------------- Data Strucuture For Orders -------------------------
 
 class PriceMatrix:
-    def __init__(self, matrix: np.ndarray):
-        self.matrix = np.ndarray
+    """
+    Price store indexed by (good, buyer, seller).
+
+    The matrix can be 2-D (buyer x seller, same prices for every good) or 3-D
+    (good x buyer x seller). Any ndarray works, including an np.memmap opened
+    with from_file for agent sets that do not fit in memory.
+    """
+    def __init__(self, matrix: np.ndarray, good_indexes: Dict[str, int] = None):
+        if not isinstance(matrix, np.ndarray):
+            matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim not in (2, 3):
+            raise ValueError("Price matrix must be 2-D (buyer, seller) or 3-D (good, buyer, seller)")
+        self.matrix = matrix
+        # View with a leading good axis; 2-D matrices have a single price layer
+        self.tensor = matrix[None] if matrix.ndim == 2 else matrix
+        self.good_indexes = good_indexes or {}
+
+    @classmethod
+    def from_file(cls, path: str, good_indexes: Dict[str, int] = None, shape: tuple = None, dtype=np.float64) -> "PriceMatrix":
+        """
+        Memory-maps a price matrix from disk (read-only). ``.npy`` files carry their
+        own shape and dtype; raw binary files need ``shape`` and ``dtype``.
+        """
+        if str(path).endswith(".npy"):
+            matrix = np.load(path, mmap_mode="r")
+        else:
+            matrix = np.memmap(path, dtype=dtype, mode="r", shape=shape)
+        return cls(matrix, good_indexes)
+
+    def save(self, path: str):
+        """Saves the matrix as ``.npy`` so it can be reopened with from_file."""
+        np.save(path, self.matrix)
+
+    def good_index(self, goods) -> np.ndarray:
+        """Maps good types (names or ints) to indexes on the good axis."""
+        goods = np.asarray(goods)
+        if self.matrix.ndim == 2:
+            return np.zeros(goods.shape, dtype=np.int64)
+        if goods.dtype.kind in "iu":
+            return goods.astype(np.int64)
+        try:
+            return np.array([self.good_indexes[good] for good in goods.tolist()], dtype=np.int64)
+        except KeyError as err:
+            raise ValueError(f"Good {err.args[0]} not found in good indexes") from None
+
+    def get_prices(self, buyers, sellers, goods=None) -> np.ndarray:
+        """Prices for a batch of (buyer, seller, good) triples in one gather.
+
+        Args:
+            buyers, sellers: Arrays of agent indexes.
+            goods: Good types (names or indexes); ignored for 2-D matrices and
+                required for 3-D ones.
+        """
+        buyers = np.asarray(buyers, dtype=np.int64)
+        sellers = np.asarray(sellers, dtype=np.int64)
+        if goods is None:
+            if self.matrix.ndim == 3:
+                raise ValueError("A good is required to look up prices in a 3-D price matrix")
+            goods = np.zeros(buyers.shape, dtype=np.int64)
+        return np.asarray(self.tensor[self.good_index(goods), buyers, sellers])
+
+    def get_price(self, buyer: int, seller: int, good=None) -> float:
+        if self.matrix.ndim == 2:
+            return float(self.matrix[buyer, seller])
+        if good is None:
+            raise ValueError("A good is required to look up prices in a 3-D price matrix")
+        return float(self.tensor[self.good_index([good])[0], buyer, seller])
+
+
+class SparsePriceMatrix(PriceMatrix):
+    """
+    Sparse price store: only the (good, buyer, seller) entries that exist are kept,
+    as a sorted array of flat keys and a matching array of prices. Missing
+    entries and goods that are not in ``entries`` return ``default``.
+
+    There is no dense ``matrix``: save and from_file use an ``.npz`` file with the
+    keys, prices, goods and default instead of a ``.npy`` array.
+    """
+    def __init__(self, entries: Dict[str, Dict[tuple, float]], n_agents: int, default: float = np.nan):
+        self.good_indexes = {good: i for i, good in enumerate(entries)}
+        self.n_agents = n_agents
+        self.default = default
+        keys, values = [], []
+        for good, prices in entries.items():
+            base = self.good_indexes[good] * n_agents * n_agents
+            for (buyer, seller), price in prices.items():
+                if not (0 <= buyer < n_agents and 0 <= seller < n_agents):
+                    raise ValueError(f"Agent ids ({buyer}, {seller}) of good {good} out of range [0, {n_agents})")
+                keys.append(base + buyer * n_agents + seller)
+                values.append(price)
+        order = np.argsort(np.array(keys, dtype=np.int64), kind="stable")
+        self.keys = np.array(keys, dtype=np.int64)[order]
+        self.values = np.array(values, dtype=np.float64)[order]
+        self.matrix = None
+        self.tensor = None
+
+    @classmethod
+    def from_file(cls, path: str) -> "SparsePriceMatrix":
+        """Loads a sparse price matrix written by save."""
+        with np.load(path) as content:
+            matrix = cls({}, int(content["n_agents"]), float(content["default"]))
+            matrix.good_indexes = {good: i for i, good in enumerate(json.loads(str(content["goods"])))}
+            matrix.keys = content["keys"]
+            matrix.values = content["values"]
+        return matrix
+
+    def save(self, path: str):
+        """Saves keys, prices, goods and default as ``.npz`` so from_file can reopen them."""
+        np.savez(
+            path, keys=self.keys, values=self.values, goods=np.array(json.dumps(list(self.good_indexes))),
+            n_agents=np.array(self.n_agents), default=np.array(self.default),
+        )
+
+    def good_index(self, goods) -> np.ndarray:
+        """Maps good types to indexes; goods that are not in the matrix map to -1."""
+        goods = np.asarray(goods)
+        if goods.dtype.kind in "iu":
+            goods = goods.astype(np.int64)
+            if goods.size and not (0 <= goods.min() and goods.max() < len(self.good_indexes)):
+                raise ValueError(f"Good ids out of range [0, {len(self.good_indexes)})")
+            return goods
+        return np.array([self.good_indexes.get(good, -1) for good in goods.tolist()], dtype=np.int64)
+
+    def get_prices(self, buyers, sellers, goods=None) -> np.ndarray:
+        if goods is None:
+            raise ValueError("A good is required to look up prices in a sparse price matrix")
+        buyers = np.asarray(buyers, dtype=np.int64)
+        sellers = np.asarray(sellers, dtype=np.int64)
+        for ids in (buyers, sellers):
+            if ids.size and not (0 <= ids.min() and ids.max() < self.n_agents):
+                raise ValueError(f"Agent ids out of range [0, {self.n_agents})")
+        good_ids = self.good_index(goods)
+        keys = (good_ids * self.n_agents + buyers) * self.n_agents + sellers
+        position = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        # Unknown goods (-1) give negative keys, which never match
+        found = self.keys[position] == keys if len(self.keys) else np.zeros(keys.shape, dtype=bool)
+        return np.where(found, self.values[position] if len(self.keys) else self.default, self.default)
+
+    def get_price(self, buyer: int, seller: int, good=None) -> float:
+        return float(self.get_prices([buyer], [seller], None if good is None else [good])[0])
 
 @dataclass
 class Order:
@@ -271,6 +660,73 @@ class Order:
     good_type: str
     complementary_info: Dict[str, Any] # Allows to dynamically add information
 
+
+# Integer codes for order types in columnar batches ("compra" is the planner's spelling)
+BUY_ORDER = 0
+PRODUCTION_ORDER = 1
+ORDER_TYPE_CODES = {"comprar": BUY_ORDER, "compra": BUY_ORDER, "produccion": PRODUCTION_ORDER}
+# Planner spellings that differ from the order types used by the economy
+PLANNER_ORDER_TYPES = {"compra": "comprar"}
+
+
+@dataclass
+class OrderBatch:
+    """
+    Columnar order book: one array per Order field, agents and goods as integer ids.
+
+    buyer_id is the producer for production orders, whose seller_id is -1. Agent
+    ids are AgentRegistry ids; good ids index good_types.
+    """
+    time: np.ndarray
+    buyer_id: np.ndarray
+    seller_id: np.ndarray
+    order_type: np.ndarray
+    good_id: np.ndarray
+    good_types: List[str]
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def chunk(self, start: int, end: int) -> "OrderBatch":
+        return OrderBatch(
+            self.time[start:end], self.buyer_id[start:end], self.seller_id[start:end],
+            self.order_type[start:end], self.good_id[start:end], self.good_types,
+        )
+
+    @classmethod
+    def from_tuples(cls, orders, registry: "AgentRegistry") -> "OrderBatch":
+        """
+        Builds a batch from (time, agents, order_type, good_type) tuples, such as the
+        planner's transactions.
+        """
+        good_indexes: Dict[str, int] = {}
+        columns = ([], [], [], [], [])
+        for time, agents, order_type, good_type in orders:
+            try:
+                type_code = ORDER_TYPE_CODES[order_type]
+            except KeyError:
+                raise ValueError(f"Unknown order_type: {order_type}") from None
+            columns[0].append(time)
+            columns[1].append(registry.get_index(agents[0]))
+            columns[2].append(registry.get_index(agents[1]) if type_code == BUY_ORDER else -1)
+            columns[3].append(type_code)
+            columns[4].append(good_indexes.setdefault(good_type, len(good_indexes)))
+        return cls(
+            np.array(columns[0], dtype=np.int64),
+            np.array(columns[1], dtype=np.int64),
+            np.array(columns[2], dtype=np.int64),
+            np.array(columns[3], dtype=np.int8),
+            np.array(columns[4], dtype=np.int64),
+            list(good_indexes),
+        )
+
+    @classmethod
+    def from_orders(cls, orders: List[Order], registry: "AgentRegistry") -> "OrderBatch":
+        return cls.from_tuples(
+            ((order.time, order.agents, order.order_type, order.good_type) for order in orders),
+            registry,
+        )
+
 class OrderInterpretationStrategy(ABC):
     @abstractmethod
     def interpret_order(self, order) -> "Order":
@@ -289,7 +745,8 @@ class TupleOrderInterpreter(OrderInterpretationStrategy):
     def interpret_order(self, order: tuple) -> "Order":
         # Unpack the tuple and create an Order instance
         time, agents, order_type, good_type = order
-        return Order(time, agents, order_type, good_type)
+        order_type = PLANNER_ORDER_TYPES.get(order_type, order_type)
+        return Order(time, list(agents), order_type, good_type, {})
 
 class OrderInterpreter:
     def __init__(self, strategy: OrderInterpretationStrategy = TupleOrderInterpreter()):
@@ -314,20 +771,33 @@ class PriceLookupStrategy(ABC):
 
 
 class PriceMatrixLookup(PriceLookupStrategy):
-    def __init__(self, price_matrix: PriceMatrix, agent_indexes: Dict):
-        self.price_matrix = price_matrix.matrix
+    def __init__(self, price_matrix: PriceMatrix, agent_indexes: "Dict | AgentRegistry"):
+        self.price_matrix = price_matrix
+        # An AgentRegistry is the source of truth for the matrix row/column of each agent
+        if isinstance(agent_indexes, AgentRegistry):
+            agent_indexes = agent_indexes.agent_indexes
         self.agent_indexes = agent_indexes
 
     def get_price(self, order: Order) -> float:
         buyer = order.agents[0]
         seller = order.agents[1]
 
-        if buyer and seller in self.agent_indexes:
-           price = self.price_matrix[self.agent_indexes[buyer], self.agent_indexes[seller]]
+        if buyer in self.agent_indexes and seller in self.agent_indexes:
+           price = self.price_matrix.get_price(self.agent_indexes[buyer], self.agent_indexes[seller], order.good_type)
            return price
         else:
             raise ValueError ("Buyer or seller not found in agent indexes")
 
+    def get_prices(self, orders: List[Order]) -> np.ndarray:
+        """Prices for a batch of buy orders, resolved with a single gather."""
+        try:
+            buyers = [self.agent_indexes[order.agents[0]] for order in orders]
+            sellers = [self.agent_indexes[order.agents[1]] for order in orders]
+        except KeyError:
+            raise ValueError ("Buyer or seller not found in agent indexes") from None
+        goods = [order.good_type for order in orders]
+        return self.price_matrix.get_prices(buyers, sellers, goods)
+
 
 
 # ---------------------------------- Production process Lookup 
@@ -348,10 +818,29 @@ class PGraphProductionLookup(ProductionLookupStrategy):
     def get_outputs(self, good_type: str) -> List[str]:
         return self.production_graph.get_productos(good_type)
     
-    def get_production_info(self, good_type: str) -> Dict[str:list]:
+    def get_input_units(self, good_type: str) -> List[int]:
+        """Units of each input (in get_inputs order) consumed to produce one unit,
+        ceil(coefficient) as the Planner consumes them."""
+        units = {input: math.ceil(coefficient)
+                 for input, coefficient in self.production_graph.get_insumos_con_coeficientes(good_type)}
+        return [units[input] for input in self.get_inputs(good_type)]
+
+    def get_production_info(self, good_type: str) -> Dict[str, list]:
         inputs = self.get_inputs(good_type)
         outputs = self.get_outputs(good_type)
-        return {"inputs": inputs, "outputs": outputs}
+        return {"inputs": inputs, "outputs": outputs, "input_units": self.get_input_units(good_type)}
+
+
+def consumed_inputs(production_info: Dict[str, list]) -> List[str]:
+    """
+    Input units consumed by one production, one entry per unit: each input repeated
+    as many times as its "input_units" entry (once if production_info has none).
+    """
+    inputs = production_info["inputs"]
+    units = production_info.get("input_units")
+    if units is None:
+        return list(inputs)
+    return [input for input, n in zip(inputs, units) for _ in range(n)]
 
 
 
@@ -419,15 +908,58 @@ class AgentLookupStrategy(ABC):
     def get_agent(self, agent_name: str) -> Optional[Agent]:
         pass
 
-class EconomyAgentListLookup(AgentLookupStrategy):
-    def __init__(self, agents: List[Agent]):
-        self.agents = agents
+class AgentRegistry(AgentLookupStrategy):
+    """
+    Hash-indexed agent lookup. Keeps a name -> id dict and an id -> agent list,
+    and its agent_indexes are the row/column indexes used by PriceMatrixLookup,
+    so both the agent and its price-matrix index are resolved in O(1).
+    """
+    def __init__(self, agents: List[Agent] = ()):
+        self.agent_indexes: Dict[str, int] = {}
+        self.agents: List[Agent] = []
+        for agent in agents:
+            self.register(agent)
+
+    def register(self, agent: Agent) -> int:
+        """Registers an agent and returns its integer id (its price-matrix index)."""
+        if agent.name in self.agent_indexes:
+            raise ValueError(f"Agent {agent.name} is already registered")
+        agent_id = len(self.agents)
+        self.agent_indexes[agent.name] = agent_id
+        self.agents.append(agent)
+        # Units held by the agent (including those added before registering) are
+        # tagged with the same id in the GoodStore
+        inventory = getattr(agent, "inventory", None)
+        if isinstance(inventory, PhysicalInventory):
+            inventory.set_owner(agent_id)
+        return agent_id
+
+    def get_index(self, agent_name: str) -> int:
+        try:
+            return self.agent_indexes[agent_name]
+        except KeyError:
+            raise ValueError ("Agent not found in Agents List") from None
 
     def get_agent(self, agent_name: str) -> Optional[Agent]:
-        for agent in self.agents:
-            if agent.name == agent_name:
-                return agent
-        raise ValueError ("Agent not found in Agents List")  
+        return self.agents[self.get_index(agent_name)]
+
+    def get_agent_by_id(self, agent_id: int) -> Agent:
+        return self.agents[agent_id]
+
+    def resolve(self, agent_name: str):
+        """Returns (id, agent) in one lookup."""
+        agent_id = self.get_index(agent_name)
+        return agent_id, self.agents[agent_id]
+
+    def __contains__(self, agent_name: str) -> bool:
+        return agent_name in self.agent_indexes
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+
+class EconomyAgentListLookup(AgentRegistry):
+    """Kept for compatibility: same constructor, now backed by the registry's dict."""
     
 
 #! ----------------------------------------- Interface Mediator to execute the orders and generate the transactions -----------------------------------------
@@ -446,6 +978,14 @@ class EconomyConfig:
     production_strategy: ProductionLookupStrategy
     agent_lookup_strategy: AgentLookupStrategy
     order_interpretation_strategy: OrderInterpretationStrategy
+    # Store where produced units are created; defaults to the store of the consumed
+    # inputs, or GoodStore.default() for productions without inputs
+    good_store: GoodStore = None
+
+    def __post_init__(self):
+        # With a registry, the registry's indexes are the agent_indexes
+        if self.agent_indexes is None and isinstance(self.agent_lookup_strategy, AgentRegistry):
+            self.agent_indexes = self.agent_lookup_strategy.agent_indexes
 
 
 
@@ -477,12 +1017,12 @@ class BuyOrderValidation(OrderValidationStrategy):
         buyer = self.get_agent(buyer_name)
         seller = self.get_agent(seller_name)
 
+        self.validate(seller, order.good_type)
 
-        if seller.get_stock_quantity(order.good_type) == 0: # Verifica que haya suficiente inventario 
+    def validate(self, seller: Agent, good_type: str):
+        if seller.get_stock_quantity(good_type) == 0: # Verifica que haya suficiente inventario 
             raise ValueError ("No hay stock suficiente para la que el vendedor pueda vender")
 
-        pass
-
 
 class ProductionOrderValidation(OrderValidationStrategy):
     def __init__(self, config:EconomyConfig):
@@ -497,52 +1037,193 @@ class ProductionOrderValidation(OrderValidationStrategy):
         producer_name = order.agents[0]
         producer = self.get_agent(producer_name)
 
-        inputs = order.complementary_info["production_info"]["inputs"]
-        
-        for input in inputs:
-            if producer.get_stock_quantity(input) == 0: # Verifica que haya suficiente inventario 
-                raise ValueError ("No hay stock suficiente para la que el productor pueda producir")
+        inputs = consumed_inputs(order.complementary_info["production_info"])
+        self.validate(producer, inputs)
 
-        pass
+    def validate(self, producer: Agent, inputs: List[str]):
+        # inputs has one entry per consumed unit (see consumed_inputs)
+        for input, needed in Counter(inputs).items():
+            if producer.get_stock_quantity(input) < needed: # Verifica que haya suficiente inventario 
+                raise ValueError ("No hay stock suficiente para la que el productor pueda producir")
 
 
 
-    class OrderValidator:
-        def __init__(self, config:EconomyConfig):
-            self.config = config
-            self.buy_order_validation = BuyOrderValidation(self.config)
-            self.production_order_validation = ProductionOrderValidation(self.config)
-        
-        def generate_strategy_order_validation(self, order:Order):
+class OrderValidator:
+    def __init__(self, config:EconomyConfig):
+        self.config = config
+        self.buy_order_validation = BuyOrderValidation(self.config)
+        self.production_order_validation = ProductionOrderValidation(self.config)
+    
+    def generate_strategy_order_validation(self, order:Order):
+ 
+        """
+        Returns the order validation strategy according to the type of order.
+    
+        Args:
+         order (Order): The order to get the validation strategy for.
+    
+         Returns:
+            OrderValidationStrategy: The order validation strategy.
+        """
+        if order.order_type == "comprar":
+            return self.buy_order_validation
+        elif order.order_type == "produccion":
+            return self.production_order_validation
      
-            """
-            Returns the order validation strategy according to the type of order.
-        
-            Args:
-             order (Order): The order to get the validation strategy for.
-        
-             Returns:
-                OrderValidationStrategy: The order validation strategy.
-            """
-            if order.order_type == "comprar":
-                return self.buy_order_validation
-            elif order.order_type == "produccion":
-                return self.production_order_validation
-         
 
-        def validate_order(self, order:Order):
-            """
-            Validates the provided order using the appropriate validation strategy.
+    def validate_order(self, order:Order):
+        """
+        Validates the provided order using the appropriate validation strategy.
 
-            Args:
-                order (Order): The order to be validated.
+        Args:
+            order (Order): The order to be validated.
 
-             Raises:
-                ValueError: If the order is not valid according to its type.
-            """
+         Raises:
+            ValueError: If the order is not valid according to its type.
+        """
 
-            strategy = self.generate_strategy_order_validation(order)
-            strategy.validate_order(order)
+        strategy = self.generate_strategy_order_validation(order)
+        strategy.validate_order(order)
+
+
+@dataclass
+class PlanCheckResult:
+    """
+    Result of PlanValidator.check. step is the position of the first order that
+    would fail validation (-1 if the plan is feasible); time, agent_id and
+    good_type describe that order and the stock that runs out (None / -1 otherwise).
+    """
+    feasible: bool
+    step: int
+    time: int
+    agent_id: int
+    good_type: Optional[str]
+
+
+class PlanValidator:
+    """
+    Checks a whole order sequence against the agents' stock before executing it.
+
+    Every order is turned into stock movements (a buy moves one unit from seller to
+    buyer, a production consumes the input units of consumed_inputs -- ceil(coef)
+    units of each input with PGraphProductionLookup, as the Planner and
+    ProductionOrderExecution consume them -- and adds one unit of the good), which are grouped by (agent, good) and accumulated with a cumulative sum
+    in one vectorised pass. The first order whose running stock goes negative is the
+    first one BuyOrderValidation / ProductionOrderValidation would reject.
+    """
+    def __init__(self, config: EconomyConfig):
+        self.config = config
+        self._inputs_by_good: Dict[str, List[str]] = {}
+
+    def _get_inputs(self, good_type: str) -> List[str]:
+        inputs = self._inputs_by_good.get(good_type)
+        if inputs is None:
+            inputs = consumed_inputs(self.config.production_strategy.get_production_info(good_type))
+            self._inputs_by_good[good_type] = inputs
+        return inputs
+
+    def initial_stock(self, good_types: List[str]) -> np.ndarray:
+        """Current stock of the registry's agents, shape (n_agents, len(good_types))."""
+        agents = self.config.agent_lookup_strategy.agents
+        return np.array(
+            [[agent.get_stock_quantity(good_type) for good_type in good_types] for agent in agents],
+            dtype=np.int64,
+        ).reshape(len(agents), len(good_types))
+
+    def check(self, orders, initial_stock: np.ndarray = None) -> PlanCheckResult:
+        """
+        Args:
+            orders (OrderBatch | Iterable[tuple]): Orders to check, as a batch or as
+                (time, agents, order_type, good_type) tuples.
+            initial_stock (np.ndarray, optional): Stock per agent id and good, with
+                goods in the order of the batch's good_types followed by the inputs
+                that only appear in productions (see checked_good_types). Defaults
+                to the agents' current inventories.
+
+        Returns:
+            PlanCheckResult: Whether the plan is feasible and, if not, its first
+                violating order.
+        """
+        registry = self.config.agent_lookup_strategy
+        if not isinstance(registry, AgentRegistry):
+            raise ValueError("PlanValidator requires an AgentRegistry as agent_lookup_strategy")
+        batch = orders if isinstance(orders, OrderBatch) else OrderBatch.from_tuples(orders, registry)
+        good_types = self.checked_good_types(batch)
+        good_indexes = {good_type: i for i, good_type in enumerate(good_types)}
+        n_goods = len(good_types)
+        if initial_stock is None:
+            initial_stock = self.initial_stock(good_types)
+        initial_stock = np.asarray(initial_stock, dtype=np.int64)
+        if initial_stock.shape != (len(registry), n_goods):
+            raise ValueError(f"initial_stock must have shape {(len(registry), n_goods)}")
+
+        # Inputs of each good of the batch, as indexes into good_types
+        input_ids = [
+            np.array([good_indexes[i] for i in self._get_inputs(g)], dtype=np.int64)
+            for g in batch.good_types
+        ]
+        n_inputs = np.array([len(ids) for ids in input_ids], dtype=np.int64)
+        input_indptr = np.concatenate(([0], np.cumsum(n_inputs)))
+        input_flat = np.concatenate(input_ids) if input_ids else np.empty(0, dtype=np.int64)
+
+        steps = np.arange(len(batch))
+        is_buy = batch.order_type == BUY_ORDER
+        buys = steps[is_buy]
+        productions = steps[~is_buy]
+        produced = batch.good_id[productions]
+        # One consumption per (production, input)
+        consumed_per_order = n_inputs[produced]
+        consumptions = np.repeat(productions, consumed_per_order)
+        offsets = np.arange(len(consumptions)) - np.repeat(
+            np.cumsum(consumed_per_order) - consumed_per_order, consumed_per_order
+        )
+        consumed = input_flat[np.repeat(input_indptr[produced], consumed_per_order) + offsets]
+
+        # Stock movements: (step, agent, good, delta)
+        event_step = np.concatenate((buys, buys, consumptions, productions))
+        event_agent = np.concatenate((
+            batch.seller_id[buys], batch.buyer_id[buys],
+            batch.buyer_id[consumptions], batch.buyer_id[productions],
+        ))
+        event_good = np.concatenate((
+            batch.good_id[buys], batch.good_id[buys], consumed, produced,
+        ))
+        event_delta = np.concatenate((
+            np.full(len(buys), -1), np.ones(len(buys), dtype=np.int64),
+            np.full(len(consumptions), -1), np.ones(len(productions), dtype=np.int64),
+        ))
+
+        if not len(event_step):
+            return PlanCheckResult(True, -1, -1, -1, None)
+
+        # Group by (agent, good), in step order, removals before additions
+        key = event_agent * n_goods + event_good
+        order = np.lexsort((event_delta, event_step, key))
+        key, event_step, event_delta = key[order], event_step[order], event_delta[order]
+        running = np.cumsum(event_delta)
+        group_start = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        before_group = np.repeat(running[group_start] - event_delta[group_start],
+                                 np.diff(np.r_[group_start, len(key)]))
+        running += initial_stock.ravel()[key] - before_group
+
+        violations = np.flatnonzero(running < 0)
+        if not len(violations):
+            return PlanCheckResult(True, -1, -1, -1, None)
+        first = violations[np.argmin(event_step[violations])]
+        step = int(event_step[first])
+        agent_id, good_id = divmod(int(key[first]), n_goods)
+        return PlanCheckResult(False, step, int(batch.time[step]), agent_id, good_types[good_id])
+
+    def checked_good_types(self, batch: OrderBatch) -> List[str]:
+        """The batch's good_types followed by production inputs not already among them."""
+        good_types = list(batch.good_types)
+        known = set(good_types)
+        for good_type in batch.good_types:
+            for input in self._get_inputs(good_type):
+                if input not in known:
+                    known.add(input)
+                    good_types.append(input)
+        return good_types
 
 
 
@@ -600,29 +1281,35 @@ class OrderExecutionStrategy(ABC):
 
 
 class ProductionOrderExecution(OrderExecutionStrategy):
-    def __init__(self, config:EconomyConfig,cost_strategy:CostStrategy):
+    def __init__(self, config:EconomyConfig,cost_strategy:CostStrategy=None):
         super().__init__()
         self.config = config
         self.cost_strategy = cost_strategy or PlainInputCostStrategy()
        
 
     def execute_order(self,order:Order):
-        cumulative_input_cost = 0
         producer = self.config.agent_lookup_strategy.get_agent(order.agents[0])
+        self.execute(producer, order.good_type, consumed_inputs(order.complementary_info["production_info"]))
 
-        for input in order.complementary_info["production_info"]["inputs"]:
-            unit = producer.get_unit_by_strategy(input)
+    def execute(self, producer: Agent, good_type: str, inputs: List[str]):
+        """Consumes one unit per entry of ``inputs`` (see consumed_inputs) and adds the good."""
+        store = self.config.good_store
+        cumulative_input_cost = 0
+        for input in inputs:
+            unit = producer.remove_unit_by_strategy(input)
             cumulative_input_cost += unit.cost
-            producer.remove_unit(unit)
+            if store is None:
+                store = unit.store
+            # The consumed unit no longer exists: its row is recycled
+            unit.store.free(unit.index)
         agent_complementary_info = producer.agent_complementary_info
         cost = self.cost_strategy.calculate_cost(cumulative_input_cost,agent_complementary_info)
-        producer.add_good(Good(order.good_type,0,cost))
-        pass
+        producer.add_good(Good(good_type,0,cost,store))
         
 
 
 class BuyerOrderExecution(OrderExecutionStrategy):
-    def __init__(self, config:EconomyConfig,cost_strategy:CostStrategy):
+    def __init__(self, config:EconomyConfig,cost_strategy:CostStrategy=None):
         super().__init__()
         self.config = config
         self.cost_strategy = cost_strategy or PlainInputCostStrategy()
@@ -630,17 +1317,17 @@ class BuyerOrderExecution(OrderExecutionStrategy):
     def execute_order(self,order:Order):
         buyer = self.config.agent_lookup_strategy.get_agent(order.agents[0])
         seller = self.config.agent_lookup_strategy.get_agent(order.agents[1])
+        self.execute(buyer, seller, order.good_type, order.complementary_info["price"])
 
+    def execute(self, buyer: Agent, seller: Agent, good_type: str, price: float):
         buyer_complementary_info = buyer.agent_complementary_info
         seller_complementary_info = seller.agent_complementary_info
 
-        unit_sold = seller.get_unit_by_strategy(order.good_type)
-        price = order.complementary_info["price"]
+        unit_sold = seller.remove_unit_by_strategy(good_type)
         
         unit_sold.update_price(price)
         #! TODO añadir aquí procesamiento contable del vendedor 
-        seller.remove_unit(unit_sold)
-        buyer.add_unit(unit_sold)
+        buyer.add_good(unit_sold)
 
         cost = self.cost_strategy.calculate_cost(unit_sold.cost,buyer_complementary_info)
 
@@ -655,25 +1342,275 @@ class BuyerOrderExecution(OrderExecutionStrategy):
 #-------------------------------------- ---------------------------------------Order Executor -------------------------------------------------------------
 
 class OrderExecutor:
-    def __init__(self, config:EconomyConfig):
+    def __init__(self, config:EconomyConfig, cost_strategy:CostStrategy=None, instrumentation:Instrumentacion=None):
         self.config = config
+        # Optional instrumentation (off with None): stages "generate_info", "enrichment",
+        # "validation" and "execution", latencies per order type and the
+        # "inventory_removals" counter
+        self.instrumentation = instrumentation
         self.info_generator = OrderAdditionalInfoGenerator(self.config.price_strategy, self.config.production_strategy)
+        # Strategies are stateless per order, so they are built once
+        self.buyer_execution = BuyerOrderExecution(self.config, cost_strategy)
+        self.production_execution = ProductionOrderExecution(self.config, cost_strategy)
+        self.buy_validation = BuyOrderValidation(self.config)
+        self.production_validation = ProductionOrderValidation(self.config)
+        self._inputs_by_good: Dict[str, List[str]] = {}
     
     def generate_info(self, order: Order):
-        self.info_generator.generate_info(order)
+        with etapa(self.instrumentation, "generate_info"):
+            self.info_generator.generate_info(order)
 
     def generate_strategy_order_execution(self, order:Order):
         if order.order_type == "comprar":
-            return BuyerOrderExecution(self.config)
+            return self.buyer_execution
         elif order.order_type == "produccion":
-            return ProductionOrderExecution(self.config)
+            return self.production_execution
         else:
             raise ValueError(f"Unknown order_type: {order.order_type}")
     
+    def validate_order(self, order: Order):
+        if order.order_type == "comprar":
+            self.buy_validation.validate_order(order)
+        elif order.order_type == "produccion":
+            self.production_validation.validate_order(order)
+        else:
+            raise ValueError(f"Unknown order_type: {order.order_type}")
+
     def execute_order(self,order:Order):
         strategy = self.generate_strategy_order_execution(order)
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            strategy.execute_order(order)
+            return
+        start = time.perf_counter_ns()
         strategy.execute_order(order)
+        elapsed = time.perf_counter_ns() - start
+        instrumentation.acumular("execution", elapsed)
+        instrumentation.registrar_latencia(order.order_type, elapsed)
+        removals = 1 if order.order_type == "comprar" else len(self._get_inputs(order.good_type))
+        instrumentation.contar("inventory_removals", removals)
+
+    def _get_inputs(self, good_type: str) -> List[str]:
+        """Consumed input units of one production of good_type (see consumed_inputs)."""
+        inputs = self._inputs_by_good.get(good_type)
+        if inputs is None:
+            inputs = consumed_inputs(self.config.production_strategy.get_production_info(good_type))
+            self._inputs_by_good[good_type] = inputs
+        return inputs
+
+    def _get_price_matrix(self) -> PriceMatrix:
+        if isinstance(self.config.price_strategy, PriceMatrixLookup):
+            return self.config.price_strategy.price_matrix
+        return self.config.price_matrix
+
+    def execute_batch(self, batch: OrderBatch, chunk_size: int = 65536, validate: bool = True):
+        """
+        Enriches, validates and executes a columnar batch of orders, in order.
 
+        Per chunk, buy prices are gathered from the price matrix in one call and
+        production inputs come from a per-good cache; orders are then validated and
+        applied one by one (each order depends on the inventories left by the
+        previous ones) without building Order objects or complementary_info dicts.
 
+        Args:
+            batch (OrderBatch): Orders to execute; agent ids must be ids of the
+                AgentRegistry used as the config's agent_lookup_strategy.
+            chunk_size (int): Number of orders enriched at a time.
+            validate (bool): Whether to check stock before each order.
+        """
+        registry = self.config.agent_lookup_strategy
+        if not isinstance(registry, AgentRegistry):
+            raise ValueError("execute_batch requires an AgentRegistry as agent_lookup_strategy")
+        agents = registry.agents
+        price_matrix = self._get_price_matrix()
+        good_types = batch.good_types
+        inputs_by_id = [self._get_inputs(good_type) for good_type in good_types]
+        good_type_array = np.array(good_types, dtype=object)
+
+        instrumentation = self.instrumentation
+
+        for start in range(0, len(batch), chunk_size):
+            chunk = batch.chunk(start, start + chunk_size)
+            with etapa(instrumentation, "enrichment"):
+                is_buy = chunk.order_type == BUY_ORDER
+                prices = np.zeros(len(chunk))
+                if is_buy.any():
+                    prices[is_buy] = price_matrix.get_prices(
+                        chunk.buyer_id[is_buy], chunk.seller_id[is_buy], good_type_array[chunk.good_id[is_buy]]
+                    )
+
+            for buy, buyer_id, seller_id, good_id, price in zip(
+                is_buy.tolist(), chunk.buyer_id.tolist(), chunk.seller_id.tolist(),
+                chunk.good_id.tolist(), prices.tolist(),
+            ):
+                if instrumentation is not None:
+                    self._execute_instrumented(buy, agents, buyer_id, seller_id, good_types[good_id],
+                                               inputs_by_id[good_id], price, validate)
+                    continue
+                good_type = good_types[good_id]
+                if buy:
+                    seller = agents[seller_id]
+                    if validate:
+                        self.buy_validation.validate(seller, good_type)
+                    self.buyer_execution.execute(agents[buyer_id], seller, good_type, price)
+                else:
+                    producer = agents[buyer_id]
+                    inputs = inputs_by_id[good_id]
+                    if validate:
+                        self.production_validation.validate(producer, inputs)
+                    self.production_execution.execute(producer, good_type, inputs)
+
+    def _execute_instrumented(self, buy: bool, agents: List[Agent], buyer_id: int, seller_id: int,
+                              good_type: str, inputs: List[str], price: float, validate: bool):
+        """execute_batch's per-order step, timing validation and execution separately."""
+        instrumentation = self.instrumentation
+        start = time.perf_counter_ns()
+        if buy:
+            seller = agents[seller_id]
+            if validate:
+                self.buy_validation.validate(seller, good_type)
+            validated = time.perf_counter_ns()
+            self.buyer_execution.execute(agents[buyer_id], seller, good_type, price)
+            order_type, removals = "comprar", 1
+        else:
+            producer = agents[buyer_id]
+            if validate:
+                self.production_validation.validate(producer, inputs)
+            validated = time.perf_counter_ns()
+            self.production_execution.execute(producer, good_type, inputs)
+            order_type, removals = "produccion", len(inputs)
+        end = time.perf_counter_ns()
+        if validate:
+            instrumentation.acumular("validation", validated - start)
+        instrumentation.acumular("execution", end - validated)
+        instrumentation.registrar_latencia(order_type, end - start)
+        instrumentation.contar("inventory_removals", removals)
+
+
+#-------------------------------------- ---------------------------------------Order Pipeline -------------------------------------------------------------
+
+class OrderPipeline:
+    """
+    Streams orders through interpret -> enrich -> validate -> execute as chained
+    generators, so a plan is replayed without materialising its transactions.
+
+    Pull mode: run() consumes any iterable of planner tuples (a list, a generator,
+    SumideroMemmap.decodificar output...). Push mode: the pipeline has the append()
+    of a Planner sink, so planner.ejecutar_plan(plan, sumidero=pipeline) executes
+    orders while the plan is generated; call flush() afterwards for the last chunk.
+
+    At most chunk_size orders are buffered at a time. Each chunk is enriched at once
+    (one price gather for its buy orders, production info cached per good), then its
+    orders are validated and executed one by one, since each one depends on the
+    inventories left by the previous ones.
+    """
+    def __init__(self, executor: OrderExecutor, interpreter: OrderInterpreter = None,
+                 chunk_size: int = 1024, validate: bool = True):
+        """
+        Args:
+            executor (OrderExecutor): Executor whose config, strategies and
+                instrumentation are used.
+            interpreter (OrderInterpreter, optional): Defaults to the config's
+                order_interpretation_strategy.
+            chunk_size (int): Orders enriched (and buffered in push mode) at a time.
+            validate (bool): Whether to check stock before each order.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        self.executor = executor
+        self.config = executor.config
+        self.interpreter = interpreter or OrderInterpreter(
+            self.config.order_interpretation_strategy or TupleOrderInterpreter()
+        )
+        self.chunk_size = chunk_size
+        self.validate_orders = validate
+        self.executed = 0
+        self._production_info: Dict[str, Dict[str, list]] = {}
+        self._buffer: List[tuple] = []
+
+    def interpret(self, transactions):
+        for transaction in transactions:
+            yield self.interpreter.interpret_order(transaction)
+
+    def _get_production_info(self, good_type: str) -> Dict[str, list]:
+        info = self._production_info.get(good_type)
+        if info is None:
+            info = self.config.production_strategy.get_production_info(good_type)
+            self._production_info[good_type] = info
+        return info
+
+    def enrich(self, orders):
+        """Adds price and production_info to the orders, a chunk at a time."""
+        price_strategy = self.config.price_strategy
+        get_prices = getattr(price_strategy, "get_prices", None)
+        instrumentation = self.executor.instrumentation
+        orders = iter(orders)
+        while True:
+            chunk = list(islice(orders, self.chunk_size))
+            if not chunk:
+                return
+            with etapa(instrumentation, "enrichment"):
+                buys = []
+                for order in chunk:
+                    if order.order_type == "comprar":
+                        buys.append(order)
+                    elif order.order_type != "produccion":
+                        raise ValueError(f"Unknown order_type: {order.order_type}")
+                    order.complementary_info["production_info"] = self._get_production_info(order.good_type)
+                if buys:
+                    if get_prices is not None:
+                        prices = get_prices(buys).tolist()
+                    else:
+                        prices = [price_strategy.get_price(order) for order in buys]
+                    for order, price in zip(buys, prices):
+                        order.complementary_info["price"] = price
+            yield from chunk
+
+    def validate(self, orders):
+        """Checks each order right before it is executed (generators are lazy)."""
+        executor = self.executor
+        instrumentation = executor.instrumentation
+        for order in orders:
+            if instrumentation is None:
+                executor.validate_order(order)
+            else:
+                start = time.perf_counter_ns()
+                executor.validate_order(order)
+                instrumentation.acumular("validation", time.perf_counter_ns() - start)
+            yield order
+
+    def execute(self, orders):
+        executor = self.executor
+        for order in orders:
+            executor.execute_order(order)
+            self.executed += 1
+            yield order
+
+    def stream(self, transactions):
+        """Generator of the executed orders of transactions, in order."""
+        orders = self.enrich(self.interpret(transactions))
+        if self.validate_orders:
+            orders = self.validate(orders)
+        return self.execute(orders)
+
+    def run(self, transactions) -> int:
+        """
+        Executes transactions, in order.
 
-
+        Returns:
+            int: Number of orders executed.
+        """
+        executed = self.executed
+        deque(self.stream(transactions), maxlen=0)
+        return self.executed - executed
+
+    def append(self, transaction: tuple):
+        """Buffers a transaction and runs the buffer when it reaches chunk_size."""
+        self._buffer.append(transaction)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> int:
+        """Runs the buffered transactions; returns how many were executed."""
+        buffer, self._buffer = self._buffer, []
+        return self.run(buffer)
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+import numpy as np
+from typing import List, Optional, Tuple
+
+try:
+    from . import production_graph as pg
+except ImportError:  # Ejecutado como script desde production_graph/
+    import production_graph as pg
+
+
+# Versión del formato de los archivos; cambiarla invalida todas las entradas
+FORMATO = 2
+
+
+def huella_grafo(grafo) -> str:
+    """
+    Huella SHA-256 de un grafo de producción: nodos, aristas y atributos de
+    las aristas.
+
+    El orden de inserción de nodos y aristas forma parte de la huella porque
+    define el orden topológico (y con él los ids del índice compilado).
+
+    Args:
+        grafo (nx.DiGraph | pg.GrafoProduccion): Grafo de producción.
+
+    Returns:
+        str: Huella hexadecimal.
+    """
+    grafo = pg.como_grafo(grafo)
+    aristas = [
+        (u, v, sorted(datos.items())) if datos else (u, v)
+        for u, v, datos in grafo.edges(data=True)
+    ]
+    h = hashlib.sha256(f"formato={FORMATO}\n".encode())
+    h.update(repr(list(grafo)).encode())
+    h.update(repr(aristas).encode())
+    return h.hexdigest()
+
+
+class CacheProcesos:
+    """
+    Caché en disco de procesos productivos compilados.
+
+    Cada entrada es un archivo ``<huella>.npz`` con los arreglos del
+    ``ProductionGraphIndex`` y el requerimiento bruto de cada nodo, de modo
+    que ``ProcesoProductivo(grafo, cache=...)`` no vuelve a ordenar el grafo
+    ni a contar caminos si otro proceso ya lo hizo.
+
+    - Las entradas se validan al leerlas (formato, huella, dimensiones y
+      nodos); una entrada inválida o corrupta se elimina y se recompila.
+    - Las escrituras son atómicas (archivo temporal + ``os.replace``), así que
+      varios procesos pueden compartir el directorio.
+    - Si el directorio supera ``max_bytes``, se eliminan las entradas usadas
+      hace más tiempo (LRU por fecha de modificación, que se actualiza en
+      cada lectura).
+    """
+
+    def __init__(self, directorio: str, max_bytes: int = 512 * 2**20):
+        """
+        Args:
+            directorio (str): Directorio de la caché. Se crea si no existe.
+            max_bytes (int): Tamaño máximo total de las entradas.
+        """
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        os.makedirs(directorio, exist_ok=True)
+
+    def ruta(self, huella: str) -> str:
+        return os.path.join(self.directorio, f"{huella}.npz")
+
+    def cargar(
+        self, huella: str, grafo
+    ) -> Optional[Tuple[pg.ProductionGraphIndex, List]]:
+        """
+        Lee la entrada de ``huella`` y la valida contra ``grafo``.
+
+        Returns:
+            Tuple[ProductionGraphIndex, List] | None: El índice compilado y los
+                requerimientos brutos por id, o None si no hay una entrada válida.
+        """
+        ruta = self.ruta(huella)
+        try:
+            with np.load(ruta, allow_pickle=False) as datos:
+                contenido = {nombre: datos[nombre] for nombre in datos.files}
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zipfile.BadZipFile):
+            self._eliminar(ruta)
+            return None
+
+        compilado = self._validar(contenido, huella, grafo)
+        if compilado is None:
+            self._eliminar(ruta)
+            return None
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return compilado
+
+    def _validar(self, contenido, huella: str, grafo):
+        try:
+            if (
+                int(contenido["formato"]) != FORMATO
+                or str(contenido["huella"]) != huella
+            ):
+                return None
+            nodos = json.loads(str(contenido["nodos"]))
+            brutos = json.loads(str(contenido["brutos"]))
+            n = len(nodos)
+            arreglos = {
+                nombre: contenido[nombre] for nombre in pg.ProductionGraphIndex.ARREGLOS
+            }
+        except (KeyError, ValueError):
+            return None
+
+        # La huella ya identifica el grafo; aquí se verifica que el archivo
+        # esté completo y sea consistente con sus nodos
+        if n != len(grafo) or len(brutos) != n:
+            return None
+        if any(nodo not in grafo for nodo in nodos):
+            return None
+        n_aristas = arreglos["succ_indices"].shape[0]
+        for prefijo in ("pred", "succ"):
+            indptr = arreglos[f"{prefijo}_indptr"]
+            indices = arreglos[f"{prefijo}_indices"]
+            if (
+                indptr.shape != (n + 1,)
+                or indptr[0] != 0
+                or indptr[-1] != n_aristas
+                or indices.shape != (n_aristas,)
+                or arreglos[f"{prefijo}_pesos"].shape != (n_aristas,)
+                or (n_aristas and not 0 <= indices.min() <= indices.max() < n)
+            ):
+                return None
+        if arreglos["clasificacion"].shape != (n,):
+            return None
+
+        indice = pg.ProductionGraphIndex.desde_arreglos(
+            nodos, arreglos, bool(contenido["tiene_pesos"])
+        )
+        return indice, brutos
+
+    def guardar(self, huella: str, indice: pg.ProductionGraphIndex, brutos: List):
+        """
+        Escribe la entrada de ``huella`` y aplica el límite de tamaño. Los grafos
+        cuyos nodos no se pueden guardar como JSON no se guardan.
+        """
+        try:
+            nodos = json.dumps(indice.nodos)
+            brutos = json.dumps(brutos)
+        except TypeError:
+            return
+        if json.loads(nodos) != indice.nodos:  # p. ej. nodos que son tuplas
+            return
+        arreglos = {nombre: getattr(indice, nombre) for nombre in indice.ARREGLOS}
+
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                np.savez(
+                    archivo,
+                    formato=np.array(FORMATO),
+                    huella=np.array(huella),
+                    nodos=np.array(nodos),
+                    brutos=np.array(brutos),
+                    tiene_pesos=np.array(indice.tiene_pesos),
+                    **arreglos,
+                )
+            os.replace(temporal, self.ruta(huella))
+        except BaseException:
+            self._eliminar(temporal)
+            raise
+        self._desalojar(conservar=self.ruta(huella))
+
+    def _desalojar(self, conservar: str = None):
+        """Elimina las entradas menos usadas hasta quedar bajo ``max_bytes``."""
+        entradas = []
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith(".npz"):
+                try:
+                    estado = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((estado.st_mtime, estado.st_size, entrada.path))
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            if ruta == conservar:
+                continue
+            self._eliminar(ruta)
+            total -= tamano
+
+    def limpiar(self):
+        """Elimina todas las entradas."""
+        for entrada in os.scandir(self.directorio):
+            if entrada.name.endswith(".npz"):
+                self._eliminar(entrada.path)
+
+    @staticmethod
+    def _eliminar(ruta: str):
+        try:
+            os.remove(ruta)
+        except FileNotFoundError:
+            pass
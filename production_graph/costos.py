@@ -0,0 +1,368 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict
+
+try:
+    from .planner import AGENTES, MKT, NCT, ZF, ResultadosPlanes
+except ImportError:  # Ejecutado como script desde production_graph/
+    from planner import AGENTES, MKT, NCT, ZF, ResultadosPlanes
+
+
+@dataclass
+class CostosPlanes:
+    """
+    Resultados por plan de ``CosteoPlanes.costear``.
+
+    Attributes:
+        costo_final (np.ndarray): Forma (n_planes,); costo de la unidad del bien
+            final, o NaN si el plan falló.
+        resultados (ResultadosPlanes): Conteos de transacciones y paso de fallo,
+            como los de ``Planner.ejecutar_planes``.
+    """
+
+    costo_final: np.ndarray
+    resultados: ResultadosPlanes
+
+
+class CosteoPlanes:
+    """
+    Calcula el costo del bien final de muchos planes a la vez, sin repetir en el
+    economy cada orden unidad por unidad.
+
+    Los costos siguen las reglas de BuyerOrderExecution y
+    ProductionOrderExecution con una estrategia aditiva (como
+    SimpleAdditiveCostStrategy):
+
+    - una compra suma al costo de la unidad el precio
+      ``price_matrix.get_price(comprador, vendedor, bien)`` y el sobrecosto del
+      comprador;
+    - una producción consume ``ceil(coeficiente)`` unidades de cada insumo y
+      tiene como costo la suma de los costos de esas unidades más el
+      sobrecosto del productor;
+    - los bienes primarios parten con ``costos_primarios`` en el mercado.
+
+    El sobrecosto de cada agente es ``cost_strategy.calculate_cost(0, info)``.
+    Sin ``price_matrix`` las compras no suman precio, que es lo que hace hoy
+    BuyerOrderExecution (solo actualiza el precio de la unidad).
+
+    Los planes se ejecutan con ``Planner._ejecutar_lote``, la misma semántica de
+    ``Planner.ejecutar_planes``, llevando junto al stock de cada (plan, agente,
+    bien) el costo acumulado de esas unidades. Las unidades de un mismo agente
+    y bien se valoran a su costo promedio; como los planes del Planner consumen
+    todas las unidades que compran o producen, el costo del bien final es el
+    mismo que con el inventario FIFO del economy, también con coeficientes
+    (``PGraphProductionLookup`` entrega las mismas unidades por insumo).
+    """
+
+    def __init__(
+        self,
+        planner,
+        price_matrix=None,
+        cost_strategy=None,
+        info_agentes: Dict[str, Dict] = None,
+        indices_agentes: Dict[str, int] = None,
+        costos_primarios: Dict[str, float] = None,
+    ):
+        """
+        Args:
+            planner (Planner): Planner con el proceso productivo a costear.
+            price_matrix (PriceMatrix, optional): Precios (comprador, vendedor[, bien]).
+            cost_strategy (CostStrategy, optional): Estrategia de costos del
+                economy; sin ella no hay sobrecostos por orden.
+            info_agentes (Dict[str, Dict], optional): Información complementaria
+                de cada agente para ``cost_strategy``.
+            indices_agentes (Dict[str, int], optional): Fila/columna de cada
+                agente en la matriz de precios. Por defecto, el orden de AGENTES.
+            costos_primarios (Dict[str, float], optional): Costo inicial de cada
+                unidad de los bienes primarios. Por defecto, 0.
+        """
+        self._planner = planner
+        self._proceso = planner._proceso_productivo
+        indice = self._proceso.get_indice()
+        clasificacion = self._proceso.get_clasificacion_bienes()
+        cantidades = self._proceso.get_cantidades_requeridas()
+        n_agentes = len(AGENTES)
+        n_bienes = len(indice)
+
+        info_agentes = info_agentes or {}
+        self._sobrecosto = np.array(
+            [
+                0.0
+                if cost_strategy is None
+                else cost_strategy.calculate_cost(0.0, info_agentes.get(agente, {}))
+                for agente in AGENTES
+            ]
+        )
+
+        # costo_compra[c, v, g]: lo que suma al costo de una unidad de g que el
+        # agente c compra al agente v. El bien final nunca se compra.
+        self._costo_compra = np.zeros((n_agentes, n_agentes, n_bienes))
+        if price_matrix is not None:
+            indices = indices_agentes or {agente: i for i, agente in enumerate(AGENTES)}
+            filas = np.array([indices[agente] for agente in AGENTES])
+            comprables = [
+                i
+                for i, bien in enumerate(indice.nodos)
+                if clasificacion[bien] != "bien_final"
+            ]
+            if comprables:
+                c, v, g = np.meshgrid(
+                    np.arange(n_agentes), np.arange(n_agentes), comprables, indexing="ij"
+                )
+                nodos = np.array(indice.nodos, dtype=object)
+                self._costo_compra[c, v, g] = price_matrix.get_prices(
+                    filas[c.ravel()], filas[v.ravel()], nodos[g.ravel()].tolist()
+                ).reshape(c.shape)
+        self._costo_compra += self._sobrecosto[:, None, None]
+
+        self._valor_inicial = np.zeros((n_agentes, n_bienes))
+        for bien, costo in (costos_primarios or {}).items():
+            if bien in indice.ids:
+                self._valor_inicial[:, indice.ids[bien]] = costo
+        self._bien_final = indice.ids[
+            next(b for b in cantidades if clasificacion[b] == "bien_final")
+        ]
+
+    def costear(self, planes: np.ndarray, tamano_lote: int = 4096) -> CostosPlanes:
+        """
+        Ejecuta y costea muchos planes 0/1 a la vez.
+
+        Args:
+            planes (np.ndarray): Arreglo 0/1 de forma (n_planes, largo_plan).
+            tamano_lote (int): Número de planes evaluados simultáneamente; la
+                memoria usada es del orden de tamano_lote · 3 · n_bienes · 16 bytes.
+
+        Returns:
+            CostosPlanes: Costo del bien final y resultados por plan.
+        """
+        planner = self._planner
+        planes = np.asarray(planes)
+        if planes.ndim != 2:
+            raise ValueError("Los planes deben ser un arreglo 2-D (n_planes, largo_plan).")
+
+        pasos = planner._compilar_pasos()
+        if planes.shape[1] < planner._n_requerido:
+            raise ValueError(
+                "El plan debe tener al menos un elemento por cada paso necesario"
+            )
+
+        n_planes = planes.shape[0]
+        n_agentes = len(AGENTES)
+        stock_inicial = planner._stock_inicial(self._valor_inicial.shape[1])
+        # Costo de todas las unidades iniciales de cada (agente, bien)
+        valor_inicial = stock_inicial * self._valor_inicial
+
+        compras = np.zeros((n_planes, n_agentes, n_agentes), dtype=np.int64)
+        producciones = np.zeros((n_planes, n_agentes), dtype=np.int64)
+        paso_fallo = np.full(n_planes, -1, dtype=np.int64)
+        costo_final = np.full(n_planes, np.nan)
+
+        for inicio in range(0, n_planes, tamano_lote):
+            fin = min(inicio + tamano_lote, n_planes)
+            # plan 1 -> NCT (0), plan 0 -> ZF (1)
+            agentes = 1 - planes[inicio:fin].astype(np.int64)
+            stock = np.repeat(stock_inicial[None], fin - inicio, axis=0)
+            valor = np.repeat(valor_inicial[None], fin - inicio, axis=0)
+            planner._ejecutar_lote(
+                pasos,
+                agentes,
+                stock,
+                compras[inicio:fin],
+                producciones[inicio:fin],
+                paso_fallo[inicio:fin],
+                valor=valor,
+                costo_compra=self._costo_compra,
+                sobrecosto=self._sobrecosto,
+            )
+            unidades = stock[:, :, self._bien_final].sum(axis=1)
+            completo = (paso_fallo[inicio:fin] < 0) & (unidades > 0)
+            costo_final[inicio:fin][completo] = (
+                valor[completo, :, self._bien_final].sum(axis=1) / unidades[completo]
+            )
+
+        resultados = ResultadosPlanes(
+            compras=compras,
+            producciones=producciones,
+            compras_transfronterizas=compras[:, NCT, ZF] + compras[:, ZF, NCT],
+            paso_fallo=paso_fallo,
+        )
+        return CostosPlanes(costo_final, resultados)
+
+    def costo_final(self, planes: np.ndarray, tamano_lote: int = 4096) -> np.ndarray:
+        """``costear(planes, tamano_lote).costo_final``."""
+        return self.costear(planes, tamano_lote).costo_final
+
+
+@dataclass
+class MetricasEscenarios:
+    """
+    Métricas por escenario de precios de ``EscenariosPrecios.evaluar``.
+
+    Attributes:
+        costo_final (np.ndarray): Forma (n_escenarios,); costo del bien final.
+        costo_compras (np.ndarray): Forma (n_escenarios,); suma de los precios
+            pagados en todas las compras.
+        costo_transfronterizo (np.ndarray): Forma (n_escenarios,); suma de los
+            precios pagados en compras entre NCT y ZF.
+    """
+
+    costo_final: np.ndarray
+    costo_compras: np.ndarray
+    costo_transfronterizo: np.ndarray
+
+    def resumen(self, percentiles=(5, 50, 95)) -> Dict[str, Dict[str, float]]:
+        """Media, desviación estándar, mínimo, máximo y percentiles de cada métrica."""
+        resumen = {}
+        for nombre in ("costo_final", "costo_compras", "costo_transfronterizo"):
+            valores = getattr(self, nombre)
+            metrica = {
+                "media": float(np.mean(valores)),
+                "desviacion": float(np.std(valores)),
+                "min": float(np.min(valores)),
+                "max": float(np.max(valores)),
+            }
+            for p, valor in zip(percentiles, np.percentile(valores, percentiles)):
+                metrica[f"p{p}"] = float(valor)
+            resumen[nombre] = metrica
+        return resumen
+
+
+class EscenariosPrecios:
+    """
+    Evalúa un plan ya ejecutado bajo muchos escenarios de precios.
+
+    Con las reglas de costo de ``CosteoPlanes``, el costo del bien final es
+    lineal en los precios: una parte fija (costos primarios y sobrecostos de
+    cada orden) más la suma de los precios de las compras. Por eso basta con
+    contar las compras del plan por (comprador, vendedor, bien) una sola vez;
+    cada escenario se evalúa con una indexación y un producto punto sobre esos
+    conteos, para bloques de escenarios a la vez.
+
+    Los precios de los escenarios son un arreglo de forma
+    (n_escenarios, agentes, agentes) o (n_escenarios, agentes, agentes, bienes),
+    con ejes (comprador, vendedor[, bien]). Puede ser un np.memmap o un
+    iterable de bloques con esa forma, de modo que los escenarios no tienen que
+    caber en memoria.
+    """
+
+    def __init__(
+        self,
+        transacciones,
+        cost_strategy=None,
+        info_agentes: Dict[str, Dict] = None,
+        indices_agentes: Dict[str, int] = None,
+        indices_bienes: Dict[str, int] = None,
+        costos_primarios: Dict[str, float] = None,
+    ):
+        """
+        Args:
+            transacciones (Iterable[tuple]): Transacciones
+                ``(paso, agentes, tipo, bien)`` de ``Planner.ejecutar_plan``.
+            cost_strategy (CostStrategy, optional): Estrategia de costos del
+                economy; sin ella no hay sobrecostos por orden.
+            info_agentes (Dict[str, Dict], optional): Información complementaria
+                de cada agente para ``cost_strategy``.
+            indices_agentes (Dict[str, int], optional): Posición de cada agente
+                en los ejes de agentes. Por defecto, el orden de AGENTES.
+            indices_bienes (Dict[str, int], optional): Posición de cada bien en el
+                eje de bienes; necesario solo con precios por bien.
+            costos_primarios (Dict[str, float], optional): Costo inicial de cada
+                unidad de los bienes primarios. Por defecto, 0.
+        """
+        indices_agentes = indices_agentes or {agente: i for i, agente in enumerate(AGENTES)}
+        info_agentes = info_agentes or {}
+        costos_primarios = costos_primarios or {}
+        sobrecosto = {
+            agente: 0.0
+            if cost_strategy is None
+            else cost_strategy.calculate_cost(0.0, info_agentes.get(agente, {}))
+            for agente in AGENTES
+        }
+        mercado = AGENTES[MKT]
+        transfronterizos = {AGENTES[NCT], AGENTES[ZF]}
+
+        # Conteo de compras por (comprador, vendedor, bien) y parte fija del costo
+        conteos: Dict[tuple, int] = {}
+        costo_fijo = 0.0
+        for _, agentes, tipo, bien in transacciones:
+            costo_fijo += sobrecosto[agentes[0]]
+            if tipo == "compra":
+                clave = (agentes[0], agentes[1], bien)
+                conteos[clave] = conteos.get(clave, 0) + 1
+                if agentes[1] == mercado:
+                    costo_fijo += costos_primarios.get(bien, 0.0)
+        self.costo_fijo = costo_fijo
+        self.n_compras = sum(conteos.values())
+
+        claves = list(conteos)
+        self._compradores = np.array([indices_agentes[c] for c, _, _ in claves], dtype=np.int64)
+        self._vendedores = np.array([indices_agentes[v] for _, v, _ in claves], dtype=np.int64)
+        self._conteos = np.array([conteos[clave] for clave in claves], dtype=np.float64)
+        self._transfronteriza = np.array(
+            [{c, v} == transfronterizos for c, v, _ in claves], dtype=bool
+        )
+        if indices_bienes is None:
+            self._bienes = None
+        else:
+            try:
+                self._bienes = np.array([indices_bienes[b] for _, _, b in claves], dtype=np.int64)
+            except KeyError as err:
+                raise ValueError(f"El bien {err.args[0]} no está en indices_bienes") from None
+
+    def _evaluar_bloque(self, precios: np.ndarray) -> tuple:
+        precios = np.asarray(precios)
+        if precios.ndim == 3:
+            pagados = precios[:, self._compradores, self._vendedores]
+        elif precios.ndim == 4:
+            if self._bienes is None:
+                raise ValueError("Los precios por bien requieren indices_bienes")
+            pagados = precios[:, self._compradores, self._vendedores, self._bienes]
+        else:
+            raise ValueError(
+                "Los precios deben tener forma (n_escenarios, agentes, agentes[, bienes])"
+            )
+        # pagados: (escenarios del bloque, compras distintas)
+        compras = pagados @ self._conteos
+        transfronterizo = pagados[:, self._transfronteriza] @ self._conteos[self._transfronteriza]
+        return self.costo_fijo + compras, compras, transfronterizo
+
+    def evaluar_bloques(self, precios, tamano_bloque: int = 1024):
+        """
+        Evalúa los escenarios por bloques.
+
+        Args:
+            precios (np.ndarray | Iterable[np.ndarray]): Arreglo de escenarios
+                (se recorre en bloques de ``tamano_bloque``) o iterable de bloques.
+            tamano_bloque (int): Escenarios por bloque si ``precios`` es un arreglo.
+
+        Yields:
+            MetricasEscenarios: Las métricas de cada bloque, en orden.
+        """
+        if isinstance(precios, np.ndarray):
+            bloques = (
+                precios[inicio : inicio + tamano_bloque]
+                for inicio in range(0, len(precios), tamano_bloque)
+            )
+        else:
+            bloques = precios
+        for bloque in bloques:
+            yield MetricasEscenarios(*self._evaluar_bloque(bloque))
+
+    def evaluar(self, precios, tamano_bloque: int = 1024) -> MetricasEscenarios:
+        """
+        Evalúa todos los escenarios de ``precios``.
+
+        La memoria de trabajo es del orden de tamano_bloque por el número de
+        combinaciones (comprador, vendedor, bien) distintas del plan; los
+        resultados ocupan tres floats por escenario.
+        """
+        bloques = list(self.evaluar_bloques(precios, tamano_bloque))
+        if not bloques:
+            vacio = np.empty(0)
+            return MetricasEscenarios(vacio, vacio, vacio)
+        return MetricasEscenarios(
+            *(
+                np.concatenate([getattr(b, campo) for b in bloques])
+                for campo in ("costo_final", "costo_compras", "costo_transfronterizo")
+            )
+        )
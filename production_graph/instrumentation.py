@@ -0,0 +1,128 @@
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict
+
+
+class Instrumentacion:
+    """
+    Acumula tiempos por etapa, histogramas de latencia por tipo de orden y
+    contadores, con un costo bajo por medición (``time.perf_counter_ns`` y
+    sumas enteras).
+
+    La instrumentación está apagada por defecto: Planner, ProcesoProductivo y
+    OrderExecutor solo miden si se les entrega una instancia. Con ``None`` cada
+    punto de medición se reduce a una comparación.
+
+    Los histogramas usan baldes en potencias de 2 nanosegundos: el balde ``b``
+    cuenta las latencias en [2**(b-1), 2**b).
+    """
+
+    def __init__(self):
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta todas las mediciones."""
+        # nombre -> [conteo, total_ns, min_ns, max_ns]
+        self._etapas: Dict[str, list] = {}
+        # tipo -> [conteo, total_ns, min_ns, max_ns, baldes]
+        self._latencias: Dict[str, list] = {}
+        self._contadores: Dict[str, int] = defaultdict(int)
+
+    def acumular(self, nombre: str, ns: int):
+        """Suma una duración de ``ns`` nanosegundos a la etapa ``nombre``."""
+        etapa = self._etapas.get(nombre)
+        if etapa is None:
+            self._etapas[nombre] = [1, ns, ns, ns]
+            return
+        etapa[0] += 1
+        etapa[1] += ns
+        if ns < etapa[2]:
+            etapa[2] = ns
+        if ns > etapa[3]:
+            etapa[3] = ns
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        """Context manager que mide su bloque como una ejecución de ``nombre``."""
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.acumular(nombre, time.perf_counter_ns() - inicio)
+
+    def registrar_latencia(self, tipo: str, ns: int):
+        """Registra la latencia de una orden de tipo ``tipo``."""
+        latencia = self._latencias.get(tipo)
+        if latencia is None:
+            latencia = self._latencias[tipo] = [0, 0, ns, ns, [0] * 65]
+        latencia[0] += 1
+        latencia[1] += ns
+        if ns < latencia[2]:
+            latencia[2] = ns
+        if ns > latencia[3]:
+            latencia[3] = ns
+        latencia[4][min(ns.bit_length(), 64)] += 1
+
+    def contar(self, nombre: str, n: int = 1):
+        """Incrementa el contador ``nombre`` en ``n``."""
+        self._contadores[nombre] += n
+
+    def estadisticas(self) -> Dict:
+        """
+        Returns:
+            Dict: Diccionario serializable a JSON con las claves ``etapas``
+                (conteo y tiempos en segundos), ``latencias`` (conteo, tiempos y
+                histograma por tipo de orden) y ``contadores``.
+        """
+        etapas = {
+            nombre: {
+                "conteo": conteo,
+                "total_s": total / 1e9,
+                "media_s": total / conteo / 1e9,
+                "min_s": minimo / 1e9,
+                "max_s": maximo / 1e9,
+            }
+            for nombre, (conteo, total, minimo, maximo) in self._etapas.items()
+        }
+        latencias = {
+            tipo: {
+                "conteo": conteo,
+                "total_s": total / 1e9,
+                "media_s": total / conteo / 1e9,
+                "min_s": minimo / 1e9,
+                "max_s": maximo / 1e9,
+                "histograma": {
+                    "limite_superior_ns": [2**b for b, c in enumerate(baldes) if c],
+                    "conteo": [c for c in baldes if c],
+                },
+            }
+            for tipo, (conteo, total, minimo, maximo, baldes) in self._latencias.items()
+        }
+        return {
+            "etapas": etapas,
+            "latencias": latencias,
+            "contadores": dict(self._contadores),
+        }
+
+    def volcar_json(self, ruta: str = None) -> str:
+        """
+        Serializa ``estadisticas()`` como JSON y, si se entrega ``ruta``, lo
+        escribe en ese archivo.
+
+        Returns:
+            str: El JSON generado.
+        """
+        texto = json.dumps(self.estadisticas(), indent=2)
+        if ruta is not None:
+            with open(ruta, "w") as archivo:
+                archivo.write(texto)
+        return texto
+
+
+def etapa(instrumentacion: "Instrumentacion", nombre: str):
+    """``instrumentacion.etapa(nombre)``, o un contexto vacío si es None."""
+    if instrumentacion is None:
+        return nullcontext()
+    return instrumentacion.etapa(nombre)
@@ -0,0 +1,165 @@
+import math
+import numpy as np
+from typing import Dict, List, Tuple
+
+try:
+    from .planner import AGENTES, NCT, ZF, MKT
+except ImportError:  # Ejecutado como script desde production_graph/
+    from planner import AGENTES, NCT, ZF, MKT
+
+
+class PlanOptimizer:
+    """
+    Encuentra la asignación NCT/ZF de costo mínimo para un plan de producción.
+
+    El costo de un plan es la suma, sobre sus transacciones, de:
+
+    - compras: el precio ``price_matrix.get_price(comprador, vendedor, bien)``,
+      más ``costo_cruce`` si la compra es entre NCT y ZF;
+    - el sobrecosto de cada orden (compra o producción) del agente que la
+      ejecuta, ``cost_strategy.calculate_cost(0, info_agentes[agente])``, como
+      lo aplican BuyerOrderExecution y ProductionOrderExecution.
+
+    Con los requerimientos por conteo de caminos, cada unidad de un bien es
+    consumida por exactamente una unidad de uno de sus productos: el plan es
+    un árbol (el desdoblamiento del DAG) y todas las copias de un mismo bien
+    tienen subárboles idénticos. Por eso basta una programación dinámica sobre
+    el orden topológico con estado (bien, agente que lo tiene), en O((V+E)·4).
+    El costo del Planner solo depende de cuántas unidades de cada bien tiene
+    cada agente, así que el óptimo del árbol es el óptimo del plan.
+    """
+
+    def __init__(
+        self,
+        planner,
+        price_matrix,
+        costo_cruce: float = 0.0,
+        cost_strategy=None,
+        info_agentes: Dict[str, Dict] = None,
+        indices_agentes: Dict[str, int] = None,
+    ):
+        """
+        Args:
+            planner (Planner): Planner con el proceso productivo a optimizar.
+            price_matrix (PriceMatrix): Precios (comprador, vendedor[, bien]).
+            costo_cruce (float): Costo adicional de cada compra entre NCT y ZF.
+            cost_strategy (CostStrategy, optional): Estrategia de costos del
+                economy; sin ella no hay sobrecostos por orden.
+            info_agentes (Dict[str, Dict], optional): Información complementaria
+                de cada agente para ``cost_strategy``.
+            indices_agentes (Dict[str, int], optional): Fila/columna de cada
+                agente en la matriz de precios. Por defecto, el orden de AGENTES.
+        """
+        self._planner = planner
+        self._proceso = planner._proceso_productivo
+        self._precios = price_matrix
+        self.costo_cruce = costo_cruce
+        self._indices = indices_agentes or {agente: i for i, agente in enumerate(AGENTES)}
+
+        info_agentes = info_agentes or {}
+        self._sobrecosto = [
+            0.0
+            if cost_strategy is None
+            else cost_strategy.calculate_cost(0.0, info_agentes.get(agente, {}))
+            for agente in AGENTES
+        ]
+
+    def _precio(self, comprador: int, vendedor: int, bien: str) -> float:
+        return self._precios.get_price(
+            self._indices[AGENTES[comprador]], self._indices[AGENTES[vendedor]], bien
+        )
+
+    def costo_compra(self, comprador: int, vendedor: int, bien: str) -> float:
+        """Costo de una compra de una unidad de ``bien``."""
+        costo = self._precio(comprador, vendedor, bien) + self._sobrecosto[comprador]
+        if {comprador, vendedor} == {NCT, ZF}:
+            costo += self.costo_cruce
+        return costo
+
+    def costo_transacciones(self, transacciones) -> float:
+        """Costo de una secuencia de transacciones de ``Planner.ejecutar_plan``."""
+        costo = 0.0
+        for _, agentes, tipo, bien in transacciones:
+            if tipo == "compra":
+                costo += self.costo_compra(
+                    AGENTES.index(agentes[0]), AGENTES.index(agentes[1]), bien
+                )
+            else:
+                costo += self._sobrecosto[AGENTES.index(agentes[0])]
+        return costo
+
+    def costo_plan(self, plan: List[int]) -> float:
+        """Ejecuta ``plan`` con el Planner y devuelve su costo."""
+        return self.costo_transacciones(self._planner.ejecutar_plan(plan))
+
+    def optimizar(self) -> Tuple[List[int], float]:
+        """
+        Calcula el plan de costo mínimo.
+
+        Returns:
+            Tuple[List[int], float]: El plan 0/1 (1 = NCT, 0 = ZF) y su costo.
+        """
+        indice = self._proceso.get_indice()
+        clasificacion = self._proceso.get_clasificacion_bienes()
+        cantidades = self._proceso.get_cantidades_requeridas()
+        agentes = (NCT, ZF)
+
+        # mejor[g][a]: costo mínimo de tener una unidad de g en manos de a
+        # (incluido todo lo necesario para producirla);
+        # eleccion[g][a]: agente que consigue g cuando lo necesita a
+        mejor = {}
+        dado_padre = {}
+        eleccion = {}
+        for bien in indice.nodos:
+            if bien not in cantidades:
+                continue
+            insumos = self._proceso.get_insumos_con_coeficientes(bien)
+            mejor[bien] = []
+            for a in agentes:
+                if clasificacion[bien] == "bien_primario":
+                    costo = self.costo_compra(a, MKT, bien)
+                else:
+                    costo = self._sobrecosto[a]
+                    for insumo, coeficiente in insumos:
+                        costo += math.ceil(coeficiente) * dado_padre[insumo][a]
+                mejor[bien].append(costo)
+
+            # Ante empate se prefiere al mismo agente (sin compra cruzada)
+            dado_padre[bien] = []
+            eleccion[bien] = []
+            for a in agentes:
+                opciones = [
+                    (mejor[bien][b] + (0.0 if b == a else self.costo_compra(a, b, bien)), b != a, b)
+                    for b in agentes
+                ]
+                costo, _, b = min(opciones)
+                dado_padre[bien].append(costo)
+                eleccion[bien].append(b)
+
+        bien_final = next(b for b in cantidades if clasificacion[b] == "bien_final")
+        agente_final = min(agentes, key=lambda a: (mejor[bien_final][a], a))
+        costo_optimo = mejor[bien_final][agente_final]
+
+        # Unidades de cada bien en manos de cada agente (en orden topológico inverso)
+        unidades = {bien: [0, 0] for bien in mejor}
+        unidades[bien_final][agente_final] = 1
+        for bien in reversed(indice.nodos):
+            if bien not in mejor:
+                continue
+            for insumo, coeficiente in self._proceso.get_insumos_con_coeficientes(bien):
+                for a in agentes:
+                    unidades[insumo][eleccion[insumo][a]] += (
+                        math.ceil(coeficiente) * unidades[bien][a]
+                    )
+
+        # Las primeras unidades de cada bien van a NCT y el resto a ZF
+        bienes, _ = self._proceso.get_plantilla_plan()
+        plan = np.zeros(len(bienes), dtype=np.int64)
+        nodos = indice.nodos
+        asignadas = {}
+        for posicion, bien_id in enumerate(bienes.tolist()):
+            bien = nodos[bien_id]
+            k = asignadas.get(bien, 0)
+            plan[posicion] = 1 if k < unidades[bien][NCT] else 0
+            asignadas[bien] = k + 1
+        return plan.tolist(), costo_optimo
@@ -0,0 +1,229 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+try:
+    from .planner import AGENTES, Planner, ResultadosPlanes, NCT, ZF
+except ImportError:  # Ejecutado como script desde production_graph/
+    from planner import AGENTES, Planner, ResultadosPlanes, NCT, ZF
+
+
+# Manifiesto de un bloque compartido: nombre -> (offset, dtype, forma)
+Manifiesto = Dict[str, Tuple[int, str, Tuple[int, ...]]]
+
+
+def _crear_bloque(arreglos: Dict[str, np.ndarray]):
+    """
+    Copia varios arreglos a un solo bloque de memoria compartida.
+
+    Returns:
+        Tuple[shared_memory.SharedMemory, Manifiesto]: El bloque y la
+            descripción necesaria para adjuntarlo desde otro proceso.
+    """
+    manifiesto = {}
+    offset = 0
+    for nombre, arreglo in arreglos.items():
+        offset = -(-offset // 64) * 64  # Alinear cada arreglo a 64 bytes
+        manifiesto[nombre] = (offset, arreglo.dtype.str, arreglo.shape)
+        offset += arreglo.nbytes
+    bloque = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for nombre, arreglo in arreglos.items():
+        _vista(bloque, manifiesto[nombre])[...] = arreglo
+    return bloque, manifiesto
+
+
+def _vista(bloque: shared_memory.SharedMemory, entrada) -> np.ndarray:
+    offset, dtype, forma = entrada
+    return np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloque.buf, offset=offset)
+
+
+def _adjuntar(nombre: str) -> shared_memory.SharedMemory:
+    """
+    Adjunta un bloque existente. Los trabajadores comparten el resource tracker
+    del proceso principal, que es el único que libera (unlink) los bloques.
+    """
+    return shared_memory.SharedMemory(name=nombre)
+
+
+# Estado de cada proceso trabajador
+_TRABAJADOR = {}
+
+
+def _iniciar_trabajador(nombre_grafo: str, manifiesto_grafo: Manifiesto):
+    """Adjunta el grafo compilado y reconstruye los pasos una sola vez por proceso."""
+    bloque = _adjuntar(nombre_grafo)
+    arreglos = {k: _vista(bloque, v) for k, v in manifiesto_grafo.items()}
+    _TRABAJADOR["grafo"] = bloque
+    _TRABAJADOR["pasos"] = _pasos_desde_arreglos(arreglos)
+    _TRABAJADOR["stock_inicial"] = arreglos["stock_inicial"]
+    _TRABAJADOR["llamada"] = None
+
+
+def _evaluar_chunk(
+    nombre_llamada: str, manifiesto_llamada: Manifiesto, inicio: int, fin: int
+):
+    """Evalúa los planes [inicio, fin) y escribe los resultados en memoria compartida."""
+    llamada = _TRABAJADOR["llamada"]
+    if llamada is None or llamada[0].name != nombre_llamada:
+        if llamada is not None:
+            llamada[0].close()
+        bloque = _adjuntar(nombre_llamada)
+        llamada = (bloque, {k: _vista(bloque, v) for k, v in manifiesto_llamada.items()})
+        _TRABAJADOR["llamada"] = llamada
+    arreglos = llamada[1]
+
+    stock_inicial = _TRABAJADOR["stock_inicial"]
+    Planner._ejecutar_lote(
+        _TRABAJADOR["pasos"],
+        1 - arreglos["planes"][inicio:fin].astype(np.int64),
+        np.repeat(stock_inicial[None], fin - inicio, axis=0),
+        arreglos["compras"][inicio:fin],
+        arreglos["producciones"][inicio:fin],
+        arreglos["paso_fallo"][inicio:fin],
+    )
+    return inicio
+
+
+def _pasos_a_arreglos(pasos) -> Dict[str, np.ndarray]:
+    """Codifica los pasos compilados del Planner como arreglos planos."""
+    unidades_por_paso = [len(paso[4]) for paso in pasos]
+    insumos_indptr = np.zeros(len(pasos) + 1, dtype=np.int64)
+    np.cumsum(unidades_por_paso, out=insumos_indptr[1:])
+    insumos = [insumo for paso in pasos for insumo in paso[4]]
+    return {
+        "columna": np.array([paso[0] for paso in pasos], dtype=np.int64),
+        "bien": np.array([paso[1] for paso in pasos], dtype=np.int64),
+        "es_compra": np.array([paso[2] for paso in pasos], dtype=bool),
+        "inicial": np.array([paso[3] for paso in pasos], dtype=bool),
+        "insumos_indptr": insumos_indptr,
+        "insumos_id": np.array([i for i, _ in insumos], dtype=np.int64),
+        "insumos_unidades": np.array([u for _, u in insumos], dtype=np.int64),
+    }
+
+
+def _pasos_desde_arreglos(arreglos: Dict[str, np.ndarray]):
+    indptr = arreglos["insumos_indptr"].tolist()
+    ids = arreglos["insumos_id"].tolist()
+    unidades = arreglos["insumos_unidades"].tolist()
+    return [
+        (columna, bien, es_compra, inicial, list(zip(ids[a:b], unidades[a:b])))
+        for columna, bien, es_compra, inicial, a, b in zip(
+            arreglos["columna"].tolist(),
+            arreglos["bien"].tolist(),
+            arreglos["es_compra"].tolist(),
+            arreglos["inicial"].tolist(),
+            indptr[:-1],
+            indptr[1:],
+        )
+    ]
+
+
+class ParallelPlanner:
+    """
+    Evalúa planes 0/1 en varios procesos con la semántica de
+    ``Planner.ejecutar_planes``.
+
+    Los pasos compilados del plan y el stock inicial se copian una sola vez a
+    memoria compartida; cada trabajador los adjunta sin copiarlos al iniciar.
+    En cada llamada, los planes y los arreglos de resultados también viven en
+    memoria compartida, así que a los trabajadores solo se les envían rangos
+    de filas y cada uno escribe sus resultados en su propio rango: el orden de
+    los resultados es siempre el de los planes.
+
+    Se usa como context manager (o llamando a ``close``) para liberar el pool
+    y la memoria compartida.
+    """
+
+    def __init__(
+        self, planner: Planner, n_trabajadores: int = None, tamano_chunk: int = 16384
+    ):
+        """
+        Args:
+            planner (Planner): Planner cuyo proceso productivo se evalúa.
+            n_trabajadores (int, optional): Número de procesos. Por defecto,
+                ``os.cpu_count()``.
+            tamano_chunk (int): Planes por tarea enviada a un trabajador.
+        """
+        self._planner = planner
+        self.n_trabajadores = n_trabajadores or os.cpu_count() or 1
+        self.tamano_chunk = tamano_chunk
+
+        pasos = planner._compilar_pasos()
+        self._n_requerido = planner._n_requerido
+        arreglos = _pasos_a_arreglos(pasos)
+        arreglos["stock_inicial"] = planner._stock_inicial(
+            len(planner._proceso_productivo.get_indice())
+        )
+        self._grafo, manifiesto = _crear_bloque(arreglos)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.n_trabajadores,
+            initializer=_iniciar_trabajador,
+            initargs=(self._grafo.name, manifiesto),
+        )
+
+    def ejecutar_planes(self, planes: np.ndarray) -> ResultadosPlanes:
+        """
+        Evalúa un arreglo de planes de forma (n_planes, largo_plan) repartido
+        en chunks de ``tamano_chunk`` entre los trabajadores.
+
+        Returns:
+            ResultadosPlanes: Resultados por plan, en el orden de ``planes``.
+        """
+        planes = np.asarray(planes)
+        if planes.ndim != 2:
+            raise ValueError("Los planes deben ser un arreglo 2-D (n_planes, largo_plan).")
+        if planes.shape[1] < self._n_requerido:
+            raise ValueError(
+                "El plan debe tener al menos un elemento por cada paso necesario"
+            )
+
+        n_planes = planes.shape[0]
+        n_agentes = len(AGENTES)
+        bloque, manifiesto = _crear_bloque(
+            {
+                "planes": planes[:, : self._n_requerido].astype(np.int8),
+                "compras": np.zeros((n_planes, n_agentes, n_agentes), dtype=np.int64),
+                "producciones": np.zeros((n_planes, n_agentes), dtype=np.int64),
+                "paso_fallo": np.full(n_planes, -1, dtype=np.int64),
+            }
+        )
+        try:
+            tareas = [
+                self._pool.submit(
+                    _evaluar_chunk,
+                    bloque.name,
+                    manifiesto,
+                    inicio,
+                    min(inicio + self.tamano_chunk, n_planes),
+                )
+                for inicio in range(0, n_planes, self.tamano_chunk)
+            ]
+            for tarea in tareas:
+                tarea.result()
+
+            compras = _vista(bloque, manifiesto["compras"]).copy()
+            return ResultadosPlanes(
+                compras=compras,
+                producciones=_vista(bloque, manifiesto["producciones"]).copy(),
+                compras_transfronterizas=compras[:, NCT, ZF] + compras[:, ZF, NCT],
+                paso_fallo=_vista(bloque, manifiesto["paso_fallo"]).copy(),
+            )
+        finally:
+            bloque.close()
+            bloque.unlink()
+
+    def close(self):
+        """Detiene los trabajadores y libera la memoria compartida del grafo."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._grafo.close()
+            self._grafo.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
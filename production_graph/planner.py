@@ -1,48 +1,178 @@
-import networkx as nx
+import json
+import math
+import os
+import time
 import numpy as np
-from typing import List, Dict, Tuple
-import production_graph as pg
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Dict, Tuple
+
+try:
+    from . import production_graph as pg
+    from .instrumentation import Instrumentacion, etapa
+    from .cache import CacheProcesos, huella_grafo
+except ImportError:  # Ejecutado como script desde production_graph/
+    import production_graph as pg
+    from instrumentation import Instrumentacion, etapa
+    from cache import CacheProcesos, huella_grafo
+
+if TYPE_CHECKING:  # networkx es opcional: solo se usa si el usuario entrega un nx.DiGraph
+    import networkx as nx
+
+
+# Orden de los agentes en las evaluaciones por lotes (coincide con el orden de
+# Planner._agentes, que define la prioridad de los vendedores)
+AGENTES = ("NCT", "ZF", "MKT")
+NCT, ZF, MKT = 0, 1, 2
 
 
 class Agente:
+    """
+    Agente del planner. El inventario se lleva como contadores enteros por
+    bien, en un arreglo de NumPy indexado por el id del bien. La identidad de
+    cada unidad solo se guarda si se pide con ``registrar_unidades``.
+    """
+
+    __slots__ = ("_nombre", "_id", "_ids_bienes", "_stock", "_unidades")
+
     id = 0
 
-    def __init__(self, nombre, inventario: Dict[str, List[str]]):
+    # Si es True, los atributos inexistentes devuelven un mensaje en lugar de
+    # lanzar AttributeError (útil al depurar en consola)
+    debug = False
+
+    def __init__(
+        self,
+        nombre,
+        inventario: Dict[str, List[str]] = None,
+        ids_bienes: Dict[str, int] = None,
+        registrar_unidades: bool = False,
+    ):
         self._nombre = nombre
         self._id = Agente.id
         Agente.id += 1
-        self._inventario = inventario
+        self._ids_bienes = dict(ids_bienes) if ids_bienes is not None else {}
+        self._stock = np.zeros(len(self._ids_bienes), dtype=np.int64)
+        self._unidades = defaultdict(deque) if registrar_unidades else None
+        for bien, activos in (inventario or {}).items():
+            for activo in activos:
+                self.agregar_inventario(bien, activo)
 
-    def __getattribute__(self, name):
-        # Si el atributo existe en la clase, devuélvelo normalmente
-        try:
-            return object.__getattribute__(self, name)
-        except AttributeError:
-            # Si no existe, devolver el mensaje personalizado
+    def __getattr__(self, name):
+        # Solo se llama cuando el atributo no existe
+        if Agente.debug:
             return f"El agente {self._id} no tiene el atributo {name}"
+        raise AttributeError(f"El agente no tiene el atributo {name}")
 
-    def agregar_inventario(self, bien, activo):
-        if bien in self._inventario:
-            self._inventario[bien].append(activo)
-        else:
-            self._inventario[bien] = [activo]
+    @property
+    def registra_unidades(self) -> bool:
+        return self._unidades is not None
 
-    def eliminar_inventario(self, bien, activo):
-        if bien in self._inventario:
-            self._inventario[bien].remove(activo)
-            if len(self._inventario[bien]) == 0:
-                del self._inventario[bien]
-        else:
-            print(f"El agente {self._id} no tiene el bien {bien}")
+    def _id_bien(self, bien) -> int:
+        i = self._ids_bienes.get(bien)
+        if i is None:
+            i = self._ids_bienes[bien] = len(self._ids_bienes)
+        if i >= len(self._stock):
+            extra = max(i + 1, 2 * len(self._stock)) - len(self._stock)
+            self._stock = np.concatenate([self._stock, np.zeros(extra, dtype=np.int64)])
+        return i
+
+    def cantidad(self, bien) -> int:
+        """Número de unidades de ``bien`` en el inventario."""
+        i = self._ids_bienes.get(bien)
+        if i is None or i >= len(self._stock):
+            return 0
+        return int(self._stock[i])
+
+    def inventario(self) -> Dict[str, int]:
+        """Inventario como diccionario bien -> cantidad (solo bienes con stock)."""
+        return {
+            bien: int(self._stock[i])
+            for bien, i in self._ids_bienes.items()
+            if i < len(self._stock) and self._stock[i]
+        }
+
+    def unidades(self, bien) -> List[str]:
+        """Identidades de las unidades de ``bien`` (requiere ``registrar_unidades``)."""
+        if self._unidades is None:
+            raise ValueError(f"El agente {self._id} no registra unidades")
+        return list(self._unidades.get(bien, ()))
+
+    def agregar_inventario(self, bien, activo=None):
+        i = self._id_bien(bien)
+        self._stock[i] += 1
+        if self._unidades is not None:
+            self._unidades[bien].append(activo)
+
+    def agregar_unidades(self, bien, cantidad: int, activos: List[str] = None):
+        """Agrega ``cantidad`` unidades de ``bien`` de una sola vez."""
+        i = self._id_bien(bien)
+        self._stock[i] += cantidad
+        if self._unidades is not None:
+            if activos is None:
+                activos = [None] * cantidad
+            self._unidades[bien].extend(activos)
+
+    def eliminar_inventario(self, bien, activo=None):
+        """
+        Elimina una unidad de ``bien``: ``activo`` si se indica, o la primera
+        en llegar. Devuelve la unidad eliminada (None si no se registran). Si
+        el agente no tiene ``bien`` no hace nada y devuelve None.
+        """
+        if not self.cantidad(bien):
+            return None
+        self._stock[self._ids_bienes[bien]] -= 1
+        if self._unidades is None:
+            return None
+        if activo is None:
+            return self._unidades[bien].popleft()
+        self._unidades[bien].remove(activo)
+        return activo
+
+    def guardar_estado(self):
+        """Copia del stock (y de las unidades, si se registran)."""
+        unidades = None
+        if self._unidades is not None:
+            unidades = {bien: tuple(u) for bien, u in self._unidades.items() if u}
+        return self._stock.copy(), unidades
+
+    def restaurar_estado(self, estado):
+        """Restaura un estado devuelto por ``guardar_estado``."""
+        stock, unidades = estado
+        self._stock = stock.copy()
+        if unidades is not None:
+            self._unidades = defaultdict(
+                deque, {bien: deque(u) for bien, u in unidades.items()}
+            )
 
 
 class ProcesoProductivo:
-    def __init__(self, pgraph: nx.DiGraph):
+    def __init__(
+        self,
+        pgraph: "nx.DiGraph",
+        instrumentacion: Instrumentacion = None,
+        cache: "CacheProcesos" = None,
+        huella: str = None,
+    ):
         """
         Inicializa un objeto Proceso_productivo con un grafo de producción.
 
         Args:
-            pgraph (nx.DiGraph): Grafo de producción.
+            pgraph (nx.DiGraph | pg.GrafoProduccion): Grafo de producción. También
+                se acepta una lista de aristas o un diccionario de adyacencia, que
+                se convierten en ``pg.GrafoProduccion`` sin usar networkx. Se
+                guarda una copia, así que las modificaciones (``add_edge``,
+                ``remove_edge``, ...) no afectan al grafo entregado.
+            instrumentacion (Instrumentacion, optional): Si se entrega, mide el
+                cálculo de requerimientos en la etapa "requerimientos".
+            cache (CacheProcesos, optional): Caché en disco del índice compilado y
+                de los requerimientos, buscada por la huella del grafo. Si hay una
+                entrada válida no se vuelve a compilar el grafo; si no, se compila
+                y se guarda.
+            huella (str, optional): Huella del grafo para la caché, si ya se conoce
+                (por ejemplo, guardada junto al grafo); evita recorrerlo para
+                calcular ``huella_grafo``.
 
         Attributes:
             _insumos_directos (Dict[str, List[str]]): Diccionario que mapea cada nodo a una lista de nodos
@@ -51,16 +181,320 @@ class ProcesoProductivo:
                 a los que está directamente conectado en un grafo dirigido.
             _clasificacion_bienes (Dict[str, str]): Diccionario que mapea cada nodo a una lista de nodos
                 clasificados en "bien_primario", "bien_intermedio" o "bien_final".
+            _indice (pg.ProductionGraphIndex): Índice compilado del grafo, construido una sola
+                vez y del cual se derivan los diccionarios anteriores. Tras una
+                modificación del grafo (``add_edge``, ``remove_edge``, ``add_good``,
+                ``remove_good``) se vuelve a compilar solo cuando se pide.
+            _posicion (Dict[str, int]): Posición de cada nodo en un orden topológico
+                que se mantiene incrementalmente al modificar el grafo (para
+                detectar ciclos y propagar requerimientos).
+            _brutos (Dict[str, float]): Requerimiento bruto de cada nodo (número
+                de caminos hasta el bien final, ponderado por los coeficientes
+                redondeados hacia arriba, como los consume cada orden).
+        """
+        grafo = pg.como_grafo(pgraph)
+        self._pgraph = grafo.copy() if grafo is pgraph else grafo
+
+        compilado = None
+        if cache is not None:
+            huella = huella or huella_grafo(self._pgraph)
+            compilado = cache.cargar(huella, self._pgraph)
+
+        if compilado is None:
+            self._indice = pg.ProductionGraphIndex(self._pgraph)
+        else:
+            self._indice, brutos = compilado
+
+        self._insumos_directos = pg.generar_insumos_directos(self._indice)
+
+        self._productos_directos = pg.generar_productos_directos(self._indice)
+
+        self._clasificacion_bienes = pg.clasificar_bienes(self._indice)  # diccionario
+
+        self._insumos_coeficientes = self._indice.insumos_con_coeficientes_por_nodo()
+
+        self._posicion = {nodo: i for i, nodo in enumerate(self._indice.nodos)}
+        self._siguiente_posicion = len(self._indice.nodos)
+        self._bien_final = pg.get_bienes_finales(self._indice)[0]
+
+        # Las cantidades requeridas se arman desde _brutos cuando se piden
+        self._cantidades = None
+        with etapa(instrumentacion, "requerimientos"):
+            if compilado is None:
+                self._calcular_brutos()
+            else:
+                self._brutos = dict(zip(self._indice.nodos, brutos))
+
+        if cache is not None and compilado is None:
+            cache.guardar(huella, self._indice, list(self._brutos.values()))
+
+    def _calcular_brutos(self):
+        """Calcula desde cero el requerimiento bruto de todos los nodos."""
+        indice = self.get_indice()
+        brutos = pg.contar_caminos_hacia(
+            indice, indice.ids[self._bien_final], unidades_enteras=True
+        )
+        self._brutos = dict(zip(indice.nodos, brutos))
+
+    @property
+    def cantidades_requeridas(self) -> Dict[str, int]:
+        """
+        Cantidad requerida de cada bien para producir una unidad del bien final:
+        primero los bienes primarios y luego los intermedios, en orden
+        topológico, y al final el bien final con cantidad 1 (ver
+        ``pg.generar_cantidad_requerida_bienes``).
+
+        El orden y el bien final son los del orden topológico por generaciones
+        (``pg.orden_topologico``), así que tras cualquier secuencia de
+        modificaciones coinciden con los de un ``ProcesoProductivo`` construido
+        desde cero con el mismo grafo (los planes son posicionales). Las
+        cantidades salen de los requerimientos que se mantienen al modificar el
+        grafo; no se recompila el índice, que se arma solo cuando se pide
+        (``get_indice``, plantilla del plan, Planner). Lo que no se mantiene
+        incrementalmente es ese orden canónico: la primera lectura después de
+        una modificación lo recalcula con una pasada de Kahn, O(V + E), y, si
+        cambió el bien final, también los requerimientos.
+        """
+        if self._cantidades is None:
+            if self._indice is not None:
+                orden = self._indice.nodos
+            else:
+                orden = pg.orden_topologico(self._pgraph)
+            self._sincronizar_bien_final(orden)
+            cantidades = {}
+            for clase in ("bien_primario", "bien_intermedio"):
+                for bien in orden:
+                    if self._clasificacion_bienes[bien] == clase:
+                        cantidades[bien] = int(round(self._brutos[bien]))
+            cantidades[self._bien_final] = 1
+            self._cantidades = cantidades
+        return self._cantidades
+
+    # ------------------------ Modificaciones incrementales del grafo
+
+    def add_good(self, bien: str, insumos=(), productos=()):
+        """
+        Agrega un bien al proceso productivo y, opcionalmente, sus aristas.
+
+        Args:
+            bien (str): Bien nuevo.
+            insumos (List[str] | Dict[str, float]): Insumos del bien, o mapeo
+                insumo -> coeficiente.
+            productos (List[str] | Dict[str, float]): Productos que usan el bien,
+                o mapeo producto -> coeficiente.
+
+        Raises:
+            ValueError: Si el bien ya existe o alguna arista crea un ciclo.
+        """
+        if bien in self._posicion:
+            raise ValueError(f"El bien '{bien}' ya existe.")
+        self._pgraph.add_node(bien)
+        self._posicion[bien] = self._siguiente_posicion
+        self._siguiente_posicion += 1
+        self._insumos_directos[bien] = []
+        self._productos_directos[bien] = []
+        self._insumos_coeficientes[bien] = []
+        self._clasificacion_bienes[bien] = "bien_primario"
+        self._brutos[bien] = 0
+        self._invalidar()
+
+        for insumo in insumos:
+            coeficiente = insumos[insumo] if isinstance(insumos, dict) else None
+            self.add_edge(insumo, bien, coeficiente)
+        for producto in productos:
+            coeficiente = productos[producto] if isinstance(productos, dict) else None
+            self.add_edge(bien, producto, coeficiente)
+
+    def remove_good(self, bien: str):
+        """Elimina un bien y todas sus aristas del proceso productivo."""
+        if bien not in self._posicion:
+            raise ValueError(f"El bien '{bien}' no existe.")
+        for insumo in list(self._insumos_directos[bien]):
+            self.remove_edge(insumo, bien)
+        for producto in list(self._productos_directos[bien]):
+            self.remove_edge(bien, producto)
+        self._pgraph.remove_node(bien)
+        for datos in (
+            self._posicion,
+            self._insumos_directos,
+            self._productos_directos,
+            self._insumos_coeficientes,
+            self._clasificacion_bienes,
+            self._brutos,
+        ):
+            del datos[bien]
+        self._invalidar()
+        self._actualizar_bien_final()
+
+    def add_edge(self, insumo: str, producto: str, coeficiente: float = None):
+        """
+        Agrega la arista insumo -> producto actualizando solo lo afectado: los
+        insumos/productos directos y la clasificación de ambos extremos, el
+        orden topológico en la región entre ellos y el requerimiento de
+        ``insumo`` y sus ancestros.
+
+        Args:
+            insumo (str): Bien de origen. Se agrega si no existe.
+            producto (str): Bien de destino. Se agrega si no existe.
+            coeficiente (float, optional): Unidades del insumo por unidad del
+                producto (``pg.ATRIBUTO_COEFICIENTE``). Por defecto, 1.
+
+        Raises:
+            ValueError: Si la arista crea un ciclo.
+        """
+        for bien in (insumo, producto):
+            if bien not in self._posicion:
+                self.add_good(bien)
+        if self._pgraph.has_edge(insumo, producto):
+            self.remove_edge(insumo, producto)
+
+        self._reordenar(insumo, producto)
+
+        atributos = {} if coeficiente is None else {pg.ATRIBUTO_COEFICIENTE: coeficiente}
+        self._pgraph.add_edge(insumo, producto, **atributos)
+        coeficiente = 1 if coeficiente is None else coeficiente
+        self._insumos_directos[producto].append(insumo)
+        self._productos_directos[insumo].append(producto)
+        self._insumos_coeficientes[producto].append((insumo, coeficiente))
+        self._actualizar_clasificacion(insumo, producto)
+        self._invalidar()
+
+        if not self._actualizar_bien_final():
+            self._propagar(insumo, math.ceil(coeficiente) * self._brutos[producto])
+
+    def remove_edge(self, insumo: str, producto: str):
+        """
+        Elimina la arista insumo -> producto actualizando solo lo afectado (ver
+        ``add_edge``).
+
+        Raises:
+            ValueError: Si la arista no existe.
         """
-        self._pgraph = pgraph
+        if not self._pgraph.has_edge(insumo, producto):
+            raise ValueError(f"No existe la arista ({insumo}, {producto}).")
+        coeficiente = self._pgraph[insumo][producto].get(pg.ATRIBUTO_COEFICIENTE, 1)
 
-        self._insumos_directos = pg.generar_insumos_directos(self._pgraph)
+        self._pgraph.remove_edge(insumo, producto)
+        self._insumos_directos[producto].remove(insumo)
+        self._productos_directos[insumo].remove(producto)
+        self._insumos_coeficientes[producto] = [
+            par for par in self._insumos_coeficientes[producto] if par[0] != insumo
+        ]
+        self._actualizar_clasificacion(insumo, producto)
+        self._invalidar()
 
-        self._productos_directos = pg.generar_productos_directos(self._pgraph)
+        if not self._actualizar_bien_final():
+            self._propagar(insumo, -math.ceil(coeficiente) * self._brutos[producto])
 
-        self._clasificacion_bienes = pg.clasificar_bienes(self._pgraph)  # diccionario
+    def _invalidar(self):
+        """Descarta el índice compilado y las cantidades tras una modificación."""
+        self._indice = None
+        self._cantidades = None
 
-        self.cantidades_requeridas = pg.generar_cantidad_requerida_bienes(self._pgraph)
+    def _actualizar_clasificacion(self, *bienes: str):
+        for bien in bienes:
+            if not self._insumos_directos[bien]:
+                self._clasificacion_bienes[bien] = "bien_primario"
+            elif not self._productos_directos[bien]:
+                self._clasificacion_bienes[bien] = "bien_final"
+            else:
+                self._clasificacion_bienes[bien] = "bien_intermedio"
+
+    def _alcanzables(self, origen: str, vecinos: Dict[str, List[str]], dentro) -> set:
+        """Nodos alcanzables desde ``origen`` por ``vecinos`` que cumplen ``dentro``."""
+        visitados = {origen}
+        pila = [origen]
+        while pila:
+            for vecino in vecinos[pila.pop()]:
+                if vecino not in visitados and dentro(vecino):
+                    visitados.add(vecino)
+                    pila.append(vecino)
+        return visitados
+
+    def _reordenar(self, insumo: str, producto: str):
+        """
+        Mantiene ``_posicion`` como orden topológico válido al agregar
+        insumo -> producto (algoritmo de Pearce-Kelly): si ``producto`` está
+        antes que ``insumo``, solo se reordenan los nodos de la región entre
+        ambos. Este orden sirve para detectar ciclos y propagar requerimientos;
+        el orden de los planes es el del índice compilado.
+
+        Raises:
+            ValueError: Si la arista crea un ciclo.
+        """
+        posicion = self._posicion
+        inferior, superior = posicion[producto], posicion[insumo]
+        if insumo == producto:
+            raise ValueError(f"La arista ({insumo}, {producto}) crea un ciclo.")
+        if inferior > superior:
+            return
+
+        adelante = self._alcanzables(
+            producto, self._productos_directos, lambda n: posicion[n] <= superior
+        )
+        if insumo in adelante:
+            raise ValueError(f"La arista ({insumo}, {producto}) crea un ciclo.")
+        atras = self._alcanzables(
+            insumo, self._insumos_directos, lambda n: posicion[n] >= inferior
+        )
+
+        # Los ancestros de insumo pasan antes que los descendientes de producto,
+        # reutilizando las mismas posiciones
+        afectados = sorted(atras, key=posicion.__getitem__) + sorted(
+            adelante, key=posicion.__getitem__
+        )
+        posiciones = sorted(posicion[n] for n in afectados)
+        for nodo, nueva in zip(afectados, posiciones):
+            posicion[nodo] = nueva
+
+    def _actualizar_bien_final(self) -> bool:
+        """
+        Si el bien final respecto del cual están calculados los requerimientos
+        dejó de serlo, los marca como desactualizados (se recalculan al pedir
+        las cantidades) y retorna True.
+        """
+        final = self._bien_final
+        if (
+            final is not None
+            and final in self._posicion
+            and self._clasificacion_bienes[final] == "bien_final"
+        ):
+            return False
+        self._bien_final = None
+        return True
+
+    def _sincronizar_bien_final(self, orden: List[str]):
+        """
+        Usa como bien final al primero de ``orden`` (el orden topológico
+        canónico), como al construir el proceso, y recalcula los requerimientos
+        si cambió.
+        """
+        clasificacion = self._clasificacion_bienes
+        final = next((bien for bien in orden if clasificacion[bien] == "bien_final"), None)
+        if final != self._bien_final:
+            self._bien_final = final
+            if final is not None:
+                self._calcular_brutos()
+
+    def _propagar(self, bien: str, delta):
+        """
+        Suma ``delta`` al requerimiento bruto de ``bien`` y propaga el cambio a
+        sus ancestros, en orden topológico inverso:
+        ``delta[a] = sum(coeficiente(a, s) * delta[s])``.
+        """
+        if not delta:
+            return
+        ancestros = self._alcanzables(bien, self._insumos_directos, lambda n: True)
+        deltas = {bien: delta}
+        for nodo in sorted(ancestros, key=self._posicion.__getitem__, reverse=True):
+            if nodo != bien:
+                total = 0
+                for producto, datos in self._pgraph.succ[nodo].items():
+                    if producto in deltas:
+                        coeficiente = datos.get(pg.ATRIBUTO_COEFICIENTE, 1)
+                        total += math.ceil(coeficiente) * deltas[producto]
+                deltas[nodo] = total
+            self._brutos[nodo] += deltas[nodo]
 
     def get_insumos(self, bien):
         return self._insumos_directos[bien]
@@ -68,23 +502,69 @@ class ProcesoProductivo:
     def get_productos(self, bien):
         return self._productos_directos[bien]
 
+    def get_insumos_con_coeficientes(self, bien):
+        """Devuelve los insumos de ``bien`` como pares (insumo, coeficiente)."""
+        return self._insumos_coeficientes[bien]
+
     def get_clasificacion_bienes(self):
         return self._clasificacion_bienes
 
+    def get_indice(self):
+        if self._indice is None:
+            self._indice = pg.ProductionGraphIndex(self._pgraph)
+        return self._indice
+
     def get_cantidades_requeridas(self):
         return self.cantidades_requeridas
 
+    def get_requerimientos_brutos(self, demanda=None) -> Dict[str, float]:
+        """
+        Requerimientos brutos de todos los bienes para una demanda final,
+        ponderados por los coeficientes de insumo de las aristas.
+
+        Args:
+            demanda (Dict[str, float], optional): Demanda final por bien. Por
+                defecto una unidad del bien final.
+
+        Returns:
+            Dict[str, float]: Requerimiento bruto de cada bien.
+        """
+        indice = self.get_indice()
+        brutos = pg.explotar_requerimientos(indice, demanda)
+        return dict(zip(indice.nodos, brutos.tolist()))
+
     def get_grafo(self):
         """
         Devuelve el grafo de producción que se utiliza en el Proceso_productivo.
 
         Returns
         -------
-        nx.DiGraph
+        nx.DiGraph | pg.GrafoProduccion
             Grafo de producción
         """
         return self._pgraph
 
+    def get_plantilla_plan(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve la estructura del plan de producción sin asignar agentes.
+
+        La posición ``k`` corresponde a la orden ``k`` de ``crear_plan_produccion``;
+        solo el agente depende del plan.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Ids (del índice compilado) del bien de
+                cada orden y máscara booleana que indica si la orden es de compra.
+        """
+        ids = self.get_indice().ids
+        bienes = []
+        compras = []
+        for es_compra in (True, False):
+            for bien, cantidad in self.cantidades_requeridas.items():
+                if (self._clasificacion_bienes[bien] == "bien_primario") == es_compra:
+                    bienes.extend([ids[bien]] * cantidad)
+                    compras.extend([es_compra] * cantidad)
+        return np.array(bienes, dtype=np.int64), np.array(compras, dtype=bool)
+
     def crear_plan_produccion(self, plan: List[int]):
         action_map = {
             "bien_primario": "comprar",
@@ -158,41 +638,339 @@ def cortar_lista(
     return lista  # Si no se encuentra "orden", devolver la lista original
 
 
+# ------------------------ Sumideros de transacciones
+
+
+# Registro compacto de una transacción; "vendedor" es -1 en las producciones
+TRANSACCION_DTYPE = np.dtype(
+    [
+        ("paso", np.int64),
+        ("tipo", np.int8),
+        ("comprador", np.int8),
+        ("vendedor", np.int8),
+        ("bien", np.int32),
+    ]
+)
+TIPOS_TRANSACCION = ("compra", "produccion")
+
+
+class SumideroTransacciones(ABC):
+    """
+    Destino de las transacciones de ``Planner.ejecutar_plan``. Recibe cada
+    transacción como la tupla ``(paso, agentes, tipo, bien)``.
+    """
+
+    @abstractmethod
+    def append(self, transaccion: tuple):
+        pass
+
+
+class _SumideroCodificado(SumideroTransacciones):
+    """Base de los sumideros que guardan registros TRANSACCION_DTYPE con ids internados."""
+
+    def __init__(self, bienes: List[str] = None):
+        self.bienes = list(bienes or [])
+        self._ids_bienes = {bien: i for i, bien in enumerate(self.bienes)}
+        self._ids_agentes = {agente: i for i, agente in enumerate(AGENTES)}
+        self._ids_tipos = {tipo: i for i, tipo in enumerate(TIPOS_TRANSACCION)}
+
+    def _id_bien(self, bien) -> int:
+        i = self._ids_bienes.get(bien)
+        if i is None:
+            i = self._ids_bienes[bien] = len(self.bienes)
+            self.bienes.append(bien)
+        return i
+
+    def _codificar(self, transaccion: tuple) -> tuple:
+        paso, agentes, tipo, bien = transaccion
+        vendedor = self._ids_agentes[agentes[1]] if len(agentes) > 1 else -1
+        return (
+            paso,
+            self._ids_tipos[tipo],
+            self._ids_agentes[agentes[0]],
+            vendedor,
+            self._id_bien(bien),
+        )
+
+    def decodificar(self, registros: np.ndarray) -> List[tuple]:
+        """Convierte registros TRANSACCION_DTYPE a las tuplas originales."""
+        transacciones = []
+        for paso, tipo, comprador, vendedor, bien in registros.tolist():
+            agentes = (AGENTES[comprador],)
+            if vendedor >= 0:
+                agentes += (AGENTES[vendedor],)
+            transacciones.append(
+                (paso, agentes, TIPOS_TRANSACCION[tipo], self.bienes[bien])
+            )
+        return transacciones
+
+
+class SumideroArreglo(_SumideroCodificado):
+    """Guarda las transacciones en un arreglo estructurado de NumPy que crece por bloques."""
+
+    def __init__(self, bienes: List[str] = None, capacidad: int = 1024):
+        super().__init__(bienes)
+        self._registros = np.empty(capacidad, dtype=TRANSACCION_DTYPE)
+        self._n = 0
+
+    def append(self, transaccion: tuple):
+        if self._n == len(self._registros):
+            nuevos = np.empty(2 * len(self._registros) or 1, dtype=TRANSACCION_DTYPE)
+            nuevos[: self._n] = self._registros
+            self._registros = nuevos
+        self._registros[self._n] = self._codificar(transaccion)
+        self._n += 1
+
+    @property
+    def registros(self) -> np.ndarray:
+        return self._registros[: self._n]
+
+    def clear(self):
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+
+class SumideroMemmap(_SumideroCodificado):
+    """
+    Escribe las transacciones al final de un archivo binario de registros
+    TRANSACCION_DTYPE, con un búfer de tamaño fijo, y las expone como np.memmap.
+
+    La tabla de bienes (id -> bien) se guarda como JSON junto al archivo, en
+    ``ruta + ".bienes.json"``, para que los registros se puedan decodificar
+    después. Con ``anexar=True`` se carga esa tabla y los bienes nuevos reciben
+    los ids siguientes, así que los registros anteriores y los nuevos usan los
+    mismos ids. Se puede usar como context manager, que lo cierra al salir.
+
+    Raises:
+        ValueError: Si al anexar a un archivo con registros no existe la tabla de
+            bienes, o si ``bienes`` no coincide con los ids ya guardados.
+    """
+
+    def __init__(
+        self, ruta: str, bienes: List[str] = None, anexar: bool = False, bufer: int = 65536
+    ):
+        self.ruta = ruta
+        self.ruta_bienes = ruta + ".bienes.json"
+        if anexar:
+            guardados = self._cargar_bienes()
+            bienes = list(bienes or [])
+            comunes = min(len(bienes), len(guardados))
+            if bienes[:comunes] != guardados[:comunes]:
+                raise ValueError(
+                    f"Los bienes no coinciden con los ids guardados en {self.ruta_bienes}."
+                )
+            bienes = guardados + bienes[comunes:]
+        super().__init__(bienes)
+        self._archivo = open(ruta, "ab" if anexar else "wb")
+        self._bienes_guardados = -1
+        self._guardar_bienes()
+        self._bufer = np.empty(bufer, dtype=TRANSACCION_DTYPE)
+        self._n = 0
+
+    def _cargar_bienes(self) -> List[str]:
+        """Tabla de bienes guardada junto al archivo (vacía si aún no hay registros)."""
+        if os.path.exists(self.ruta_bienes):
+            with open(self.ruta_bienes) as archivo:
+                return json.load(archivo)
+        if os.path.exists(self.ruta) and os.path.getsize(self.ruta):
+            raise ValueError(
+                f"No se encontró la tabla de bienes {self.ruta_bienes} de los registros "
+                f"de {self.ruta}."
+            )
+        return []
+
+    def _guardar_bienes(self):
+        """Reescribe la tabla de bienes si se internaron bienes nuevos."""
+        if len(self.bienes) == self._bienes_guardados:
+            return
+        temporal = self.ruta_bienes + ".tmp"
+        with open(temporal, "w") as archivo:
+            json.dump(self.bienes, archivo)
+        os.replace(temporal, self.ruta_bienes)
+        self._bienes_guardados = len(self.bienes)
+
+    def append(self, transaccion: tuple):
+        self._bufer[self._n] = self._codificar(transaccion)
+        self._n += 1
+        if self._n == len(self._bufer):
+            self.flush()
+
+    def flush(self):
+        self._guardar_bienes()
+        self._archivo.write(self._bufer[: self._n].tobytes())
+        self._archivo.flush()
+        self._n = 0
+
+    def close(self):
+        if not self._archivo.closed:
+            self.flush()
+            self._archivo.close()
+
+    def __enter__(self) -> "SumideroMemmap":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def registros(self) -> np.ndarray:
+        """Registros escritos hasta ahora, mapeados en memoria (solo lectura)."""
+        if not self._archivo.closed:
+            self.flush()
+        if not os.path.getsize(self.ruta):
+            return np.empty(0, dtype=TRANSACCION_DTYPE)
+        return np.memmap(self.ruta, dtype=TRANSACCION_DTYPE, mode="r")
+
+
+class SumideroCallback(SumideroTransacciones):
+    """
+    Entrega cada transacción a un consumidor sin guardarla. El consumidor puede
+    ser una función o un generador (que recibe las transacciones con ``send``).
+    """
+
+    def __init__(self, consumidor):
+        if hasattr(consumidor, "send"):
+            next(consumidor)  # Avanzar el generador hasta su primer yield
+            consumidor = consumidor.send
+        self._consumidor = consumidor
+
+    def append(self, transaccion: tuple):
+        self._consumidor(transaccion)
+
+
+@dataclass
+class ResultadosPlanes:
+    """
+    Resultados por plan de ``Planner.ejecutar_planes``. Los ejes de agentes
+    siguen el orden de ``AGENTES``.
+
+    Attributes:
+        compras (np.ndarray): Forma (n_planes, 3, 3); ``compras[p, c, v]`` es el
+            número de compras del agente ``c`` al agente ``v`` en el plan ``p``.
+        producciones (np.ndarray): Forma (n_planes, 3); órdenes de producción
+            ejecutadas por cada agente.
+        compras_transfronterizas (np.ndarray): Forma (n_planes,); compras entre
+            NCT y ZF (en cualquier dirección).
+        paso_fallo (np.ndarray): Forma (n_planes,); paso en el que el plan falló
+            o -1 si se ejecutó completo.
+    """
+
+    compras: np.ndarray
+    producciones: np.ndarray
+    compras_transfronterizas: np.ndarray
+    paso_fallo: np.ndarray
+
+
+@dataclass(frozen=True)
+class SnapshotPlanner:
+    """
+    Estado guardado de un Planner. Los contadores se copian y las unidades y
+    transacciones se guardan como tuplas, para que el snapshot no cambie al
+    seguir ejecutando órdenes.
+
+    Attributes:
+        inventarios (Dict[str, tuple]): Estado de cada agente, tal como lo
+            devuelve ``Agente.guardar_estado``.
+        transacciones (Tuple): Transacciones registradas hasta el snapshot.
+    """
+
+    inventarios: Dict[str, tuple]
+    transacciones: Tuple
+
+
 class Planner:
-    def __init__(self, proceso_productivo):
+    def __init__(
+        self,
+        proceso_productivo,
+        registrar_unidades: bool = False,
+        instrumentacion: Instrumentacion = None,
+    ):
         self._proceso_productivo = proceso_productivo
+        self._registrar_unidades = registrar_unidades
+
+        # Instrumentación opcional de ejecutar_plan (apagada con None): etapas
+        # "plan_produccion", "cortar_lista", "fase_compras" y "fase_produccion",
+        # latencias por tipo de orden y los contadores "compras_recursivas" y
+        # "eliminaciones_inventario"
+        self.instrumentacion = instrumentacion
         self.cantidades_requeridas = (
             self._proceso_productivo.get_cantidades_requeridas()
         )
         self.clasificacion_bienes = self._proceso_productivo.get_clasificacion_bienes()
 
+        ids_bienes = self._proceso_productivo.get_indice().ids
+
         # Inicializar al mercado con los bienes primarios
-        self._mercado = Agente("MKT", {})
+        self._mercado = Agente("MKT", {}, ids_bienes, registrar_unidades)
         for bien, cantidad in self.cantidades_requeridas.items():
             if self.clasificacion_bienes[bien] == "bien_primario":
-                for i in range(1, cantidad + 1):
-                    self._mercado.agregar_inventario(bien, f"unidad_{i}")
+                activos = None
+                if registrar_unidades:
+                    activos = [f"unidad_{i}" for i in range(1, cantidad + 1)]
+                self._mercado.agregar_unidades(bien, cantidad, activos)
 
         # Inicializar los agentes
         self._agentes = {
-            "NCT": Agente("NCT", {}),
-            "ZF": Agente("ZF", {}),
+            "NCT": Agente("NCT", {}, ids_bienes, registrar_unidades),
+            "ZF": Agente("ZF", {}, ids_bienes, registrar_unidades),
             "MKT": self._mercado,
         }
 
         # Inicializar la secuencia de transacciones
         self.transacciones = []
 
+        # Vendedores posibles de cada agente, en orden de prioridad
+        self._vendedores = {
+            agente: tuple(k for k in self._agentes if k != agente)
+            for agente in self._agentes
+        }
+
+        # Recetas compiladas de cada bien producido (ver _receta)
+        self._recetas = {}
+
+        # Pasos compilados para las evaluaciones por lotes (ver _compilar_pasos)
+        self._pasos = None
+
+        # Estado inicial que restaura reset() sin reconstruir agentes ni unidades
+        self._snapshot_inicial = self.tomar_snapshot()
+
     def crear_plan_produccion(self, plan: List[int]):
         return self._proceso_productivo.crear_plan_produccion(plan)
 
+    def tomar_snapshot(self) -> "SnapshotPlanner":
+        """
+        Guarda el estado actual de los inventarios y de las transacciones.
+
+        Permite volver a un estado intermedio (por ejemplo, para evaluar
+        distintas alternativas a partir de un mismo punto) con
+        ``restaurar_snapshot``.
+
+        Returns:
+            SnapshotPlanner: Copia del estado actual.
+        """
+        inventarios = {
+            nombre: agente.guardar_estado() for nombre, agente in self._agentes.items()
+        }
+        return SnapshotPlanner(inventarios, tuple(self.transacciones))
+
+    def restaurar_snapshot(self, snapshot: "SnapshotPlanner"):
+        """
+        Restaura los inventarios y las transacciones guardados en ``snapshot``.
+        El snapshot no se modifica, por lo que puede restaurarse varias veces.
+        """
+        for nombre, estado in snapshot.inventarios.items():
+            self._agentes[nombre].restaurar_estado(estado)
+        self.transacciones = list(snapshot.transacciones)
+
     def reset(self):
         """
         Reinicia el estado del Planner, eliminando todos los bienes comprados /
         producidos y volviendo a inicializar los agentes y el mercado con los
         bienes primarios iniciales.
         """
-        self.__init__(self._proceso_productivo)
+        self.restaurar_snapshot(self._snapshot_inicial)
 
     def procesar_compra(
         self, orden: Tuple[str, str, str], inicial: bool = False, paso: int = 0
@@ -205,33 +983,43 @@ class Planner:
         if accion != "comprar":
             raise ValueError("La orden debe ser de tipo 'comprar'.")
 
-        # Filtrar los agentes (vendedores) según sea compra inicial o no
-        if inicial:
-            posibles_vendedores = {k: v for k, v in self._agentes.items() if k == "MKT"}
-        else:
-            posibles_vendedores = {
-                k: v for k, v in self._agentes.items() if k != agente
-            }
-
-        # Buscar un vendedor que tenga el bien disponible
-        vendedor_encontrado = None
-        for nombre_agente, objeto_agente in posibles_vendedores.items():
-            if bien in objeto_agente._inventario and objeto_agente._inventario[bien]:
-                vendedor_encontrado = nombre_agente
-                break
-
-        if vendedor_encontrado:
-            # Transferir la primera unidad disponible del vendedor al comprador
-            unidad = self._agentes[vendedor_encontrado]._inventario[bien][0]
-            self._agentes[vendedor_encontrado].eliminar_inventario(bien, unidad)
-            self._agentes[agente].agregar_inventario(bien, unidad)
-
-            # Registrar la transacción: (paso, (comprador, vendedor), "compra", bien)  # <-- Cambio
-            self.transacciones.append(
-                (paso, (agente, vendedor_encontrado), "compra", bien)
+        vendedores = ("MKT",) if inicial else self._vendedores[agente]
+        self._transferir(bien, agente, vendedores, paso)
+
+    def _transferir(
+        self, bien: str, agente: str, vendedores: Tuple[str, ...], paso: int
+    ):
+        """
+        Compra una unidad de ``bien`` al primer agente de ``vendedores`` que la
+        tenga y registra la transacción.
+        """
+        for nombre_agente in vendedores:
+            if self._agentes[nombre_agente].cantidad(bien):
+                # Transferir la primera unidad disponible del vendedor al comprador
+                unidad = self._agentes[nombre_agente].eliminar_inventario(bien)
+                self._agentes[agente].agregar_inventario(bien, unidad)
+                if self.instrumentacion is not None:
+                    self.instrumentacion.contar("eliminaciones_inventario")
+
+                # Registrar la transacción: (paso, (comprador, vendedor), "compra", bien)  # <-- Cambio
+                self.transacciones.append(
+                    (paso, (agente, nombre_agente), "compra", bien)
+                )
+                return
+        raise ValueError(f"Ningún agente tiene '{bien}' disponible para vender.")
+
+    def _receta(self, bien: str) -> Tuple[Tuple[str, int], ...]:
+        """
+        Insumos y unidades por insumo para producir una unidad de ``bien``.
+        Se compila una sola vez por bien.
+        """
+        receta = self._recetas.get(bien)
+        if receta is None:
+            coeficientes = self._proceso_productivo.get_insumos_con_coeficientes(bien)
+            receta = self._recetas[bien] = tuple(
+                (insumo, math.ceil(coeficiente)) for insumo, coeficiente in coeficientes
             )
-        else:
-            raise ValueError(f"Ningún agente tiene '{bien}' disponible para vender.")
+        return receta
 
     def procesar_produccion(
         self, orden: Tuple[str, str, str], paso: int = 0
@@ -244,25 +1032,36 @@ class Planner:
         if accion != "producir":
             raise ValueError("La orden debe ser de tipo 'producir'.")
 
-        # Obtener los insumos necesarios para producir este bien
-        insumos_necesarios = self._proceso_productivo._insumos_directos[bien]
+        insumos_necesarios = self._receta(bien)
+        productor = self._agentes[agente]
 
-        # Verificar y/o comprar insumos antes de producir
-        for insumo in insumos_necesarios:
-            if (
-                insumo not in self._agentes[agente]._inventario
-                or not self._agentes[agente]._inventario[insumo]
-            ):
-                # Si no tiene el insumo, se intenta comprar (recursivamente)
-                self.procesar_orden((insumo, "comprar", agente), paso=paso)
+        # Verificar los insumos y encolar las compras faltantes antes de producir.
+        # Cada compra agrega exactamente una unidad, así que las compras se
+        # conocen de antemano y se procesan en una cola, sin recursión.
+        compras_pendientes = deque()
+        for insumo, unidades in insumos_necesarios:
+            faltantes = unidades - productor.cantidad(insumo)
+            if faltantes > 0:
+                compras_pendientes.extend([insumo] * faltantes)
+        if self.instrumentacion is not None:
+            self.instrumentacion.contar("compras_recursivas", len(compras_pendientes))
+            self.instrumentacion.contar(
+                "eliminaciones_inventario",
+                sum(unidades for _, unidades in insumos_necesarios),
+            )
+        vendedores = self._vendedores[agente]
+        while compras_pendientes:
+            self._transferir(compras_pendientes.popleft(), agente, vendedores, paso)
 
         # Agregar el bien producido al inventario
-        self._agentes[agente].agregar_inventario(bien, f"unidad_{bien}")
+        productor.agregar_inventario(
+            bien, f"unidad_{bien}" if productor.registra_unidades else None
+        )
 
-        # Consumir (eliminar) una unidad de cada insumo
-        for insumo in insumos_necesarios:
-            unidad_insumo = self._agentes[agente]._inventario[insumo][0]
-            self._agentes[agente].eliminar_inventario(insumo, unidad_insumo)
+        # Consumir (eliminar) las unidades requeridas de cada insumo
+        for insumo, unidades in insumos_necesarios:
+            for _ in range(unidades):
+                productor.eliminar_inventario(insumo)
 
         # Registrar la transacción: (paso, (agente,), "produccion", bien)  # <-- Cambio
         self.transacciones.append((paso, (agente,), "produccion", bien))
@@ -282,31 +1081,412 @@ class Planner:
         else:
             raise ValueError(f"Acción no reconocida: {accion}")
 
-    def ejecutar_plan(self, plan: List[Tuple[str, str, str]]):
+    def ejecutar_plan(
+        self, plan: List[Tuple[str, str, str]], sumidero: SumideroTransacciones = None
+    ):
         """
         Ejecuta un plan de producción procesando cada orden.
         Retorna la lista de transacciones con el paso en que ocurrieron.
+
+        Si se entrega un ``sumidero``, las transacciones se envían a él en lugar
+        de guardarse en una lista, y se retorna el sumidero. Al terminar (o si
+        el plan falla) ``transacciones`` vuelve a ser una lista vacía, para que
+        ``tomar_snapshot`` siga funcionando.
         """
         self.reset()
+        if sumidero is None:
+            self._ejecutar_plan(plan)
+            return self.transacciones
+
+        self.transacciones = sumidero
+        try:
+            self._ejecutar_plan(plan)
+        finally:
+            self.transacciones = []
+        return sumidero
+
+    def _ejecutar_plan(self, plan: List[int]):
+        """Procesa todas las órdenes de ``plan`` sobre el estado actual."""
+        instrumentacion = self.instrumentacion
 
         # Crear el plan completo
-        plan_produccion = self._proceso_productivo.crear_plan_produccion(plan)
+        with etapa(instrumentacion, "plan_produccion"):
+            plan_produccion = self._proceso_productivo.crear_plan_produccion(plan)
 
         # Separar secuencias de compra inicial vs. resto
-        parte_1_secuencia = cortar_lista(plan_produccion, "comprar", 1)
-        parte_2_secuencia = cortar_lista(plan_produccion, "comprar", 0)
+        with etapa(instrumentacion, "cortar_lista"):
+            parte_1_secuencia = cortar_lista(plan_produccion, "comprar", 1)
+            parte_2_secuencia = cortar_lista(plan_produccion, "comprar", 0)
 
         # Contador de paso  # <-- Cambio
         paso = 1
 
         # Procesar la parte de compras iniciales con su paso
-        for orden in parte_1_secuencia:
-            self.procesar_orden(orden, inicial=True, paso=paso)
-            paso += 1
+        with etapa(instrumentacion, "fase_compras"):
+            paso = self._procesar_secuencia(parte_1_secuencia, True, paso)
 
         # Procesar la parte restante
-        for orden in parte_2_secuencia:
-            self.procesar_orden(orden, inicial=False, paso=paso)
+        with etapa(instrumentacion, "fase_produccion"):
+            paso = self._procesar_secuencia(parte_2_secuencia, False, paso)
+
+    def _procesar_secuencia(self, secuencia, inicial: bool, paso: int) -> int:
+        """
+        Procesa las órdenes de ``secuencia`` a partir del paso ``paso`` y
+        retorna el paso siguiente.
+        """
+        instrumentacion = self.instrumentacion
+        for orden in secuencia:
+            if instrumentacion is None:
+                self.procesar_orden(orden, inicial=inicial, paso=paso)
+            else:
+                inicio = time.perf_counter_ns()
+                self.procesar_orden(orden, inicial=inicial, paso=paso)
+                instrumentacion.registrar_latencia(
+                    orden[1], time.perf_counter_ns() - inicio
+                )
             paso += 1
+        return paso
+
+    def _compilar_pasos(self):
+        """
+        Compila la secuencia de pasos de ``ejecutar_plan`` como tuplas
+        ``(columna_plan, bien, es_compra, inicial, insumos)``, donde ``insumos``
+        es una lista de pares (id del insumo, unidades). Se calcula una sola vez.
+        """
+        if self._pasos is None:
+            indice = self._proceso_productivo.get_indice()
+            bienes, compras = self._proceso_productivo.get_plantilla_plan()
+            insumos = {}
+            for i, bien in enumerate(indice.nodos):
+                coeficientes = self._proceso_productivo.get_insumos_con_coeficientes(bien)
+                insumos[i] = [
+                    (indice.ids[insumo], math.ceil(coeficiente))
+                    for insumo, coeficiente in coeficientes
+                ]
+            filas = [
+                (k, bien, es_compra, insumos[bien])
+                for k, (bien, es_compra) in enumerate(
+                    zip(bienes.tolist(), compras.tolist())
+                )
+            ]
+
+            # Mismo corte que cortar_lista: hasta la última compra (inclusive)
+            ultimas = np.flatnonzero(compras)
+            if len(ultimas):
+                corte = ultimas[-1] + 1
+                parte_1, parte_2 = filas[:corte], filas[corte:]
+            else:
+                parte_1, parte_2 = filas, filas
+            self._pasos = [(*fila[:3], True, fila[3]) for fila in parte_1] + [
+                (*fila[:3], False, fila[3]) for fila in parte_2
+            ]
+            self._n_requerido = len(filas)
+        return self._pasos
+
+    def _stock_inicial(self, n_bienes: int) -> np.ndarray:
+        """Stock inicial por agente y bien (solo el mercado tiene bienes primarios)."""
+        stock = np.zeros((len(AGENTES), n_bienes), dtype=np.int64)
+        indice = self._proceso_productivo.get_indice()
+        for bien, cantidad in self.cantidades_requeridas.items():
+            if self.clasificacion_bienes[bien] == "bien_primario":
+                stock[MKT, indice.ids[bien]] = cantidad
+        return stock
+
+    def ejecutar_planes(
+        self, planes: np.ndarray, tamano_lote: int = 65536
+    ) -> ResultadosPlanes:
+        """
+        Evalúa muchos planes 0/1 a la vez, con la misma semántica que
+        ``ejecutar_plan`` pero sin construir listas de órdenes ni inventarios.
+
+        El estado de todos los planes de un lote se lleva en un arreglo de
+        contadores (plan, agente, bien) y cada paso del plan se aplica a todo el
+        lote con operaciones vectorizadas. No modifica el estado del Planner.
+
+        Args:
+            planes (np.ndarray): Arreglo 0/1 de forma (n_planes, largo_plan).
+            tamano_lote (int): Número de planes evaluados simultáneamente; acota
+                la memoria usada.
+
+        Returns:
+            ResultadosPlanes: Conteos de transacciones y paso de fallo por plan.
+        """
+        planes = np.asarray(planes)
+        if planes.ndim != 2:
+            raise ValueError("Los planes deben ser un arreglo 2-D (n_planes, largo_plan).")
+
+        pasos = self._compilar_pasos()
+        if planes.shape[1] < self._n_requerido:
+            raise ValueError(
+                "El plan debe tener al menos un elemento por cada paso necesario"
+            )
+
+        n_planes = planes.shape[0]
+        n_agentes = len(AGENTES)
+        stock_inicial = self._stock_inicial(len(self._proceso_productivo.get_indice()))
+
+        compras = np.zeros((n_planes, n_agentes, n_agentes), dtype=np.int64)
+        producciones = np.zeros((n_planes, n_agentes), dtype=np.int64)
+        paso_fallo = np.full(n_planes, -1, dtype=np.int64)
+
+        for inicio in range(0, n_planes, tamano_lote):
+            fin = min(inicio + tamano_lote, n_planes)
+            # plan 1 -> NCT (0), plan 0 -> ZF (1)
+            agentes = 1 - planes[inicio:fin].astype(np.int64)
+            self._ejecutar_lote(
+                pasos,
+                agentes,
+                np.repeat(stock_inicial[None], fin - inicio, axis=0),
+                compras[inicio:fin],
+                producciones[inicio:fin],
+                paso_fallo[inicio:fin],
+            )
+
+        return ResultadosPlanes(
+            compras=compras,
+            producciones=producciones,
+            compras_transfronterizas=compras[:, NCT, ZF] + compras[:, ZF, NCT],
+            paso_fallo=paso_fallo,
+        )
+
+    def barrido_gray(
+        self,
+        posiciones: List[int] = None,
+        plan_base: List[int] = None,
+        tamano_bloque: int = 4096,
+    ):
+        """
+        Recorre exhaustivamente los 2ⁿ planes que resultan de variar las
+        ``posiciones`` dadas, en orden de código Gray.
+
+        Entre un plan y el siguiente cambia un solo bit, es decir, una orden
+        pasa al otro agente. Se guarda el estado (inventarios y conteos) antes
+        de cada paso, de modo que solo se re-ejecutan los pasos desde la orden
+        modificada. Las posiciones más tardías del plan se asignan a los bits
+        que cambian más seguido, así que en promedio se re-ejecutan unos pocos
+        pasos por plan.
+
+        Los estados se guardan solo desde el primer paso que puede cambiar (el
+        de la posición variada más temprana), porque los anteriores nunca se
+        re-ejecutan: la memoria es O((largo_plan - primer paso) · n_bienes), que
+        con todas las posiciones variadas es un estado por paso del plan.
+
+        Args:
+            posiciones (List[int], optional): Posiciones del plan que se varían.
+                Por defecto, todas las posiciones requeridas.
+            plan_base (List[int], optional): Valores de las posiciones fijas y
+                del primer plan, uno por paso necesario. Por defecto, todo ceros.
+            tamano_bloque (int): Número de planes por bloque emitido.
+
+        Yields:
+            Tuple[np.ndarray, ResultadosPlanes]: Bloques de planes, de forma
+                (m, largo_plan), y sus resultados.
+
+        Raises:
+            ValueError: Si ``plan_base`` no tiene un elemento por paso necesario
+                o alguna posición está fuera del plan o repetida.
+        """
+        pasos = self._compilar_pasos()
+        n_bienes = len(self._proceso_productivo.get_indice())
+        largo = self._n_requerido
+        plan = np.zeros(largo, dtype=np.int8)
+        if plan_base is not None:
+            plan_base = np.asarray(plan_base)
+            if plan_base.shape != (largo,):
+                raise ValueError(
+                    f"El plan base debe tener exactamente {largo} elementos, "
+                    "uno por cada paso necesario."
+                )
+            plan[:] = plan_base
+        if posiciones is None:
+            posiciones = range(largo)
+        # Bit 0 (el que más cambia) -> posición más tardía del plan
+        posiciones = sorted(posiciones, reverse=True)
+        if posiciones and not 0 <= posiciones[-1] <= posiciones[0] < largo:
+            raise ValueError(f"Las posiciones deben estar entre 0 y {largo - 1}.")
+        if len(set(posiciones)) != len(posiciones):
+            raise ValueError("Las posiciones no pueden repetirse.")
+
+        primer_paso = {}
+        for k, paso in enumerate(pasos):
+            primer_paso.setdefault(paso[0], k)
+
+        n_agentes = len(AGENTES)
+        estado_inicial = (
+            self._stock_inicial(n_bienes).ravel().tolist(),
+            [0] * (n_agentes * n_agentes),
+            [0] * n_agentes,
+            -1,
+        )
+        agentes = (1 - plan).tolist()
+
+        # Los pasos anteriores a la primera posición variada se ejecutan una vez;
+        # estados[k - inicio] es el estado antes del paso k
+        inicio = min((primer_paso[p] for p in posiciones), default=len(pasos))
+        estado = estado_inicial
+        for k in range(inicio):
+            estado = self._ejecutar_paso(pasos[k], k + 1, agentes, estado, n_bienes)
+        estados = [estado] + [None] * (len(pasos) - inicio)
+
+        def reejecutar(desde):
+            for k in range(desde, len(pasos)):
+                estados[k - inicio + 1] = self._ejecutar_paso(
+                    pasos[k], k + 1, agentes, estados[k - inicio], n_bienes
+                )
+
+        n = len(posiciones)
+        total = 1 << n
+        planes_bloque = np.empty((min(tamano_bloque, total), largo), dtype=np.int8)
+        compras = np.empty((len(planes_bloque), n_agentes, n_agentes), dtype=np.int64)
+        producciones = np.empty((len(planes_bloque), n_agentes), dtype=np.int64)
+        paso_fallo = np.empty(len(planes_bloque), dtype=np.int64)
+
+        reejecutar(inicio)
+        m = 0
+        for i in range(total):
+            if i:
+                # Bit que cambia entre gray(i - 1) y gray(i)
+                bit = (i & -i).bit_length() - 1
+                columna = posiciones[bit]
+                plan[columna] ^= 1
+                agentes[columna] = 1 - int(plan[columna])
+                reejecutar(primer_paso[columna])
+
+            _, compras_fin, producciones_fin, fallo = estados[-1]
+            planes_bloque[m] = plan
+            compras[m] = np.reshape(compras_fin, (n_agentes, n_agentes))
+            producciones[m] = producciones_fin
+            paso_fallo[m] = fallo
+            m += 1
+            if m == len(planes_bloque) or i == total - 1:
+                yield planes_bloque[:m].copy(), ResultadosPlanes(
+                    compras=compras[:m].copy(),
+                    producciones=producciones[:m].copy(),
+                    compras_transfronterizas=compras[:m, NCT, ZF] + compras[:m, ZF, NCT],
+                    paso_fallo=paso_fallo[:m].copy(),
+                )
+                m = 0
+
+    @staticmethod
+    def _ejecutar_paso(paso_compilado, paso, agentes, estado, n_bienes):
+        """
+        Ejecuta un paso compilado sobre un estado
+        ``(stock, compras, producciones, paso_fallo)`` y devuelve el estado
+        siguiente sin modificar el original.
+        """
+        columna, bien, es_compra, inicial, insumos = paso_compilado
+        if estado[3] >= 0:
+            return estado
+        stock, compras, producciones = list(estado[0]), list(estado[1]), list(estado[2])
+        agente = agentes[columna]
+        n_agentes = len(AGENTES)
+
+        def comprar(bien, unidades, vendedores):
+            propio = agente * n_bienes + bien
+            falta = unidades - stock[propio]
+            for vendedor in vendedores:
+                if falta <= 0:
+                    break
+                disponible = stock[vendedor * n_bienes + bien]
+                if vendedor == agente or not disponible:
+                    continue
+                tomar = min(falta, disponible)
+                stock[vendedor * n_bienes + bien] -= tomar
+                stock[propio] += tomar
+                compras[agente * n_agentes + vendedor] += tomar
+                falta -= tomar
+            return falta <= 0
+
+        if es_compra:
+            vendedores = (MKT,) if inicial else (NCT, ZF, MKT)
+            if not comprar(bien, stock[agente * n_bienes + bien] + 1, vendedores):
+                return stock, compras, producciones, paso
+        else:
+            for insumo, unidades in insumos:
+                if not comprar(insumo, unidades, (NCT, ZF, MKT)):
+                    return stock, compras, producciones, paso
+            for insumo, unidades in insumos:
+                stock[agente * n_bienes + insumo] -= unidades
+            stock[agente * n_bienes + bien] += 1
+            producciones[agente] += 1
+        return stock, compras, producciones, -1
+
+    @staticmethod
+    def _ejecutar_lote(
+        pasos,
+        agentes,
+        stock,
+        compras,
+        producciones,
+        paso_fallo,
+        valor=None,
+        costo_compra=None,
+        sobrecosto=None,
+    ):
+        """
+        Aplica todos los pasos a un lote de planes, modificando los arreglos dados.
+
+        Si se entrega ``valor`` (de la misma forma que ``stock``), además se lleva el
+        costo acumulado de las unidades de cada (plan, agente, bien): cada compra
+        traslada el costo promedio de las unidades del vendedor y le suma
+        ``costo_compra[comprador, vendedor, bien]``; cada producción suma el costo
+        de los insumos consumidos y ``sobrecosto[productor]``.
+        """
+        filas = np.arange(agentes.shape[0])
+        activo = np.ones(agentes.shape[0], dtype=bool)
+
+        def promedio(valores, unidades):
+            return np.divide(
+                valores, unidades, out=np.zeros(len(valores)), where=unidades > 0
+            )
+
+        def comprar(bien, agente, unidades, vendedores):
+            # Se compra a los vendedores en orden de prioridad, como en procesar_compra
+            falta = np.maximum(unidades - stock[filas, agente, bien], 0) * activo
+            for vendedor in vendedores:
+                tomar = np.minimum(falta, stock[:, vendedor, bien])
+                tomar[agente == vendedor] = 0
+                if valor is not None:
+                    trasladado = tomar * promedio(
+                        valor[:, vendedor, bien], stock[:, vendedor, bien]
+                    )
+                    valor[:, vendedor, bien] -= trasladado
+                    # Sin compra no se suma el costo (puede ser NaN si falta el precio)
+                    valor[filas, agente, bien] += trasladado + np.where(
+                        tomar > 0, tomar * costo_compra[agente, vendedor, bien], 0.0
+                    )
+                stock[:, vendedor, bien] -= tomar
+                stock[filas, agente, bien] += tomar
+                compras[filas, agente, vendedor] += tomar
+                falta -= tomar
+            return falta > 0
+
+        for paso, (columna, bien, es_compra, inicial, insumos) in enumerate(pasos, 1):
+            agente = agentes[:, columna]
+            if es_compra:
+                vendedores = (MKT,) if inicial else (NCT, ZF, MKT)
+                # Cada orden de compra adquiere una unidad adicional
+                objetivo = stock[filas, agente, bien] + 1
+                fallo = comprar(bien, agente, objetivo, vendedores)
+            else:
+                fallo = np.zeros_like(activo)
+                for insumo, unidades in insumos:
+                    fallo |= comprar(insumo, agente, unidades, (NCT, ZF, MKT))
+                    activo &= ~fallo
+                ejecuta = activo.astype(np.int64)
+                if valor is not None:
+                    costo = sobrecosto[agente] * ejecuta
+                    for insumo, unidades in insumos:
+                        consumido = (unidades * ejecuta) * promedio(
+                            valor[filas, agente, insumo], stock[filas, agente, insumo]
+                        )
+                        valor[filas, agente, insumo] -= consumido
+                        costo += consumido
+                    valor[filas, agente, bien] += costo
+                for insumo, unidades in insumos:
+                    stock[filas, agente, insumo] -= unidades * ejecuta
+                stock[filas, agente, bien] += ejecuta
+                producciones[filas, agente] += ejecuta
 
-        return self.transacciones
+            paso_fallo[fallo & (paso_fallo < 0)] = paso
+            activo &= ~fallo
@@ -1,22 +1,391 @@
-import networkx as nx
-from typing import List, Dict
+import math
+import numpy as np
+from typing import TYPE_CHECKING, List, Dict, Tuple, Union
+
+if TYPE_CHECKING:  # networkx es opcional: solo se usa si el usuario entrega un nx.DiGraph
+    import networkx as nx
+
+
+# Códigos de clasificación usados en el índice compilado
+BIEN_PRIMARIO = 0
+BIEN_INTERMEDIO = 1
+BIEN_FINAL = 2
+NOMBRES_CLASIFICACION = ("bien_primario", "bien_intermedio", "bien_final")
+
+# Atributo de arista con el coeficiente de insumo (unidades del insumo por
+# unidad del producto). Las aristas sin el atributo valen 1.
+ATRIBUTO_COEFICIENTE = "coeficiente"
+
+
+class GrafoProduccion:
+    """Grafo dirigido mínimo para usar el proceso productivo sin networkx.
+
+    Implementa la parte de la interfaz de ``nx.DiGraph`` que usa este paquete
+    (``succ``, ``pred``, ``add_node``, ``add_edge``, ``remove_edge``,
+    ``remove_node``, ``has_edge``, ``edges``, ``copy``) y respeta el mismo orden
+    de inserción de nodos y vecinos, por lo que el orden topológico es el mismo
+    que se obtendría con un ``nx.DiGraph`` construido con las mismas aristas.
+
+    Args:
+        aristas (Iterable): Aristas ``(u, v)``, ``(u, v, coeficiente)`` o
+            ``(u, v, atributos)``.
+    """
+
+    def __init__(self, aristas=()):
+        self.succ: Dict[str, Dict[str, dict]] = {}
+        self.pred: Dict[str, Dict[str, dict]] = {}
+        for arista in aristas:
+            u, v = arista[0], arista[1]
+            if len(arista) < 3:
+                self.add_edge(u, v)
+            elif isinstance(arista[2], dict):
+                self.add_edge(u, v, **arista[2])
+            else:
+                self.add_edge(u, v, **{ATRIBUTO_COEFICIENTE: arista[2]})
+
+    @classmethod
+    def desde_adyacencia(cls, adyacencia: Dict) -> "GrafoProduccion":
+        """
+        Construye el grafo desde un diccionario nodo -> productos, donde los
+        productos son una lista o un diccionario producto -> atributos (como
+        ``nx.DiGraph(adyacencia)``: primero todos los nodos, luego las aristas).
+        """
+        grafo = cls()
+        for nodo in adyacencia:
+            grafo.add_node(nodo)
+        for nodo, productos in adyacencia.items():
+            for producto in productos:
+                atributos = productos[producto] if isinstance(productos, dict) else {}
+                grafo.add_edge(nodo, producto, **atributos)
+        return grafo
+
+    def add_node(self, nodo):
+        if nodo not in self.succ:
+            self.succ[nodo] = {}
+            self.pred[nodo] = {}
+
+    def add_edge(self, u, v, **atributos):
+        self.add_node(u)
+        self.add_node(v)
+        datos = self.succ[u].get(v)
+        if datos is None:
+            datos = self.succ[u][v] = self.pred[v][u] = {}
+        datos.update(atributos)
+
+    def remove_edge(self, u, v):
+        if not self.has_edge(u, v):
+            raise ValueError(f"No existe la arista ({u}, {v}).")
+        del self.succ[u][v]
+        del self.pred[v][u]
+
+    def remove_node(self, nodo):
+        for producto in self.succ.pop(nodo):
+            del self.pred[producto][nodo]
+        for insumo in self.pred.pop(nodo):
+            del self.succ[insumo][nodo]
+
+    def has_edge(self, u, v) -> bool:
+        return u in self.succ and v in self.succ[u]
+
+    def edges(self, data=False, default=None):
+        """Aristas ``(u, v)``, o ``(u, v, valor)`` con el atributo ``data``."""
+        for u, productos in self.succ.items():
+            for v, datos in productos.items():
+                if data is False:
+                    yield u, v
+                elif data is True:
+                    yield u, v, datos
+                else:
+                    yield u, v, datos.get(data, default)
+
+    def copy(self) -> "GrafoProduccion":
+        grafo = GrafoProduccion()
+        for nodo in self.succ:
+            grafo.add_node(nodo)
+        for u, v, datos in self.edges(data=True):
+            grafo.add_edge(u, v, **datos)
+        return grafo
+
+    def number_of_nodes(self) -> int:
+        return len(self.succ)
+
+    def number_of_edges(self) -> int:
+        return sum(len(productos) for productos in self.succ.values())
+
+    def __iter__(self):
+        return iter(self.succ)
+
+    def __len__(self):
+        return len(self.succ)
+
+    def __contains__(self, nodo):
+        return nodo in self.succ
+
+    def __getitem__(self, nodo):
+        return self.succ[nodo]
+
+
+def como_grafo(grafo) -> "GrafoProduccion | nx.DiGraph":
+    """Normaliza un grafo de producción.
+
+    Los objetos con la interfaz de ``nx.DiGraph`` (``succ``/``pred``) se
+    devuelven tal cual; un diccionario de adyacencia o una lista de aristas se
+    convierten en ``GrafoProduccion``.
+    """
+    if hasattr(grafo, "succ") and hasattr(grafo, "pred"):
+        return grafo
+    if isinstance(grafo, dict):
+        return GrafoProduccion.desde_adyacencia(grafo)
+    return GrafoProduccion(grafo)
+
+
+def orden_topologico(grafo) -> list:
+    """Ordena topológicamente los nodos con el algoritmo de Kahn, por generaciones.
+
+    Recorre los nodos y los vecinos en su orden de inserción, igual que
+    ``nx.topological_sort``, por lo que produce exactamente el mismo orden.
+
+    Args:
+        grafo (GrafoProduccion | nx.DiGraph): Grafo dirigido.
+
+    Raises:
+        ValueError: Si el grafo tiene un ciclo.
+    """
+    grado_entrada = {nodo: len(insumos) for nodo, insumos in grafo.pred.items() if insumos}
+    generacion = [nodo for nodo, insumos in grafo.pred.items() if not insumos]
+    orden = []
+    while generacion:
+        orden.extend(generacion)
+        siguiente = []
+        for nodo in generacion:
+            for producto in grafo.succ[nodo]:
+                grado_entrada[producto] -= 1
+                if grado_entrada[producto] == 0:
+                    siguiente.append(producto)
+                    del grado_entrada[producto]
+        generacion = siguiente
+    if grado_entrada:
+        raise ValueError("El grafo contiene un ciclo.")
+    return orden
+
+
+def _construir_csr(origen: np.ndarray, destino: np.ndarray, pesos: np.ndarray, n: int):
+    """Construye los arreglos (indptr, indices, pesos) de una matriz de adyacencia CSR.
+
+    Los vecinos de cada nodo quedan ordenados por id, es decir, en orden
+    topológico.
+    """
+    orden = np.lexsort((destino, origen))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origen, minlength=n), out=indptr[1:])
+    return indptr, destino[orden], pesos[orden]
+
+
+class ProductionGraphIndex:
+    """Índice compilado de un grafo de producción con ids enteros.
+
+    Se construye una sola vez a partir del grafo (``nx.DiGraph``,
+    ``GrafoProduccion``, lista de aristas o diccionario de adyacencia) y
+    reemplaza los recorridos O(N²) sobre pares de nodos. Los ids se asignan siguiendo el
+    orden topológico, por lo que ``orden_topologico`` es ``0..n-1``.
+
+    Attributes:
+        nodos (List[str]): Nodos del grafo en orden topológico (id -> nodo).
+        ids (Dict[str, int]): Mapeo nodo -> id entero.
+        pred_indptr, pred_indices (np.ndarray): Insumos directos en formato CSR.
+        succ_indptr, succ_indices (np.ndarray): Productos directos en formato CSR.
+        pred_pesos, succ_pesos (np.ndarray): Coeficiente de insumo de cada arista,
+            alineado con ``pred_indices`` / ``succ_indices``.
+        tiene_pesos (bool): True si algún coeficiente es distinto de 1.
+        orden_topologico (np.ndarray): Ids de los nodos en orden topológico.
+        clasificacion (np.ndarray): Código BIEN_PRIMARIO / BIEN_INTERMEDIO /
+            BIEN_FINAL de cada nodo.
+    """
+
+    def __init__(self, grafo: "nx.DiGraph | GrafoProduccion"):
+        grafo = como_grafo(grafo)
+        self.nodos = orden_topologico(grafo)
+        self.ids = {nodo: i for i, nodo in enumerate(self.nodos)}
+        n = len(self.nodos)
+
+        lista_aristas = list(grafo.edges(data=ATRIBUTO_COEFICIENTE, default=1))
+        origen = np.array([self.ids[u] for u, _, _ in lista_aristas], dtype=np.int64)
+        destino = np.array([self.ids[v] for _, v, _ in lista_aristas], dtype=np.int64)
+        pesos = np.array([w for _, _, w in lista_aristas], dtype=np.float64)
+
+        self.succ_indptr, self.succ_indices, self.succ_pesos = _construir_csr(
+            origen, destino, pesos, n
+        )
+        self.pred_indptr, self.pred_indices, self.pred_pesos = _construir_csr(
+            destino, origen, pesos, n
+        )
+        self.tiene_pesos = bool(np.any(pesos != 1))
+        self.orden_topologico = np.arange(n, dtype=np.int64)
+        self._aristas_por_altura = None
+
+        grado_entrada = np.diff(self.pred_indptr)
+        grado_salida = np.diff(self.succ_indptr)
+        self.clasificacion = np.full(n, BIEN_INTERMEDIO, dtype=np.int8)
+        self.clasificacion[grado_salida == 0] = BIEN_FINAL
+        self.clasificacion[grado_entrada == 0] = BIEN_PRIMARIO
+
+    # Arreglos que definen el índice (ver ``desde_arreglos``)
+    ARREGLOS = (
+        "pred_indptr",
+        "pred_indices",
+        "pred_pesos",
+        "succ_indptr",
+        "succ_indices",
+        "succ_pesos",
+        "clasificacion",
+    )
+
+    @classmethod
+    def desde_arreglos(
+        cls, nodos: List[str], arreglos: Dict[str, np.ndarray], tiene_pesos: bool
+    ) -> "ProductionGraphIndex":
+        """Reconstruye un índice ya compilado (por ejemplo, leído de disco)."""
+        indice = cls.__new__(cls)
+        indice.nodos = list(nodos)
+        indice.ids = {nodo: i for i, nodo in enumerate(indice.nodos)}
+        for nombre in cls.ARREGLOS:
+            setattr(indice, nombre, arreglos[nombre])
+        indice.tiene_pesos = bool(tiene_pesos)
+        indice.orden_topologico = np.arange(len(indice.nodos), dtype=np.int64)
+        indice._aristas_por_altura = None
+        return indice
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def insumos_ids(self, i: int) -> np.ndarray:
+        """Ids de los insumos directos del nodo con id ``i``."""
+        return self.pred_indices[self.pred_indptr[i] : self.pred_indptr[i + 1]]
+
+    def productos_ids(self, i: int) -> np.ndarray:
+        """Ids de los productos directos del nodo con id ``i``."""
+        return self.succ_indices[self.succ_indptr[i] : self.succ_indptr[i + 1]]
+
+    def insumos_de(self, nodo: str) -> List[str]:
+        return [self.nodos[j] for j in self.insumos_ids(self.ids[nodo]).tolist()]
+
+    def productos_de(self, nodo: str) -> List[str]:
+        return [self.nodos[j] for j in self.productos_ids(self.ids[nodo]).tolist()]
+
+    def _por_nodo(self, indptr: np.ndarray, indices: np.ndarray, pesos=None):
+        """Convierte una matriz CSR completa en listas por nodo con un solo ``tolist``."""
+        nombres = [self.nodos[j] for j in indices.tolist()]
+        if pesos is not None:
+            nombres = list(zip(nombres, pesos.tolist()))
+        cortes = indptr.tolist()
+        return {
+            nodo: nombres[inicio:fin]
+            for nodo, inicio, fin in zip(self.nodos, cortes[:-1], cortes[1:])
+        }
+
+    def insumos_por_nodo(self) -> Dict[str, List[str]]:
+        """Insumos directos de todos los nodos (ver ``insumos_de``)."""
+        return self._por_nodo(self.pred_indptr, self.pred_indices)
+
+    def productos_por_nodo(self) -> Dict[str, List[str]]:
+        """Productos directos de todos los nodos (ver ``productos_de``)."""
+        return self._por_nodo(self.succ_indptr, self.succ_indices)
+
+    def insumos_con_coeficientes_por_nodo(self) -> Dict[str, List[Tuple[str, float]]]:
+        """Insumos con coeficientes de todos los nodos (ver ``insumos_con_coeficientes``)."""
+        return self._por_nodo(self.pred_indptr, self.pred_indices, self.pred_pesos)
+
+    def insumos_con_coeficientes(self, nodo: str) -> List[Tuple[str, float]]:
+        """Insumos directos de ``nodo`` junto con su coeficiente de insumo."""
+        i = self.ids[nodo]
+        inicio, fin = self.pred_indptr[i], self.pred_indptr[i + 1]
+        return [
+            (self.nodos[j], w)
+            for j, w in zip(
+                self.pred_indices[inicio:fin].tolist(),
+                self.pred_pesos[inicio:fin].tolist(),
+            )
+        ]
+
+    def aristas_por_altura(self) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Agrupa las aristas según la altura de su nodo de origen.
+
+        La altura de un nodo es la longitud del camino más largo hasta un nodo
+        sin productos. Cada grupo contiene ``(origen, destino, peso)`` con las
+        aristas cuyo origen tiene altura 1, 2, ...; los destinos de un grupo
+        tienen siempre altura menor, así que los grupos pueden procesarse en
+        orden con operaciones vectorizadas. Se calcula una sola vez.
+        """
+        if self._aristas_por_altura is None:
+            n = len(self)
+            indptr = self.succ_indptr.tolist()
+            sucesores = self.succ_indices.tolist()
+            altura = [0] * n
+            for v in range(n - 1, -1, -1):
+                hijos = sucesores[indptr[v] : indptr[v + 1]]
+                if hijos:
+                    altura[v] = 1 + max(map(altura.__getitem__, hijos))
+
+            altura = np.array(altura, dtype=np.int64)
+            origen = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.succ_indptr))
+            orden = np.argsort(altura[origen], kind="stable")
+            limites = np.searchsorted(
+                altura[origen][orden], np.arange(1, altura.max(initial=0) + 2)
+            )
+            self._aristas_por_altura = [
+                (
+                    origen[orden[a:b]],
+                    self.succ_indices[orden[a:b]],
+                    self.succ_pesos[orden[a:b]],
+                )
+                for a, b in zip(limites[:-1], limites[1:])
+            ]
+        return self._aristas_por_altura
+
+    def clasificacion_de(self, nodo: str) -> str:
+        return NOMBRES_CLASIFICACION[self.clasificacion[self.ids[nodo]]]
+
+    def bienes_por_clasificacion(self, codigo: int) -> List[str]:
+        """Nodos con el código de clasificación dado, en orden topológico."""
+        return [
+            self.nodos[i] for i in np.flatnonzero(self.clasificacion == codigo).tolist()
+        ]
+
+
+GrafoOIndice = Union["nx.DiGraph", GrafoProduccion, ProductionGraphIndex]
+
+
+def compilar_grafo(grafo: GrafoOIndice) -> ProductionGraphIndex:
+    """Devuelve el índice compilado del grafo (o el mismo índice si ya lo es).
+
+    Args:
+        grafo (nx.DiGraph | ProductionGraphIndex): Grafo de producción.
+
+    Returns:
+        ProductionGraphIndex: Índice compilado del grafo.
+    """
+    if isinstance(grafo, ProductionGraphIndex):
+        return grafo
+    return ProductionGraphIndex(grafo)
 
 
 # Función auxiliar para obtener nodos de un grafo
-def get_nodes(grafo: nx.DiGraph) -> List[str]:
+def get_nodes(grafo: GrafoOIndice) -> List[str]:
     """Obtiene la lista de nodos en un grafo dirigido.
 
     Args:
-        grafo (nx.DiGraph): Grafo dirigido a obtener nodos.
+        grafo (nx.DiGraph | ProductionGraphIndex): Grafo dirigido a obtener nodos.
 
     Returns:
-        List[str]: Lista de nodos en el grafo.
+        List[str]: Lista de nodos en el grafo, en orden topológico.
     """
-    return list(nx.topological_sort(grafo))
+    if isinstance(grafo, ProductionGraphIndex):
+        return list(grafo.nodos)
+    return orden_topologico(como_grafo(grafo))
 
 
 # Función para verificar conexión directa en el grafo
-def verificar_conexion_directa(grafo: nx.DiGraph, nodo1: str, nodo2: str) -> bool:
+def verificar_conexion_directa(grafo: "nx.DiGraph", nodo1: str, nodo2: str) -> bool:
     """Verifica si existe una conexión directa entre dos nodos en un grafo.
 
     Args:
@@ -28,63 +397,43 @@ def verificar_conexion_directa(grafo: nx.DiGraph, nodo1: str, nodo2: str) -> boo
         bool: True si existe una conexión directa entre los nodos, False en caso
             contrario.
     """
-    return grafo.has_edge(nodo1, nodo2)
+    return como_grafo(grafo).has_edge(nodo1, nodo2)
 
 
 # Generar insumos directos para cada nodo
-def generar_insumos_directos(grafo: nx.DiGraph) -> Dict[str, List[str]]:
+def generar_insumos_directos(grafo: GrafoOIndice) -> Dict[str, List[str]]:
     """
-    Genera un diccionario que mapea cada nodo a una lista de nodos
-    a los que está directamente conectado en un grafo dirigido.
+    Genera un diccionario que mapea cada nodo a la lista de nodos que son
+    sus insumos directos (predecesores) en un grafo dirigido.
 
     Args:
-        grafo (nx.DiGraph): Grafo dirigido del cual se obtendrán los insumos.
+        grafo (nx.DiGraph | ProductionGraphIndex): Grafo dirigido del cual se
+            obtendrán los insumos.
 
     Returns:
         Dict[str, List[str]]: Un diccionario donde cada clave es un nodo del grafo
-        y su valor es una lista de nodos a los que está directamente conectado.
+        y su valor es la lista de sus insumos directos, en orden topológico.
     """
-    nodos = get_nodes(grafo)
-    insumos_directos = {}
-
-    for nodo in nodos:
-        insumos_directos[nodo] = []
-    for nodo1 in nodos:
-        for nodo2 in nodos:
-            if verificar_conexion_directa(grafo, nodo1, nodo2):
-                insumos_directos[nodo2].append(
-                    nodo1
-                )  # Corregido el nombre de la variable
-
-    return insumos_directos
+    return compilar_grafo(grafo).insumos_por_nodo()
 
 
-def generar_productos_directos(grafo: nx.DiGraph) -> Dict[str, List[str]]:
+def generar_productos_directos(grafo: GrafoOIndice) -> Dict[str, List[str]]:
     """
-    Genera un diccionario que mapea cada nodo a una lista de nodos
-    a los que está directamente conectado en un grafo dirigido.
+    Genera un diccionario que mapea cada nodo a la lista de nodos que son
+    sus productos directos (sucesores) en un grafo dirigido.
 
     Args:
-        grafo (nx.DiGraph): Grafo dirigido del cual se obtendrán los insumos.
+        grafo (nx.DiGraph | ProductionGraphIndex): Grafo dirigido del cual se
+            obtendrán los productos.
 
     Returns:
+        Dict[str, List[str]]: Un diccionario donde cada clave es un nodo del grafo
+        y su valor es la lista de sus productos directos, en orden topológico.
     """
-    nodos = get_nodes(grafo)
-    productos_directos = {}
-
-    for nodo in nodos:
-        productos_directos[nodo] = []
-    for nodo1 in nodos:
-        for nodo2 in nodos:
-            if verificar_conexion_directa(grafo, nodo1, nodo2):
-                productos_directos[nodo1].append(
-                    nodo2
-                )  # Corregido el nombre de la variable
-
-    return productos_directos
+    return compilar_grafo(grafo).productos_por_nodo()
 
 
-def clasificar_bienes(grafo: nx.DiGraph) -> Dict[str, List[str]]:
+def clasificar_bienes(grafo: GrafoOIndice) -> Dict[str, str]:
     """
     Clasifica los nodos de un grafo de producción en bienes primarios, intermedios o finales.
 
@@ -92,32 +441,24 @@ def clasificar_bienes(grafo: nx.DiGraph) -> Dict[str, List[str]]:
     y un bien intermedio es aquel que tiene tanto insumos como productos.
 
     Args:
-        grafo (nx.DiGraph): Grafo dirigido que representa el proceso de producción.
+        grafo (nx.DiGraph | ProductionGraphIndex): Grafo dirigido que representa
+            el proceso de producción.
 
     Returns:
         Dict[str, str]: Un diccionario que mapea cada nodo a su clasificación como "bien_primario",
                         "bien_intermedio" o "bien_final".
     """
-
-    insumos = generar_insumos_directos(grafo)
-    productos = generar_productos_directos(grafo)
-    clasificacion_bienes = {}
-
-    for nodo in insumos:
-        if not insumos[nodo]:
-            clasificacion_bienes[nodo] = "bien_primario"
-        elif not productos[nodo]:
-            clasificacion_bienes[nodo] = "bien_final"
-        else:
-            clasificacion_bienes[nodo] = "bien_intermedio"
-
-    return clasificacion_bienes
+    indice = compilar_grafo(grafo)
+    return {
+        nodo: NOMBRES_CLASIFICACION[codigo]
+        for nodo, codigo in zip(indice.nodos, indice.clasificacion.tolist())
+    }
 
 
 # ------------------------
 
 
-def get_bienes_primarios(grafo: nx.DiGraph) -> List[str]:
+def get_bienes_primarios(grafo: GrafoOIndice) -> List[str]:
     """
     Devuelve una lista de todos los bienes primarios en el grafo de producción.
 
@@ -134,16 +475,11 @@ def get_bienes_primarios(grafo: nx.DiGraph) -> List[str]:
         Lista de bienes primarios.
     """
 
-    clasificacion_bienes = clasificar_bienes(grafo)
-    bienes_primarios = [
-        bien
-        for bien, clasificacion in clasificacion_bienes.items()
-        if clasificacion == "bien_primario"
-    ]
+    bienes_primarios = compilar_grafo(grafo).bienes_por_clasificacion(BIEN_PRIMARIO)
     return bienes_primarios
 
 
-def get_bienes_intermedios(grafo: nx.DiGraph) -> List[str]:
+def get_bienes_intermedios(grafo: GrafoOIndice) -> List[str]:
     """
     Devuelve una lista de todos los bienes intermedios en el grafo de producci n.
 
@@ -160,16 +496,11 @@ def get_bienes_intermedios(grafo: nx.DiGraph) -> List[str]:
     List[str]
         Lista de bienes intermedios en el grafo de producci n.
     """
-    clasificacion_bienes = clasificar_bienes(grafo)
-    bienes_intermedios = [
-        bien
-        for bien, clasificacion in clasificacion_bienes.items()
-        if clasificacion == "bien_intermedio"
-    ]
+    bienes_intermedios = compilar_grafo(grafo).bienes_por_clasificacion(BIEN_INTERMEDIO)
     return bienes_intermedios
 
 
-def get_bienes_finales(grafo: nx.DiGraph) -> List[str]:
+def get_bienes_finales(grafo: GrafoOIndice) -> List[str]:
     """
     Devuelve una lista de todos los bienes finales en el grafo de producci n.
 
@@ -183,22 +514,69 @@ def get_bienes_finales(grafo: nx.DiGraph) -> List[str]:
     List[str]
         Lista de bienes finales.
     """
-    clasificacion_bienes = clasificar_bienes(grafo)
-    bienes_finales = [
-        bien
-        for bien, clasificacion in clasificacion_bienes.items()
-        if clasificacion == "bien_final"
-    ]
+    bienes_finales = compilar_grafo(grafo).bienes_por_clasificacion(BIEN_FINAL)
     return bienes_finales
 
 
-def cantidad_caminos_x_to_y(grafo: nx.DiGraph, x, y) -> Dict[str, int]:
+def contar_caminos_hacia(
+    indice: ProductionGraphIndex, destino: int, unidades_enteras: bool = False
+) -> List[int]:
+    """
+    Cuenta, para cada nodo, el número de caminos dirigidos hasta ``destino``.
+
+    Programación dinámica sobre el orden topológico inverso:
+    ``caminos[v] = sum(caminos[s] for s in productos(v))``, con
+    ``caminos[destino] = 1``. Corre en O(V+E) y usa enteros de Python, por lo
+    que los conteos grandes no se desbordan. En un DAG todo camino es
+    sencillo, así que el resultado coincide con ``nx.all_simple_paths``.
+
+    Parameters
+    ----------
+    indice : ProductionGraphIndex
+        Índice compilado del grafo.
+    destino : int
+        Id del nodo de destino.
+    unidades_enteras : bool, optional
+        Si es True, cada camino se pondera por el producto de los
+        ``ceil(coeficiente)`` de sus aristas: es el requerimiento de
+        ``explotar_requerimientos`` con ``unidades_enteras=True``, pero exacto
+        aunque supere la precisión de un float64.
+
+    Returns
+    -------
+    List[int]
+        Lista indexada por id con el número de caminos de cada nodo a ``destino``.
+    """
+    caminos = [0] * len(indice)
+    caminos[destino] = 1
+    indptr = indice.succ_indptr.tolist()
+    sucesores = indice.succ_indices.tolist()
+
+    if unidades_enteras and indice.tiene_pesos:
+        pesos = [math.ceil(peso) for peso in indice.succ_pesos.tolist()]
+        for v in range(destino - 1, -1, -1):
+            total = 0
+            for k in range(indptr[v], indptr[v + 1]):
+                total += pesos[k] * caminos[sucesores[k]]
+            caminos[v] = total
+        return caminos
+
+    # Solo los nodos anteriores al destino en el orden topológico pueden alcanzarlo
+    for v in range(destino - 1, -1, -1):
+        total = 0
+        for s in sucesores[indptr[v] : indptr[v + 1]]:
+            total += caminos[s]
+        caminos[v] = total
+    return caminos
+
+
+def cantidad_caminos_x_to_y(grafo: GrafoOIndice, x, y) -> int:
     """
     Devuelve el n mero de caminos sencillos desde el nodo x hasta el nodo y en el grafo.
 
     Parameters
     ----------
-    grafo : nx.DiGraph
+    grafo : nx.DiGraph | ProductionGraphIndex
         Grafo dirigido.
     x : str
         Nodo de partida.
@@ -210,35 +588,146 @@ def cantidad_caminos_x_to_y(grafo: nx.DiGraph, x, y) -> Dict[str, int]:
     int
         N mero de caminos sencillos desde x hasta y.
     """
-    caminos = nx.all_simple_paths(grafo, source=x, target=y)
-    return len(list(caminos))
+    indice = compilar_grafo(grafo)
+    if x == y:
+        return 0
+    return contar_caminos_hacia(indice, indice.ids[y])[indice.ids[x]]
+
 
+# Aristas por altura (por columna de la demanda) a partir de las cuales una
+# operación vectorizada por altura es más rápida que recorrerlas en Python
+_ARISTAS_POR_GRUPO_VECTORIZADO = 50
 
-def generar_cantidad_requerida_bienes(grafo: nx.DiGraph) -> Dict[str, int]:
+
+def _barrido_topologico(
+    indice: ProductionGraphIndex, x: List[float], pesos: np.ndarray
+) -> List[float]:
+    """
+    Acumula ``x[v] += sum(pesos[v, s] * x[s] for s in productos(v))`` en orden
+    topológico inverso y devuelve ``x``.
+    """
+    indptr = indice.succ_indptr.tolist()
+    sucesores = indice.succ_indices.tolist()
+    pesos = pesos.tolist()
+    for v in range(len(x) - 1, -1, -1):
+        inicio, fin = indptr[v], indptr[v + 1]
+        if inicio != fin:
+            total = 0.0
+            for k in range(inicio, fin):
+                total += pesos[k] * x[sucesores[k]]
+            x[v] += total
+    return x
+
+
+def explotar_requerimientos(
+    grafo: GrafoOIndice, demanda=None, unidades_enteras: bool = False
+) -> np.ndarray:
+    """
+    Calcula los requerimientos brutos de todos los bienes para una demanda final.
+
+    Resuelve ``x = d + A·x``, es decir ``x = (I − A)⁻¹·d``, donde ``A[i, j]`` es
+    el coeficiente de insumo de ``i`` en ``j``. Como ``A`` es triangular en el
+    orden topológico, la solución se obtiene con un barrido por alturas
+    (``ProductionGraphIndex.aristas_por_altura``): todas las aristas cuyo
+    origen tiene la misma altura se acumulan en una sola operación vectorizada.
+    En grafos profundos, donde cada altura tiene pocas aristas, el costo fijo
+    de esas operaciones domina y se usa en su lugar un barrido en Python sobre
+    el orden topológico inverso, en O(V+E) por columna de la demanda.
+
+    Parameters
+    ----------
+    grafo : nx.DiGraph | ProductionGraphIndex
+        Grafo de producci n.
+    demanda : np.ndarray | Dict[str, float], optional
+        Demanda final por bien, indexada por id (arreglo de forma ``(n,)`` o
+        ``(n, k)`` para ``k`` demandas a la vez) o como diccionario bien ->
+        cantidad. Por defecto, una unidad del primer bien final.
+    unidades_enteras : bool, optional
+        Si es True, cada coeficiente se redondea hacia arriba, como lo consume
+        cada orden de producción del Planner (``ceil(coeficiente)`` unidades de
+        cada insumo). Con una demanda entera el resultado es entero.
+
+    Returns
+    -------
+    np.ndarray
+        Requerimiento bruto de cada bien, indexado por id.
+    """
+    indice = compilar_grafo(grafo)
+    n = len(indice)
+    if demanda is None:
+        x = np.zeros(n, dtype=np.float64)
+        x[np.flatnonzero(indice.clasificacion == BIEN_FINAL)[0]] = 1
+    elif isinstance(demanda, dict):
+        x = np.zeros(n, dtype=np.float64)
+        for bien, cantidad in demanda.items():
+            x[indice.ids[bien]] = cantidad
+    else:
+        x = np.array(demanda, dtype=np.float64, copy=True)
+
+    columnas = 1 if x.ndim == 1 else int(np.prod(x.shape[1:]))
+    # Con una sola columna, calcular las alturas cuesta lo mismo que el barrido
+    # en Python, así que solo se agrupa por altura si los grupos ya existen
+    grupos = indice._aristas_por_altura
+    if grupos is None and columnas > 1:
+        grupos = indice.aristas_por_altura()
+    aristas = len(indice.succ_indices) * columnas
+    if grupos is None or aristas < _ARISTAS_POR_GRUPO_VECTORIZADO * len(grupos):
+        pesos = np.ceil(indice.succ_pesos) if unidades_enteras else indice.succ_pesos
+        por_columna = x.reshape(n, columnas)
+        for j in range(columnas):
+            por_columna[:, j] = _barrido_topologico(
+                indice, por_columna[:, j].tolist(), pesos
+            )
+        return x
+
+    forma_pesos = (-1,) + (1,) * (x.ndim - 1)
+    for origen, destino, peso in grupos:
+        # Las aristas de cada grupo vienen ordenadas por origen
+        inicios = np.flatnonzero(np.r_[True, origen[1:] != origen[:-1]])
+        if unidades_enteras:
+            peso = np.ceil(peso)
+        valores = peso.reshape(forma_pesos) * x[destino]
+        x[origen[inicios]] += np.add.reduceat(valores, inicios, axis=0)
+    return x
+
+
+def generar_cantidad_requerida_bienes(
+    grafo: GrafoOIndice, indice: ProductionGraphIndex = None
+) -> Dict[str, int]:
     """
     Devuelve un diccionario con la cantidad inicial de cada bien primario necesario
     para producir un bien final. La cantidad inicial se calcula como el n mero de
     caminos sencillos desde cada bien primario hasta el bien final.
 
+    Los caminos se cuentan una sola vez para todos los nodos con
+    ``contar_caminos_hacia``, en lugar de enumerarlos bien por bien. Si las
+    aristas tienen coeficientes de insumo (``ATRIBUTO_COEFICIENTE``), cada
+    camino se pondera por sus coeficientes redondeados hacia arriba
+    (``unidades_enteras=True``): cada unidad de un producto consume
+    ``ceil(coeficiente)`` unidades de cada insumo, igual que las órdenes de
+    producción del Planner, así que lo comprado alcanza para todo el plan.
+
     Parameters
     ----------
-    grafo : nx.DiGraph
+    grafo : nx.DiGraph | ProductionGraphIndex
         Grafo de producci n.
+    indice : ProductionGraphIndex, optional
+        Índice ya compilado del grafo. Si no se entrega, se compila.
 
     Returns
     -------
     Dict[str, int]
         Diccionario con la cantidad inicial de cada bien primario.
     """
+    indice = indice if indice is not None else compilar_grafo(grafo)
     cantidad_requerida_bienes = {}
-    bienes = get_bienes_primarios(grafo)
-    bienes = bienes + get_bienes_intermedios(grafo)
-    bien_final = get_bienes_finales(grafo)[0]
+    bienes = get_bienes_primarios(indice)
+    bienes = bienes + get_bienes_intermedios(indice)
+    bien_final = get_bienes_finales(indice)[0]
 
+    caminos = contar_caminos_hacia(indice, indice.ids[bien_final], unidades_enteras=True)
     for bien in bienes:
-        cantidad_requerida_bienes[bien] = cantidad_caminos_x_to_y(
-            grafo, bien, bien_final
-        )
+        cantidad_requerida_bienes[bien] = caminos[indice.ids[bien]]
     # Agregar el bien final con cantidad 1
 
     cantidad_requerida_bienes[bien_final] = 1
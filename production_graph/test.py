@@ -1,14 +1,9 @@
-import networkx as nx
-import importlib
-from collections import deque
-import matplotlib.pyplot as plt
 import production_graph as pg
 import planner as pln
 
 
-# Ejemplo de uso:
-G = nx.DiGraph()
-G.add_edges_from(
+# Ejemplo de uso (sin networkx; un nx.DiGraph con las mismas aristas también sirve):
+G = pg.GrafoProduccion(
     [
         ("A", "C"),
         ("B", "C"),
@@ -23,10 +18,10 @@ G.add_edges_from(
 )
 
 
-proceso = pln.Proceso_productivo(G)
+proceso = pln.ProcesoProductivo(G)
 
 
-plan = [0, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0]
+plan = [0, 0, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 0]  # un elemento por paso (15)
 
 planeador = pln.Planner(proceso)
 
@@ -0,0 +1,70 @@
+"""Grafos de producción aleatorios pequeños y resultados de referencia para los tests."""
+import random
+
+import numpy as np
+
+from production_graph import production_graph as pg
+from production_graph.planner import AGENTES, Planner, ProcesoProductivo
+
+
+def proceso_aleatorio(semilla: int, coeficientes=(1,), n: int = 6, max_largo: int = 10):
+    """
+    ProcesoProductivo sobre un DAG aleatorio con un único bien final y a lo sumo
+    ``max_largo`` pasos de plan, para poder enumerar todos sus planes.
+    """
+    rng = random.Random(semilla)
+    while True:
+        nodos = [f"G{i}" for i in range(n)]
+        aristas = {}
+        for i in range(n - 1):
+            # Todo bien salvo el último alimenta al menos a un bien posterior
+            for j in {rng.randrange(i + 1, n)} | {
+                j for j in range(i + 1, n) if rng.random() < 0.3
+            }:
+                aristas[nodos[i], nodos[j]] = rng.choice(coeficientes)
+        grafo = pg.GrafoProduccion(
+            [(u, v, {pg.ATRIBUTO_COEFICIENTE: c}) for (u, v), c in aristas.items()]
+        )
+        proceso = ProcesoProductivo(grafo)
+        if sum(proceso.get_cantidades_requeridas().values()) <= max_largo:
+            return proceso
+
+
+def largo_plan(proceso: ProcesoProductivo) -> int:
+    return sum(proceso.get_cantidades_requeridas().values())
+
+
+def planes_aleatorios(proceso: ProcesoProductivo, n_planes: int, semilla: int = 0):
+    rng = np.random.default_rng(semilla)
+    return rng.integers(0, 2, size=(n_planes, largo_plan(proceso)), dtype=np.int8)
+
+
+def conteos_de_referencia(proceso: ProcesoProductivo, plan):
+    """
+    Compras (3, 3), producciones (3,) y si ``Planner.ejecutar_plan`` completó
+    ``plan``, calculados a partir de sus transacciones.
+    """
+    compras = np.zeros((len(AGENTES), len(AGENTES)), dtype=np.int64)
+    producciones = np.zeros(len(AGENTES), dtype=np.int64)
+    try:
+        transacciones = Planner(proceso).ejecutar_plan(list(plan))
+    except ValueError:
+        return compras, producciones, False
+    for _, agentes, tipo, _ in transacciones:
+        if tipo == "compra":
+            compras[AGENTES.index(agentes[0]), AGENTES.index(agentes[1])] += 1
+        else:
+            producciones[AGENTES.index(agentes[0])] += 1
+    return compras, producciones, True
+
+
+def assert_resultados_de_referencia(proceso: ProcesoProductivo, planes, resultados):
+    """Compara ``ResultadosPlanes`` con ``ejecutar_plan`` plan por plan."""
+    assert len(resultados.paso_fallo) == len(planes)
+    for p, plan in enumerate(planes):
+        compras, producciones, completo = conteos_de_referencia(proceso, plan)
+        assert (resultados.paso_fallo[p] == -1) == completo
+        if completo:
+            np.testing.assert_array_equal(resultados.compras[p], compras)
+            np.testing.assert_array_equal(resultados.producciones[p], producciones)
+            assert resultados.compras_transfronterizas[p] == compras[0, 1] + compras[1, 0]
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from production_graph import production_graph as pg
+from production_graph.cache import FORMATO, CacheProcesos, huella_grafo
+from production_graph.planner import ProcesoProductivo
+from tests.grafos import proceso_aleatorio
+from tests.test_proceso_incremental import assert_equivalente
+
+
+@pytest.mark.parametrize("semilla", range(6))
+def test_proceso_desde_cache_equivale_a_compilarlo(tmp_path, semilla):
+    grafo = proceso_aleatorio(semilla, coeficientes=(1, 2, 0.5)).get_grafo()
+    cache = CacheProcesos(str(tmp_path))
+
+    compilado = ProcesoProductivo(grafo, cache=cache)
+    assert os.path.exists(cache.ruta(huella_grafo(grafo)))
+    assert cache.cargar(huella_grafo(grafo), grafo) is not None
+
+    assert_equivalente(ProcesoProductivo(grafo, cache=cache), compilado)
+    assert_equivalente(ProcesoProductivo(grafo), compilado)
+
+
+def escribir_entrada_invalida(ruta, tipo):
+    if tipo == "bytes":
+        with open(ruta, "wb") as archivo:
+            archivo.write(b"no es un npz")
+    elif tipo == "truncada":
+        with open(ruta, "rb") as archivo:
+            contenido = archivo.read()
+        with open(ruta, "wb") as archivo:
+            archivo.write(contenido[: len(contenido) // 2])
+    else:
+        with np.load(ruta) as datos:
+            contenido = {nombre: datos[nombre] for nombre in datos.files}
+        if tipo == "formato":
+            contenido["formato"] = np.array(FORMATO + 1)
+        elif tipo == "indptr":
+            contenido["succ_indptr"] = contenido["succ_indptr"][:-1]
+        elif tipo == "brutos":
+            contenido["brutos"] = np.array("[1]")
+        else:
+            del contenido["clasificacion"]
+        np.savez(ruta, **contenido)
+
+
+@pytest.mark.parametrize(
+    "tipo", ["bytes", "truncada", "formato", "indptr", "brutos", "sin_arreglo"]
+)
+def test_entrada_corrupta_se_descarta_y_se_recompila(tmp_path, tipo):
+    grafo = proceso_aleatorio(0, coeficientes=(1, 2, 0.5)).get_grafo()
+    cache = CacheProcesos(str(tmp_path))
+    esperado = ProcesoProductivo(grafo, cache=cache)
+    huella = huella_grafo(grafo)
+    escribir_entrada_invalida(cache.ruta(huella), tipo)
+
+    assert cache.cargar(huella, grafo) is None
+    assert not os.path.exists(cache.ruta(huella))
+
+    # Se recompila y la entrada vuelve a guardarse
+    assert_equivalente(ProcesoProductivo(grafo, cache=cache), esperado)
+    assert cache.cargar(huella, grafo) is not None
+
+
+def test_nodos_no_json_no_se_guardan(tmp_path):
+    grafo = pg.GrafoProduccion([(("a", 1), "C"), (("b", 2), "C")])
+    cache = CacheProcesos(str(tmp_path))
+
+    proceso = ProcesoProductivo(grafo, cache=cache)
+
+    assert proceso.get_cantidades_requeridas()[("a", 1)] == 1
+    assert not os.listdir(tmp_path)
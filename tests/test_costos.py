@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from economy import economy as ec
+from production_graph.costos import CosteoPlanes, EscenariosPrecios
+from production_graph.planner import AGENTES, Planner
+from tests.grafos import planes_aleatorios, proceso_aleatorio
+from tests.test_economy import economia
+
+SOBRECOSTOS = {"NCT": 1.5, "ZF": 0.25, "MKT": 0.0}
+
+
+def costo_final_economy(proceso, plan) -> float:
+    """Costo del bien final al repetir el plan orden por orden en el economy."""
+    ejecutor, registro = economia(proceso, sobrecostos=SOBRECOSTOS)
+    transacciones = Planner(proceso).ejecutar_plan(plan.tolist())
+    ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+    bien_final = transacciones[-1][3]
+    (costo,) = [
+        unidad.cost
+        for agente in registro.agents
+        for unidad in agente.inventory.inventory.get(bien_final, ())
+    ]
+    return costo
+
+
+@pytest.mark.parametrize("semilla", range(10))
+@pytest.mark.parametrize("coeficientes", [(1,), (1, 2, 0.5)], ids=["simple", "ponderado"])
+def test_costeo_planes_equivale_al_economy(semilla, coeficientes):
+    proceso = proceso_aleatorio(semilla, coeficientes=coeficientes)
+    planner = Planner(proceso)
+    clasificacion = proceso.get_clasificacion_bienes()
+    # economia() abastece el mercado con unidades de costo 1
+    costeo = CosteoPlanes(
+        planner,
+        cost_strategy=ec.SimpleAdditiveCostStrategy(),
+        info_agentes={agente: {"overhead": SOBRECOSTOS[agente]} for agente in AGENTES},
+        costos_primarios={b: 1.0 for b, c in clasificacion.items() if c == "bien_primario"},
+    )
+    planes = planes_aleatorios(proceso, 6, semilla)
+
+    costos = costeo.costear(planes, tamano_lote=4)
+
+    assert (costos.resultados.paso_fallo == -1).all()
+    np.testing.assert_allclose(
+        costos.costo_final, [costo_final_economy(proceso, plan) for plan in planes]
+    )
+
+
+@pytest.mark.parametrize("semilla", range(4))
+@pytest.mark.parametrize("por_bien", [False, True], ids=["plana", "por_bien"])
+def test_escenarios_precios_equivale_a_costear_cada_escenario(semilla, por_bien):
+    rng = np.random.default_rng(semilla)
+    proceso = proceso_aleatorio(semilla, coeficientes=(1, 2, 0.5))
+    planner = Planner(proceso)
+    plan = planes_aleatorios(proceso, 1, semilla)
+    transacciones = planner.ejecutar_plan(plan[0].tolist())
+    bienes = list(proceso.get_cantidades_requeridas())
+    indices_bienes = {bien: i for i, bien in enumerate(bienes)}
+    clasificacion = proceso.get_clasificacion_bienes()
+    argumentos = dict(
+        cost_strategy=ec.SimpleAdditiveCostStrategy(),
+        info_agentes={agente: {"overhead": SOBRECOSTOS[agente]} for agente in AGENTES},
+        costos_primarios={b: 2.0 for b, c in clasificacion.items() if c == "bien_primario"},
+    )
+    forma = (23, 3, 3, len(bienes)) if por_bien else (23, 3, 3)
+    precios = rng.integers(0, 10, size=forma).astype(np.float64)
+
+    escenarios = EscenariosPrecios(
+        transacciones, indices_bienes=indices_bienes if por_bien else None, **argumentos
+    )
+    metricas = escenarios.evaluar(precios, tamano_bloque=5)
+
+    esperado = []
+    for escenario in precios:
+        # PriceMatrix usa ejes (bien, comprador, vendedor)
+        matriz = ec.PriceMatrix(
+            np.moveaxis(escenario, -1, 0) if por_bien else escenario, indices_bienes
+        )
+        esperado.append(CosteoPlanes(planner, matriz, **argumentos).costo_final(plan)[0])
+    np.testing.assert_allclose(metricas.costo_final, esperado)
+
+    def precio(escenario, comprador, vendedor, bien):
+        ejes = (AGENTES.index(comprador), AGENTES.index(vendedor))
+        return escenario[ejes + ((indices_bienes[bien],) if por_bien else ())]
+
+    compras = [(a, b) for _, a, tipo, b in transacciones if tipo == "compra"]
+    np.testing.assert_allclose(
+        metricas.costo_compras,
+        [sum(precio(e, *agentes, bien) for agentes, bien in compras) for e in precios],
+    )
+    np.testing.assert_allclose(
+        metricas.costo_transfronterizo,
+        [
+            sum(
+                precio(e, *agentes, bien)
+                for agentes, bien in compras
+                if set(agentes) == {"NCT", "ZF"}
+            )
+            for e in precios
+        ],
+    )
+
+    # Por bloques entregados como iterable se obtiene lo mismo
+    bloques = (precios[i : i + 7] for i in range(0, len(precios), 7))
+    np.testing.assert_allclose(escenarios.evaluar(bloques).costo_final, esperado)
+    assert escenarios.evaluar(precios[:0]).costo_final.shape == (0,)
+
+    resumen = metricas.resumen(percentiles=(10, 50, 90))
+    for nombre in ("costo_final", "costo_compras", "costo_transfronterizo"):
+        valores = getattr(metricas, nombre)
+        assert resumen[nombre]["media"] == pytest.approx(valores.mean())
+        assert resumen[nombre]["desviacion"] == pytest.approx(valores.std())
+        assert resumen[nombre]["min"] == valores.min()
+        assert resumen[nombre]["max"] == valores.max()
+        for p in (10, 50, 90):
+            assert resumen[nombre][f"p{p}"] == pytest.approx(np.percentile(valores, p))
@@ -0,0 +1,305 @@
+import random
+
+import numpy as np
+import pytest
+
+from economy import economy as ec
+from production_graph import production_graph as pg
+from production_graph.planner import AGENTES, Planner, ProcesoProductivo
+
+
+def grafo_ejemplo():
+    return pg.GrafoProduccion(
+        [("A", "C"), ("B", "C"), ("B", "D"), ("C", "E"), ("D", "E"), ("E", "K")]
+    )
+
+
+def grafo_ponderado():
+    """A -> C con coeficiente 2 y B -> D con coeficiente 3."""
+    return pg.GrafoProduccion(
+        [
+            ("A", "C", {pg.ATRIBUTO_COEFICIENTE: 2}),
+            ("B", "D", {pg.ATRIBUTO_COEFICIENTE: 3}),
+            ("C", "K"),
+            ("D", "K"),
+        ]
+    )
+
+
+def economia(proceso: ProcesoProductivo, almacen: ec.GoodStore = None, sobrecostos=None):
+    """Agentes de AGENTES, mercado abastecido con los bienes primarios y executor."""
+    almacen = almacen or ec.GoodStore()
+    sobrecostos = sobrecostos or {}
+    registro = ec.AgentRegistry(
+        [
+            ec.EconomyAgent(
+                nombre, ec.FIFOInventoryStrategy(), {"overhead": sobrecostos.get(nombre, 1.0)}
+            )
+            for nombre in AGENTES
+        ]
+    )
+    mercado = registro.get_agent("MKT")
+    clasificacion = proceso.get_clasificacion_bienes()
+    for bien, cantidad in proceso.get_cantidades_requeridas().items():
+        if clasificacion[bien] == "bien_primario":
+            for indice in almacen.allocate_many(bien, cantidad, cost=1.0):
+                mercado.add_good(ec.Good.from_index(almacen, int(indice)))
+    precios = ec.PriceMatrix(np.arange(9, dtype=np.float64).reshape(3, 3))
+    config = ec.EconomyConfig(
+        proceso,
+        precios,
+        None,
+        ec.PriceMatrixLookup(precios, registro),
+        ec.PGraphProductionLookup(proceso),
+        registro,
+        ec.TupleOrderInterpreter(),
+        almacen,
+    )
+    return ec.OrderExecutor(config, ec.SimpleAdditiveCostStrategy()), registro
+
+
+def transacciones_ejemplo(semilla: int = 0, grafo=None):
+    proceso = ProcesoProductivo(grafo or grafo_ejemplo())
+    largo = sum(proceso.get_cantidades_requeridas().values())
+    plan = [random.Random(semilla).randint(0, 1) for _ in range(largo)]
+    return proceso, Planner(proceso).ejecutar_plan(plan)
+
+
+def inventarios(registro: ec.AgentRegistry):
+    return {
+        agente.name: sorted(
+            (unidad.good_type, unidad.cost)
+            for unidades in agente.inventory.inventory.values()
+            for unidad in unidades
+        )
+        for agente in registro.agents
+    }
+
+
+def test_agentes_publicos_instanciables():
+    agente = ec.EconomyAgent("NCT", ec.LIFOInventoryStrategy(), {"overhead": 2.0})
+    assert agente.agent_complementary_info == {"overhead": 2.0}
+    assert ec.MarketAgent("MKT").get_stock_quantity("A") == 0
+    assert isinstance(ec.NctFirm("NCT").inventory_strategy, ec.FIFOInventoryStrategy)
+    assert ec.ZfFirm("ZF", agent_complementary_info={"overhead": 1.0}).agent_complementary_info
+
+
+def test_ejecucion_por_orden_por_lote_y_pipeline_coinciden():
+    proceso, transacciones = transacciones_ejemplo()
+
+    ejecutor, registro = economia(proceso)
+    interprete = ec.TupleOrderInterpreter()
+    for transaccion in transacciones:
+        orden = interprete.interpret_order(transaccion)
+        ejecutor.generate_info(orden)
+        ejecutor.validate_order(orden)
+        ejecutor.execute_order(orden)
+    esperado = inventarios(registro)
+    assert [u for _, u in esperado["NCT"] + esperado["ZF"]] and not esperado["MKT"]
+
+    ejecutor, registro = economia(proceso)
+    ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+    assert inventarios(registro) == esperado
+
+    ejecutor, registro = economia(proceso)
+    assert ec.OrderPipeline(ejecutor, chunk_size=3).run(iter(transacciones)) == len(transacciones)
+    assert inventarios(registro) == esperado
+
+
+def test_producciones_en_el_almacen_configurado_y_filas_recicladas():
+    proceso, transacciones = transacciones_ejemplo()
+    almacen = ec.GoodStore()
+    ejecutor, registro = economia(proceso, almacen)
+    primarios = almacen.n_units
+
+    with ec.GoodStore.default_scope() as por_defecto:
+        ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+
+    assert por_defecto.size == 0
+    unidades = [u for a in registro.agents for us in a.inventory.inventory.values() for u in us]
+    assert unidades and all(unidad.store is almacen for unidad in unidades)
+    # Cada producción libera sus insumos y reutiliza una fila: el almacén no crece
+    assert almacen.size == primarios
+    assert almacen.n_units == len(unidades)
+
+
+def primer_fallo_por_orden(proceso: ProcesoProductivo, transacciones) -> int:
+    """Índice de la primera orden que la ejecución orden por orden rechaza, o -1."""
+    ejecutor, _ = economia(proceso)
+    interprete = ec.TupleOrderInterpreter()
+    for k, transaccion in enumerate(transacciones):
+        orden = interprete.interpret_order(transaccion)
+        ejecutor.generate_info(orden)
+        try:
+            ejecutor.validate_order(orden)
+        except ValueError:
+            return k
+        ejecutor.execute_order(orden)
+    return -1
+
+
+@pytest.mark.parametrize("semilla", range(30))
+@pytest.mark.parametrize("grafo", [grafo_ejemplo, grafo_ponderado])
+def test_plan_validator_equivale_a_execute_batch(semilla, grafo):
+    rng = random.Random(semilla)
+    proceso, transacciones = transacciones_ejemplo(semilla, grafo())
+    transacciones = list(transacciones)
+    # Órdenes faltantes o adelantadas hacen que el plan deje de ser factible
+    for _ in range(rng.randint(0, 2)):
+        del transacciones[rng.randrange(len(transacciones))]
+    for _ in range(rng.randint(0, 2)):
+        k = rng.randrange(len(transacciones) - 1)
+        transacciones[k], transacciones[k + 1] = transacciones[k + 1], transacciones[k]
+
+    esperado = primer_fallo_por_orden(proceso, transacciones)
+    ejecutor, registro = economia(proceso)
+    resultado = ec.PlanValidator(ejecutor.config).check(transacciones)
+
+    assert resultado.feasible == (esperado == -1)
+    assert resultado.step == esperado
+    if esperado == -1:
+        ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+    else:
+        assert resultado.time == transacciones[esperado][0]
+        with pytest.raises(ValueError):
+            ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+
+
+def test_precio_sin_bien():
+    plana = ec.PriceMatrix(np.arange(9, dtype=np.float64).reshape(3, 3))
+    assert plana.get_price(1, 2) == plana.get_price(1, 2, "A") == 5.0
+    np.testing.assert_array_equal(plana.get_prices([1, 0], [2, 1]), [5.0, 1.0])
+
+    por_bien = ec.PriceMatrix(np.arange(18, dtype=np.float64).reshape(2, 3, 3), {"A": 0, "B": 1})
+    assert por_bien.get_price(1, 2, "B") == 14.0
+    dispersa = ec.SparsePriceMatrix({"A": {(1, 2): 3.0}, "B": {(1, 2): 4.0}}, n_agents=3)
+    assert dispersa.get_price(1, 2, "B") == 4.0
+    for matriz in (por_bien, dispersa):
+        with pytest.raises(ValueError):
+            matriz.get_price(1, 2)
+        with pytest.raises(ValueError):
+            matriz.get_prices([1], [2])
+
+
+def test_matriz_dispersa(tmp_path):
+    dispersa = ec.SparsePriceMatrix({"A": {(1, 2): 3.0}, "B": {(0, 2): 4.0}}, n_agents=3, default=-1.0)
+    # Un bien desconocido o una entrada ausente devuelven el precio por defecto
+    np.testing.assert_array_equal(
+        dispersa.get_prices([1, 1, 0, 1], [2, 2, 2, 0], ["A", "Z", "B", "B"]), [3.0, -1.0, 4.0, -1.0]
+    )
+    assert dispersa.get_price(1, 2, 0) == 3.0
+    # Ids fuera de rango producirían claves de otra entrada (p. ej. (0, 5) = (1, 2))
+    for compradores, vendedores, bienes in (([0], [5], ["A"]), ([-1], [2], ["B"]), ([1], [2], [2])):
+        with pytest.raises(ValueError):
+            dispersa.get_prices(compradores, vendedores, bienes)
+    with pytest.raises(ValueError):
+        ec.SparsePriceMatrix({"A": {(0, 3): 1.0}}, n_agents=3)
+
+    ruta = str(tmp_path / "precios.npz")
+    dispersa.save(ruta)
+    cargada = ec.SparsePriceMatrix.from_file(ruta)
+    assert cargada.good_indexes == dispersa.good_indexes
+    assert (cargada.n_agents, cargada.default) == (3, -1.0)
+    np.testing.assert_array_equal(
+        cargada.get_prices([1, 0, 2], [2, 2, 2], ["A", "B", "Z"]), [3.0, 4.0, -1.0]
+    )
+
+
+def reproducir(proceso: ProcesoProductivo, transacciones, modo: str):
+    """Ejecuta las transacciones del Planner en el economy: por orden, por lote o en pipeline."""
+    ejecutor, registro = economia(proceso)
+    if modo == "orden":
+        interprete = ec.TupleOrderInterpreter()
+        for transaccion in transacciones:
+            orden = interprete.interpret_order(transaccion)
+            ejecutor.generate_info(orden)
+            ejecutor.validate_order(orden)
+            ejecutor.execute_order(orden)
+    elif modo == "lote":
+        ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+    else:
+        ec.OrderPipeline(ejecutor, chunk_size=4).run(iter(transacciones))
+    return inventarios(registro)
+
+
+@pytest.mark.parametrize("modo", ["orden", "lote", "pipeline"])
+def test_plan_ponderado_consume_lo_mismo_en_el_economy(modo):
+    proceso = ProcesoProductivo(grafo_ponderado())
+    assert ec.PGraphProductionLookup(proceso).get_production_info("C")["input_units"] == [2]
+    largo = sum(proceso.get_cantidades_requeridas().values())
+
+    # Todo en NCT: A y B cuestan 1 + 1 de sobrecosto al comprarlos,
+    # C = 2·2 + 1, D = 3·2 + 1 y K = C + D + 1
+    todo_nct = reproducir(proceso, Planner(proceso).ejecutar_plan([1] * largo), modo)
+    assert todo_nct == {"NCT": [("K", 13.0)], "ZF": [], "MKT": []}
+
+    rng = random.Random(0)
+    for _ in range(5):
+        plan = [rng.randint(0, 1) for _ in range(largo)]
+        resultado = reproducir(proceso, Planner(proceso).ejecutar_plan(plan), modo)
+        # El Planner consume todo lo que compra: solo queda el bien final
+        assert [bien for unidades in resultado.values() for bien, _ in unidades] == ["K"]
+        assert resultado == reproducir(proceso, Planner(proceso).ejecutar_plan(plan), "orden")
+
+
+def test_registrar_agente_etiqueta_sus_unidades():
+    almacen = ec.GoodStore()
+    agentes = [ec.EconomyAgent(nombre, ec.FIFOInventoryStrategy(), {}) for nombre in AGENTES]
+    # Unidades recibidas antes de registrar al agente
+    agentes[1].add_good(ec.Good("A", 0, 2.0, almacen))
+    agentes[1].add_good(ec.Good("A", 0, 3.0, almacen))
+    agentes[2].add_good(ec.Good("B", 0, 7.0, almacen))
+    assert almacen.valuation().shape == (0, 2)
+
+    ec.AgentRegistry(agentes)
+
+    np.testing.assert_array_equal(almacen.valuation(), [[0, 0], [5, 0], [0, 7]])
+    np.testing.assert_array_equal(almacen.valuation("count"), [[0, 0], [2, 0], [0, 1]])
+
+
+def test_get_stock_devuelve_una_lista():
+    agente = ec.EconomyAgent("NCT", ec.FIFOInventoryStrategy(), {})
+    almacen = ec.GoodStore()
+    primera, segunda = ec.Good("A", 0, 1.0, almacen), ec.Good("A", 0, 2.0, almacen)
+    agente.add_good(primera)
+    agente.add_good(segunda)
+
+    stock = agente.get_stock("A")
+    assert stock == [primera, segunda]
+    stock.clear()  # Es una copia: no modifica el inventario
+    assert agente.get_stock_quantity("A") == 2
+    assert agente.get_stock("B") == [] and "B" not in agente.inventory.inventory
+
+
+def test_referencia_a_fila_liberada_no_ve_la_nueva_unidad():
+    almacen = ec.GoodStore()
+    vieja = ec.Good("A", 0, 1.0, almacen)
+    almacen.free(vieja.index)
+    nueva = ec.Good("B", 0, 2.0, almacen)
+
+    assert nueva.index == vieja.index
+    assert vieja != nueva and len({vieja, nueva}) == 2
+    assert not vieja.is_alive and nueva.is_alive
+    for campo in ("good_type", "cost", "price", "owner"):
+        with pytest.raises(ValueError):
+            getattr(vieja, campo)
+    with pytest.raises(ValueError):
+        vieja.update_cost(5.0)
+    assert (nueva.good_type, nueva.cost) == ("B", 2.0)
+    assert ec.Good.from_index(almacen, nueva.index) == nueva
+
+
+def test_almacen_por_defecto_acotado():
+    anterior = ec.GoodStore.default()
+    with ec.GoodStore.default_scope() as almacen:
+        unidad = ec.Good("A", 0, 1.0)
+        assert unidad.store is almacen is ec.GoodStore.default()
+    assert ec.GoodStore.default() is anterior
+    assert unidad.store is not anterior
+
+    previo = ec.GoodStore.set_default(None)
+    try:
+        assert previo is anterior
+        assert ec.GoodStore.default() is not anterior
+    finally:
+        ec.GoodStore.set_default(previo)
@@ -0,0 +1,175 @@
+import json
+import math
+
+import pytest
+
+from economy import economy as ec
+from production_graph.instrumentation import Instrumentacion, etapa
+from production_graph.planner import Planner, ProcesoProductivo
+from tests.grafos import planes_aleatorios, proceso_aleatorio
+from tests.test_economy import economia, grafo_ejemplo, grafo_ponderado, inventarios
+
+
+def planes_completos(proceso: ProcesoProductivo, n_planes: int = 8):
+    """Planes de ``proceso`` que el Planner completa, con sus transacciones."""
+    for plan in planes_aleatorios(proceso, n_planes).tolist():
+        try:
+            yield plan, Planner(proceso).ejecutar_plan(plan)
+        except ValueError:
+            pass
+
+
+def unidades_consumidas(proceso: ProcesoProductivo, bien: str) -> int:
+    return sum(math.ceil(c) for _, c in proceso.get_insumos_con_coeficientes(bien))
+
+
+def test_etapas_y_latencias():
+    instrumentacion = Instrumentacion()
+    for ns in (5, 3, 9):
+        instrumentacion.acumular("a", ns)
+    for ns in (0, 1, 3, 4, 7, 2**70):
+        instrumentacion.registrar_latencia("comprar", ns)
+    with pytest.raises(RuntimeError):
+        with instrumentacion.etapa("b"):
+            raise RuntimeError
+    with etapa(None, "c"):
+        pass
+
+    estadisticas = instrumentacion.estadisticas()
+    assert estadisticas["etapas"]["a"] == {
+        "conteo": 3,
+        "total_s": 17e-9,
+        "media_s": 17 / 3 / 1e9,
+        "min_s": 3e-9,
+        "max_s": 9e-9,
+    }
+    # Un bloque que lanza una excepción también se mide
+    assert estadisticas["etapas"]["b"]["conteo"] == 1
+    assert "c" not in estadisticas["etapas"]
+
+    latencias = estadisticas["latencias"]["comprar"]
+    assert latencias["conteo"] == 6
+    assert latencias["min_s"] == 0 and latencias["max_s"] == 2**70 / 1e9
+    # El balde b cuenta [2**(b-1), 2**b); las latencias enormes van al último
+    assert latencias["histograma"] == {
+        "limite_superior_ns": [1, 2, 4, 8, 2**64],
+        "conteo": [1, 1, 1, 2, 1],
+    }
+
+    instrumentacion.reiniciar()
+    assert instrumentacion.estadisticas() == {
+        "etapas": {},
+        "latencias": {},
+        "contadores": {},
+    }
+
+
+def test_volcar_json(tmp_path):
+    instrumentacion = Instrumentacion()
+    instrumentacion.acumular("etapa", 10)
+    instrumentacion.registrar_latencia("producir", 100)
+    instrumentacion.contar("eventos", 3)
+    ruta = tmp_path / "estadisticas.json"
+
+    texto = instrumentacion.volcar_json(str(ruta))
+
+    assert ruta.read_text() == texto
+    assert json.loads(texto) == instrumentacion.estadisticas()
+    assert json.loads(instrumentacion.volcar_json())["contadores"] == {"eventos": 3}
+
+
+@pytest.mark.parametrize("coeficientes", [(1,), (1, 2, 0.5)])
+@pytest.mark.parametrize("semilla", range(4))
+def test_planner_instrumentado(semilla, coeficientes):
+    proceso = proceso_aleatorio(semilla, coeficientes)
+    compras_iniciales = sum(
+        cantidad
+        for bien, cantidad in proceso.get_cantidades_requeridas().items()
+        if proceso.get_clasificacion_bienes()[bien] == "bien_primario"
+    )
+    for plan, transacciones in planes_completos(proceso):
+        instrumentacion = Instrumentacion()
+        planner = Planner(proceso, instrumentacion=instrumentacion)
+
+        # Instrumentar no cambia el resultado
+        assert planner.ejecutar_plan(plan) == transacciones
+
+        compras = [t for t in transacciones if t[2] == "compra"]
+        producciones = [t for t in transacciones if t[2] == "produccion"]
+        estadisticas = instrumentacion.estadisticas()
+        assert {
+            nombre: valores["conteo"]
+            for nombre, valores in estadisticas["etapas"].items()
+        } == {
+            "plan_produccion": 1,
+            "cortar_lista": 1,
+            "fase_compras": 1,
+            "fase_produccion": 1,
+        }
+        assert estadisticas["latencias"]["comprar"]["conteo"] == compras_iniciales
+        assert estadisticas["latencias"]["producir"]["conteo"] == len(producciones)
+        for latencias in estadisticas["latencias"].values():
+            assert sum(latencias["histograma"]["conteo"]) == latencias["conteo"]
+        # Las compras posteriores a las iniciales las hace procesar_produccion
+        assert estadisticas["contadores"] == {
+            "compras_recursivas": len(compras) - compras_iniciales,
+            "eliminaciones_inventario": len(compras)
+            + sum(unidades_consumidas(proceso, t[3]) for t in producciones),
+        }
+
+
+def test_proceso_productivo_instrumentado():
+    instrumentacion = Instrumentacion()
+    proceso = ProcesoProductivo(grafo_ejemplo(), instrumentacion=instrumentacion)
+    assert ProcesoProductivo(grafo_ejemplo()).cantidades_requeridas == (
+        proceso.cantidades_requeridas
+    )
+    assert instrumentacion.estadisticas()["etapas"]["requerimientos"]["conteo"] == 1
+
+
+@pytest.mark.parametrize("modo", ["orden", "lote"])
+@pytest.mark.parametrize("grafo", [grafo_ejemplo, grafo_ponderado])
+def test_order_executor_instrumentado(grafo, modo):
+    proceso = ProcesoProductivo(grafo())
+    for _, transacciones in planes_completos(proceso):
+        resultados = []
+        for instrumentacion in (None, Instrumentacion()):
+            ejecutor, registro = economia(proceso)
+            ejecutor.instrumentation = instrumentacion
+            if modo == "orden":
+                interprete = ec.TupleOrderInterpreter()
+                for transaccion in transacciones:
+                    orden = interprete.interpret_order(transaccion)
+                    ejecutor.generate_info(orden)
+                    ejecutor.validate_order(orden)
+                    ejecutor.execute_order(orden)
+            else:
+                ejecutor.execute_batch(ec.OrderBatch.from_tuples(transacciones, registro))
+            resultados.append(inventarios(registro))
+
+        # Instrumentar no cambia el resultado
+        assert resultados[0] == resultados[1]
+
+        compras = [t for t in transacciones if t[2] == "compra"]
+        producciones = [t for t in transacciones if t[2] == "produccion"]
+        estadisticas = instrumentacion.estadisticas()
+        conteos = {n: v["conteo"] for n, v in estadisticas["etapas"].items()}
+        if modo == "orden":
+            assert conteos == {
+                "generate_info": len(transacciones),
+                "execution": len(transacciones),
+            }
+        else:
+            assert conteos == {
+                "enrichment": 1,
+                "validation": len(transacciones),
+                "execution": len(transacciones),
+            }
+        assert {t: v["conteo"] for t, v in estadisticas["latencias"].items()} == {
+            "comprar": len(compras),
+            "produccion": len(producciones),
+        }
+        assert estadisticas["contadores"] == {
+            "inventory_removals": len(compras)
+            + sum(unidades_consumidas(proceso, t[3]) for t in producciones)
+        }
@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from economy import economy as ec
+from production_graph import production_graph as pg
+from production_graph.optimizer import PlanOptimizer
+from production_graph.planner import AGENTES, Planner, ProcesoProductivo
+from tests.grafos import proceso_aleatorio
+
+
+def costo_minimo_exhaustivo(optimizador, planner):
+    largo = sum(planner.cantidades_requeridas.values())
+    return min(
+        optimizador.costo_plan(list(plan))
+        for plan in itertools.product((0, 1), repeat=largo)
+    )
+
+
+def test_coeficiente_fraccionario_optimizar():
+    grafo = pg.GrafoProduccion(
+        [
+            ("A", "B", {pg.ATRIBUTO_COEFICIENTE: 0.5}),
+            ("B", "C", {pg.ATRIBUTO_COEFICIENTE: 2}),
+        ]
+    )
+    planner = Planner(ProcesoProductivo(grafo))
+    precios = ec.PriceMatrix(np.array([[0.0, 4.0, 1.0], [3.0, 0.0, 2.0], [0.0, 0.0, 0.0]]))
+    optimizador = PlanOptimizer(planner, precios, costo_cruce=0.5)
+
+    plan, costo = optimizador.optimizar()
+
+    assert np.isclose(optimizador.costo_plan(plan), costo)
+    assert np.isclose(costo, costo_minimo_exhaustivo(optimizador, planner))
+
+
+@pytest.mark.parametrize("semilla", range(15))
+def test_optimizar_equivale_a_enumeracion_exhaustiva(semilla):
+    rng = np.random.default_rng(semilla)
+    proceso = proceso_aleatorio(semilla, coeficientes=(1, 1, 2, 0.5))
+    planner = Planner(proceso)
+    bienes = list(proceso.get_cantidades_requeridas())
+    # Precios por bien, sobrecostos distintos por agente y costo de cruce
+    precios = ec.PriceMatrix(
+        rng.integers(0, 6, size=(len(bienes), 3, 3)).astype(np.float64),
+        {bien: i for i, bien in enumerate(bienes)},
+    )
+    optimizador = PlanOptimizer(
+        planner,
+        precios,
+        costo_cruce=float(rng.integers(0, 4)),
+        cost_strategy=ec.SimpleAdditiveCostStrategy(),
+        info_agentes={agente: {"overhead": float(rng.integers(0, 3))} for agente in AGENTES},
+    )
+
+    plan, costo = optimizador.optimizar()
+
+    assert np.isclose(optimizador.costo_plan(plan), costo)
+    assert np.isclose(costo, costo_minimo_exhaustivo(optimizador, planner))
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from production_graph.parallel_planner import ParallelPlanner
+from production_graph.planner import Planner
+from tests.grafos import planes_aleatorios, proceso_aleatorio
+
+
+@pytest.mark.parametrize("semilla", range(3))
+def test_parallel_planner_equivale_a_ejecutar_planes(semilla):
+    proceso = proceso_aleatorio(semilla, coeficientes=(1, 2, 0.5))
+    planner = Planner(proceso)
+    planes = planes_aleatorios(proceso, 103, semilla)
+
+    esperado = planner.ejecutar_planes(planes)
+    # Chunks que no dividen el número de planes, repartidos entre 2 trabajadores
+    with ParallelPlanner(planner, n_trabajadores=2, tamano_chunk=10) as paralelo:
+        for _ in range(2):  # la memoria compartida del grafo se reutiliza
+            resultados = paralelo.ejecutar_planes(planes)
+            for campo in ("compras", "producciones", "compras_transfronterizas", "paso_fallo"):
+                np.testing.assert_array_equal(
+                    getattr(resultados, campo), getattr(esperado, campo)
+                )
+        with pytest.raises(ValueError):
+            paralelo.ejecutar_planes(planes[:, :-1])
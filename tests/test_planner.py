@@ -0,0 +1,163 @@
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from production_graph import production_graph as pg
+from production_graph.planner import (
+    Planner,
+    ProcesoProductivo,
+    SumideroArreglo,
+    SumideroMemmap,
+)
+from tests.grafos import assert_resultados_de_referencia, planes_aleatorios, proceso_aleatorio
+
+
+def grafo_fraccionario():
+    """A -> B con coeficiente 0.5 y B -> C con coeficiente 2."""
+    return pg.GrafoProduccion(
+        [
+            ("A", "B", {pg.ATRIBUTO_COEFICIENTE: 0.5}),
+            ("B", "C", {pg.ATRIBUTO_COEFICIENTE: 2}),
+        ]
+    )
+
+
+def todos_los_planes(planner):
+    largo = sum(planner.cantidades_requeridas.values())
+    return np.array(list(itertools.product((0, 1), repeat=largo)), dtype=np.int8)
+
+
+def test_coeficiente_fraccionario_cantidades():
+    proceso = ProcesoProductivo(grafo_fraccionario())
+    # Cada una de las 2 unidades de B consume ceil(0.5) = 1 unidad de A
+    assert proceso.get_cantidades_requeridas() == {"A": 2, "B": 2, "C": 1}
+
+
+def test_coeficiente_fraccionario_ejecutar_plan():
+    planner = Planner(ProcesoProductivo(grafo_fraccionario()))
+    for plan in todos_los_planes(planner):
+        transacciones = planner.ejecutar_plan(plan.tolist())
+        assert transacciones[-1][2:] == ("produccion", "C")
+
+
+def test_coeficiente_fraccionario_ejecutar_planes():
+    planner = Planner(ProcesoProductivo(grafo_fraccionario()))
+    resultados = planner.ejecutar_planes(todos_los_planes(planner))
+    assert (resultados.paso_fallo == -1).all()
+    assert (resultados.producciones.sum(axis=1) == 3).all()
+
+
+def test_coeficiente_fraccionario_barrido_gray():
+    planner = Planner(ProcesoProductivo(grafo_fraccionario()))
+    bloques = list(planner.barrido_gray())
+    planes = np.concatenate([planes for planes, _ in bloques])
+    paso_fallo = np.concatenate([r.paso_fallo for _, r in bloques])
+    assert len(planes) == 2 ** sum(planner.cantidades_requeridas.values())
+    assert (paso_fallo == -1).all()
+
+
+def test_snapshot_despues_de_ejecutar_con_sumidero():
+    grafo = pg.GrafoProduccion([("A", "C"), ("B", "C"), ("C", "K")])
+    planner = Planner(ProcesoProductivo(grafo))
+    plan = [1, 0, 1, 0]
+    esperado = planner.ejecutar_plan(plan)
+
+    sumidero = SumideroArreglo()
+    assert planner.ejecutar_plan(plan, sumidero=sumidero) is sumidero
+    assert sumidero.decodificar(sumidero.registros) == esperado
+
+    snapshot = planner.tomar_snapshot()
+    assert snapshot.transacciones == ()
+    planner.ejecutar_plan(plan)
+    planner.restaurar_snapshot(snapshot)
+    assert planner.transacciones == []
+
+    with pytest.raises(ValueError):
+        planner.ejecutar_plan([1], sumidero=SumideroArreglo())
+    assert planner.tomar_snapshot().transacciones == ()
+
+
+def test_sumidero_memmap_anexa_con_los_mismos_ids(tmp_path):
+    ruta = str(tmp_path / "transacciones.bin")
+    primero = Planner(ProcesoProductivo(pg.GrafoProduccion([("A", "C"), ("C", "K")])))
+    segundo = Planner(ProcesoProductivo(pg.GrafoProduccion([("B", "C"), ("C", "K")])))
+    esperado = primero.ejecutar_plan([1, 1, 1]) + segundo.ejecutar_plan([0, 0, 0])
+
+    with SumideroMemmap(ruta, bufer=2) as sumidero:
+        primero.ejecutar_plan([1, 1, 1], sumidero=sumidero)
+    assert sumidero._archivo.closed
+
+    with SumideroMemmap(ruta, anexar=True) as sumidero:
+        segundo.ejecutar_plan([0, 0, 0], sumidero=sumidero)
+        assert sumidero.decodificar(sumidero.registros) == esperado
+    assert sumidero.bienes == ["A", "C", "K", "B"]
+
+    with pytest.raises(ValueError):
+        SumideroMemmap(ruta, bienes=["K"], anexar=True)
+    os.remove(sumidero.ruta_bienes)
+    with pytest.raises(ValueError):
+        SumideroMemmap(ruta, anexar=True)
+
+
+@pytest.mark.parametrize("semilla", range(12))
+def test_ejecutar_planes_equivale_a_ejecutar_plan(semilla):
+    proceso = proceso_aleatorio(semilla, coeficientes=(1, 2, 0.5))
+    planner = Planner(proceso)
+    planes = np.concatenate([todos_los_planes(planner), planes_aleatorios(proceso, 5)])
+
+    # Lotes pequeños para cubrir también el corte entre lotes
+    resultados = planner.ejecutar_planes(planes, tamano_lote=7)
+
+    assert_resultados_de_referencia(proceso, planes, resultados)
+    assert planner.transacciones == []
+
+
+@pytest.mark.parametrize("semilla", range(8))
+def test_barrido_gray_equivale_a_ejecutar_planes(semilla):
+    proceso = proceso_aleatorio(semilla, coeficientes=(1, 2, 0.5))
+    planner = Planner(proceso)
+    largo = sum(planner.cantidades_requeridas.values())
+    plan_base = planes_aleatorios(proceso, 1, semilla)[0]
+    posiciones = sorted(np.random.default_rng(semilla).choice(largo, 4, replace=False))
+
+    for argumentos in ({}, {"posiciones": posiciones, "plan_base": plan_base}):
+        bloques = list(planner.barrido_gray(tamano_bloque=5, **argumentos))
+        planes = np.concatenate([planes for planes, _ in bloques])
+        n_posiciones = len(argumentos.get("posiciones", range(largo)))
+        assert len(np.unique(planes, axis=0)) == len(planes) == 2**n_posiciones
+        # Entre planes consecutivos cambia una sola posición
+        assert (np.abs(np.diff(planes, axis=0)).sum(axis=1) == 1).all()
+        if argumentos:
+            fijas = np.setdiff1d(np.arange(largo), posiciones)
+            assert (planes[:, fijas] == plan_base[fijas]).all()
+
+        esperado = planner.ejecutar_planes(planes)
+        for campo in ("compras", "producciones", "compras_transfronterizas", "paso_fallo"):
+            np.testing.assert_array_equal(
+                np.concatenate([getattr(r, campo) for _, r in bloques]),
+                getattr(esperado, campo),
+            )
+
+
+def test_barrido_gray_rechaza_plan_base_de_otro_largo():
+    planner = Planner(ProcesoProductivo(grafo_fraccionario()))
+    largo = sum(planner.cantidades_requeridas.values())
+    for plan_base in ([0] * (largo - 1), [0] * (largo + 1)):
+        with pytest.raises(ValueError):
+            next(planner.barrido_gray(plan_base=plan_base))
+
+
+def test_barrido_gray_rechaza_posiciones_repetidas():
+    planner = Planner(ProcesoProductivo(grafo_fraccionario()))
+    with pytest.raises(ValueError):
+        next(planner.barrido_gray(posiciones=[0, 1, 1]))
+
+
+def test_eliminar_inventario_sin_stock_no_imprime(capsys):
+    planner = Planner(ProcesoProductivo(grafo_fraccionario()))
+    agente = planner._agentes["NCT"]
+    assert agente.eliminar_inventario("A") is None
+    assert agente.cantidad("A") == 0
+    assert capsys.readouterr().out == ""
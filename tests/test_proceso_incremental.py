@@ -0,0 +1,133 @@
+import random
+
+import numpy as np
+import pytest
+
+from production_graph import production_graph as pg
+from production_graph.cache import huella_grafo
+from production_graph.planner import Planner, ProcesoProductivo
+
+
+def grafo_aleatorio(semilla: int, n: int = 7, densidad: float = 0.3):
+    rng = random.Random(semilla)
+    nodos = [f"n{i}" for i in range(n)]
+    return pg.GrafoProduccion(
+        (nodos[i], nodos[j])
+        for i in range(n)
+        for j in range(i + 1, n)
+        if rng.random() < densidad
+    )
+
+
+def editar(proceso: ProcesoProductivo, rng: random.Random):
+    """Aplica una modificación aleatoria; las que crearían un ciclo se descartan."""
+    nodos = list(proceso.get_clasificacion_bienes()) + ["nuevo"]
+    operacion = rng.random()
+    try:
+        if operacion < 0.5:
+            insumo, producto = rng.sample(nodos, 2)
+            proceso.add_edge(insumo, producto, rng.choice([None, 2, 0.5]))
+        elif operacion < 0.8:
+            aristas = list(proceso.get_grafo().edges())
+            if aristas:
+                proceso.remove_edge(*rng.choice(aristas))
+        else:
+            intermedios = [
+                bien
+                for bien, clase in proceso.get_clasificacion_bienes().items()
+                if clase == "bien_intermedio"
+            ]
+            if intermedios:
+                proceso.remove_good(rng.choice(intermedios))
+    except ValueError:
+        pass
+
+
+def assert_equivalente(proceso: ProcesoProductivo, nuevo: ProcesoProductivo):
+    assert list(proceso.cantidades_requeridas.items()) == list(
+        nuevo.cantidades_requeridas.items()
+    )
+    assert proceso.get_clasificacion_bienes() == nuevo.get_clasificacion_bienes()
+    for bien in nuevo.get_clasificacion_bienes():
+        assert sorted(proceso.get_insumos_con_coeficientes(bien)) == sorted(
+            nuevo.get_insumos_con_coeficientes(bien)
+        )
+    for a, b in zip(proceso.get_plantilla_plan(), nuevo.get_plantilla_plan()):
+        np.testing.assert_array_equal(a, b)
+
+    largo = sum(nuevo.cantidades_requeridas.values())
+    plan = [random.Random(largo).randint(0, 1) for _ in range(largo)]
+    assert Planner(proceso).ejecutar_plan(plan) == Planner(nuevo).ejecutar_plan(plan)
+
+
+@pytest.mark.parametrize("semilla", range(60))
+def test_modificaciones_equivalen_a_construir_desde_cero(semilla):
+    grafo = grafo_aleatorio(semilla)
+    if grafo.number_of_edges() == 0:
+        pytest.skip("grafo sin aristas")
+    proceso = ProcesoProductivo(grafo)
+    rng = random.Random(semilla)
+    for _ in range(10):
+        editar(proceso, rng)
+        grafo = proceso.get_grafo()
+        if grafo.number_of_edges() == 0:
+            break
+        # Un bien sin aristas no forma parte de un grafo de producción
+        if any(not grafo.succ[n] and not grafo.pred[n] for n in grafo):
+            continue
+        assert_equivalente(proceso, ProcesoProductivo(grafo.copy()))
+
+
+def test_modificaciones_no_alteran_el_grafo_entregado():
+    grafo = pg.GrafoProduccion([("A", "C"), ("B", "C"), ("C", "K")])
+    aristas = list(grafo.edges())
+    huella = huella_grafo(grafo)
+    proceso = ProcesoProductivo(grafo)
+    otro = ProcesoProductivo(grafo)
+
+    proceso.add_edge("A", "K")
+    proceso.remove_edge("B", "C")
+    proceso.add_good("D", insumos=["K"])
+
+    assert list(grafo.edges()) == aristas
+    assert huella_grafo(grafo) == huella
+    assert otro.get_cantidades_requeridas() == {"A": 1, "B": 1, "C": 1, "K": 1}
+    assert proceso.get_grafo().has_edge("A", "K")
+
+
+def test_cantidades_ponderadas_son_enteros_exactos():
+    # 3**50 supera la precisión de un float64 y el rango de un int64
+    n = 50
+    grafo = pg.GrafoProduccion(
+        [(f"n{i}", f"n{i + 1}", {pg.ATRIBUTO_COEFICIENTE: 2.5}) for i in range(n)]
+    )
+    proceso = ProcesoProductivo(grafo)
+    assert proceso.cantidades_requeridas["n0"] == 3**n
+
+    proceso.add_edge("n0", f"n{n}", 2)
+    nuevo = ProcesoProductivo(proceso.get_grafo().copy())
+    assert nuevo.cantidades_requeridas["n0"] == 3**n + 2
+    assert list(proceso.cantidades_requeridas.items()) == list(
+        nuevo.cantidades_requeridas.items()
+    )
+    assert pg.generar_cantidad_requerida_bienes(proceso.get_grafo()) == dict(
+        nuevo.cantidades_requeridas
+    )
+
+
+def test_leer_cantidades_tras_modificar_no_recompila_el_indice():
+    grafo = pg.GrafoProduccion(
+        [("A", "C"), ("B", "C"), ("B", "D"), ("C", "K"), ("D", "K")]
+    )
+    proceso = ProcesoProductivo(grafo)
+    proceso.add_edge("A", "D", 2)
+    proceso.add_good("E", insumos=["B"], productos=["C"])
+    proceso.remove_edge("B", "C")
+
+    cantidades = proceso.cantidades_requeridas
+    assert proceso._indice is None
+    nuevo = ProcesoProductivo(proceso.get_grafo().copy())
+    assert list(cantidades.items()) == list(nuevo.cantidades_requeridas.items())
+    np.testing.assert_array_equal(
+        proceso.get_plantilla_plan()[0], nuevo.get_plantilla_plan()[0]
+    )
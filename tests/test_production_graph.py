@@ -0,0 +1,48 @@
+import random
+
+import numpy as np
+import pytest
+
+from production_graph import production_graph as pg
+
+
+def test_explotar_requerimientos_cadena_profunda():
+    n = 1000
+    grafo = pg.GrafoProduccion(
+        [(f"n{i}", f"n{i + 1}", {pg.ATRIBUTO_COEFICIENTE: 0.5}) for i in range(n)]
+    )
+    indice = pg.compilar_grafo(grafo)
+    altura = n - np.array([int(nodo[1:]) for nodo in indice.nodos])
+
+    # Primera llamada, sin alturas calculadas
+    np.testing.assert_allclose(pg.explotar_requerimientos(indice), 0.5**altura)
+    # Con dos demandas a la vez; cada orden consume ceil(0.5) = 1 unidad
+    final = (altura == 0).astype(np.float64)
+    X = pg.explotar_requerimientos(indice, np.stack([final, 3 * final], axis=1), True)
+    np.testing.assert_array_equal(X, np.ones((n + 1, 1)) * [1, 3])
+
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_explotar_requerimientos_barrido_y_alturas_coinciden(monkeypatch, semilla):
+    rng = random.Random(semilla)
+    n = rng.randint(3, 25)
+    grafo = pg.GrafoProduccion(
+        (f"n{i}", f"n{j}", {pg.ATRIBUTO_COEFICIENTE: rng.choice([0.1, 0.5, 1, 1.3, 2])})
+        for i in range(n)
+        for j in range(i + 1, n)
+        if rng.random() < 0.3
+    )
+    indice = pg.compilar_grafo(grafo)
+    demanda = np.random.default_rng(semilla).integers(0, 3, size=(len(indice), 2))
+    indice.aristas_por_altura()
+
+    resultados = {}
+    for umbral in (0, 10**9):  # siempre vectorizado / siempre barrido en Python
+        monkeypatch.setattr(pg, "_ARISTAS_POR_GRUPO_VECTORIZADO", umbral)
+        resultados[umbral] = (
+            pg.explotar_requerimientos(indice, demanda, unidades_enteras=True),
+            pg.explotar_requerimientos(indice, demanda[:, 0] * 0.7),
+        )
+
+    np.testing.assert_array_equal(resultados[0][0], resultados[10**9][0])
+    np.testing.assert_allclose(resultados[0][1], resultados[10**9][1])